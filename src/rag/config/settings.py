@@ -64,18 +64,149 @@ ensure_dir(CHROMA_DB_DIR)
 rag_cfg = SETTINGS_DATA.get("rag", {})
 CHUNK_SIZE = rag_cfg.get("chunk_size", 800)
 CHUNK_OVERLAP = rag_cfg.get("chunk_overlap", 200)
+CHUNK_SPLITTER = rag_cfg.get("splitter", "structured")
+CHUNK_STRATEGIES = rag_cfg.get("chunking", {})
 TOP_K = rag_cfg.get("top_k", 5)
+PACKAGE_TOP_K = rag_cfg.get("package_top_k", 6)
+
+semantic_skills_cfg = rag_cfg.get("semantic_skills", {})
+SEMANTIC_SKILLS_ENABLED = os.getenv(
+    "SEMANTIC_SKILLS", str(semantic_skills_cfg.get("enabled", False))
+).lower() in {"1", "true", "yes", "on"}
+SEMANTIC_SKILLS_THRESHOLD = float(semantic_skills_cfg.get("threshold", 0.75))
+SEMANTIC_SKILLS_CACHE_DIR = RAG_DIR / semantic_skills_cfg.get("cache_dir", "skill_vectors")
+
+dedup_cfg = rag_cfg.get("dedup", {})
+DEDUP_ENABLED = dedup_cfg.get("enabled", True)
+DEDUP_FETCH_MULTIPLIER = dedup_cfg.get("fetch_multiplier", 3)
+DEDUP_SIMHASH_MAX_DISTANCE = dedup_cfg.get("simhash_max_distance", 10)
+DEDUP_MIN_OVERLAP_CHARS = dedup_cfg.get("min_overlap_chars", 40)
+
+# ----------------------------------------------------------------------
+# INGESTION
+# ----------------------------------------------------------------------
+ingestion_cfg = SETTINGS_DATA.get("ingestion", {})
+PROFILE_MANIFEST_PATH = RAG_DIR / ingestion_cfg.get("manifest_file", "profile_manifest.json")
+
+watch_cfg = ingestion_cfg.get("watch", {})
+PROFILE_WATCH_ENABLED = os.getenv(
+    "PROFILE_WATCH", str(watch_cfg.get("enabled", True))
+).lower() in {"1", "true", "yes", "on"}
+PROFILE_WATCH_INTERVAL_S = float(watch_cfg.get("interval_s", 5))
+PROFILE_WATCH_DEBOUNCE_S = float(watch_cfg.get("debounce_s", 3))
+
+# ----------------------------------------------------------------------
+# VECTOR STORE
+# ----------------------------------------------------------------------
+vs_cfg = SETTINGS_DATA.get("vectorstore", {})
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", vs_cfg.get("backend", "chroma")).lower()
+
+numpy_store_cfg = vs_cfg.get("numpy", {})
+NUMPY_STORE_DIR = RAG_DIR / numpy_store_cfg.get("dir", "numpy_store")
+NUMPY_STORE_DTYPE = numpy_store_cfg.get("dtype", "float32")
+
+chroma_cfg = vs_cfg.get("chroma", {})
+CHROMA_MODE = os.getenv("CHROMA_MODE", chroma_cfg.get("mode", "embedded")).lower()
+CHROMA_HOST = os.getenv("CHROMA_HOST", chroma_cfg.get("host", "localhost"))
+CHROMA_PORT = int(os.getenv("CHROMA_PORT", chroma_cfg.get("port", 8000)))
+CHROMA_SSL = chroma_cfg.get("ssl", False)
+CHROMA_HEADERS = chroma_cfg.get("headers") or {}
+CHROMA_HTTP_POOL_SIZE = chroma_cfg.get("pool_size", 16)
+
+COLLECTION_PREFIX = vs_cfg.get("collection_prefix", "rag")
+DEFAULT_TENANT = os.getenv("RAG_TENANT", vs_cfg.get("default_tenant", "default"))
+
+hnsw_cfg = vs_cfg.get("hnsw", {})
+HNSW_SPACE = hnsw_cfg.get("space", "l2")
+HNSW_M = hnsw_cfg.get("M", 16)
+HNSW_EF_CONSTRUCTION = hnsw_cfg.get("ef_construction", 100)
+HNSW_EF_SEARCH = hnsw_cfg.get("ef_search", 50)
+
+JD_MAX_AGE_DAYS = vs_cfg.get("jd_max_age_days", 7)
+
+# ----------------------------------------------------------------------
+# GENERATION
+# ----------------------------------------------------------------------
+generation_cfg = SETTINGS_DATA.get("generation", {})
+GENERATION_DEADLINE_S = float(os.getenv("GENERATION_DEADLINE_S", generation_cfg.get("deadline_s", 600)))
+
+reuse_cfg = generation_cfg.get("reuse", {})
+REUSE_ENABLED = reuse_cfg.get("enabled", True)
+REUSE_DB_PATH = RAG_DIR / reuse_cfg.get("db_file", "packages.sqlite3")
+REUSE_MAX_DISTANCE = reuse_cfg.get("max_distance", 8)
+REUSE_TEXT_DISTANCE = reuse_cfg.get("text_reuse_distance", 3)
+REUSE_MAX_ENTRIES = reuse_cfg.get("max_entries", 500)
+
+speculative_cfg = generation_cfg.get("speculative", {})
+SPECULATIVE_ENABLED = os.getenv(
+    "SPECULATIVE_PREP", str(speculative_cfg.get("enabled", True))
+).lower() in {"1", "true", "yes", "on"}
+SPECULATIVE_DEBOUNCE_S = float(speculative_cfg.get("debounce_s", 1.0))
+SPECULATIVE_CACHE_SIZE = int(speculative_cfg.get("cache_size", 16))
+
+# ----------------------------------------------------------------------
+# PROFILING
+# ----------------------------------------------------------------------
+profiling_cfg = SETTINGS_DATA.get("profiling", {})
+PROFILING_ENABLED = os.getenv("RAG_PROFILE", str(profiling_cfg.get("enabled", False))).lower() in {"1", "true", "yes", "on"}
+PROFILE_DIR = OUT_DIR / profiling_cfg.get("dir", "profiles")
+PROFILE_TRACEMALLOC_FRAMES = profiling_cfg.get("tracemalloc_frames", 10)
+PROFILE_TOP_N = profiling_cfg.get("top_n", 30)
+
+# ----------------------------------------------------------------------
+# BACKGROUND JOBS
+# ----------------------------------------------------------------------
+jobs_cfg = SETTINGS_DATA.get("jobs", {})
+JOBS_DB_PATH = RAG_DIR / jobs_cfg.get("db_file", "jobs.sqlite3")
+
+JOB_RESULTS_DIR = OUT_DIR / jobs_cfg.get("results_subdir", "jobs")
+ensure_dir(JOB_RESULTS_DIR)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", jobs_cfg.get("workers", 2)))
+JOB_MAX_ATTEMPTS = jobs_cfg.get("max_attempts", 3)
+JOB_RETRY_BACKOFF_S = jobs_cfg.get("retry_backoff_s", 5)
+JOB_POLL_INTERVAL_S = jobs_cfg.get("poll_interval_s", 1.0)
+JOB_LEASE_S = jobs_cfg.get("lease_s", 900)
 
 # ----------------------------------------------------------------------
 # MODEL SETTINGS
 # ----------------------------------------------------------------------
 embedding_cfg = MODEL_DATA.get("embeddings", {})
 EMBED_MODEL = embedding_cfg.get("model_name", "all-MiniLM-L6-v2")
+EMBED_IDLE_UNLOAD_S = float(os.getenv("EMBED_IDLE_UNLOAD_S", embedding_cfg.get("idle_unload_s", 900)))
+EMBED_MAX_RSS_MB = float(os.getenv("EMBED_MAX_RSS_MB", embedding_cfg.get("max_rss_mb", 0)))
+EMBED_CHECK_INTERVAL_S = embedding_cfg.get("check_interval_s", 30)
 
 llm_cfg = MODEL_DATA.get("llm", {})
 MODEL_NAME = llm_cfg.get("model_name", "llama3.2:3b")
 OLLAMA_HOST_DEFAULT = llm_cfg.get("host", "http://localhost:11434")
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", OLLAMA_HOST_DEFAULT)
+OLLAMA_HOSTS = [
+    h.strip() for h in os.getenv("OLLAMA_HOSTS", "").split(",") if h.strip()
+] or list(llm_cfg.get("hosts") or []) or [OLLAMA_HOST]
+LLM_MAX_CONCURRENCY_PER_HOST = llm_cfg.get("max_concurrency_per_host", 2)
+LLM_EJECT_AFTER_FAILURES = llm_cfg.get("eject_after_failures", 2)
+LLM_EJECT_COOLDOWN_S = llm_cfg.get("eject_cooldown_s", 30)
+LLM_PROBE_TIMEOUT_S = llm_cfg.get("probe_timeout_s", 2)
+LLM_TEMPERATURE = llm_cfg.get("temperature", 0.3)
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", llm_cfg.get("timeout_s", 180)))
+LLM_CONNECT_TIMEOUT_S = llm_cfg.get("connect_timeout_s", 5)
+LLM_READ_TIMEOUT_S = llm_cfg.get("read_timeout_s", 60)
+LLM_MAX_RETRIES = llm_cfg.get("max_retries", 2)
+LLM_RETRY_BACKOFF_S = llm_cfg.get("retry_backoff_s", 1.0)
+LLM_MAX_CONNECTIONS = llm_cfg.get("max_connections", 8)
+LLM_MAX_KEEPALIVE_CONNECTIONS = llm_cfg.get("max_keepalive_connections", 4)
+LLM_KEEP_ALIVE = os.getenv("LLM_KEEP_ALIVE", llm_cfg.get("keep_alive", "30m"))
+if isinstance(LLM_KEEP_ALIVE, str) and LLM_KEEP_ALIVE.lstrip("-").isdigit():
+    LLM_KEEP_ALIVE = int(LLM_KEEP_ALIVE)  # Ollama wants bare numbers as JSON numbers
+LLM_WARMUP = llm_cfg.get("warmup", True)
+LLM_COLD_LOAD_THRESHOLD_S = llm_cfg.get("cold_load_threshold_s", 0.5)
+
+heartbeat_cfg = llm_cfg.get("heartbeat", {})
+LLM_HEARTBEAT_ENABLED = heartbeat_cfg.get("enabled", True)
+LLM_HEARTBEAT_INTERVAL_S = heartbeat_cfg.get("interval_s", 240)
+LLM_HEARTBEAT_HOURS = heartbeat_cfg.get("hours", "08:00-19:00")
+LLM_HEARTBEAT_DAYS = heartbeat_cfg.get("days", ["mon", "tue", "wed", "thu", "fri"])
 
 
 __all__ = [
@@ -87,9 +218,82 @@ __all__ = [
     "CHROMA_DB_DIR",
     "CHUNK_SIZE",
     "CHUNK_OVERLAP",
+    "CHUNK_SPLITTER",
+    "CHUNK_STRATEGIES",
     "TOP_K",
+    "PACKAGE_TOP_K",
+    "SEMANTIC_SKILLS_ENABLED",
+    "SEMANTIC_SKILLS_THRESHOLD",
+    "SEMANTIC_SKILLS_CACHE_DIR",
+    "DEDUP_ENABLED",
+    "DEDUP_FETCH_MULTIPLIER",
+    "DEDUP_SIMHASH_MAX_DISTANCE",
+    "DEDUP_MIN_OVERLAP_CHARS",
+    "PROFILE_MANIFEST_PATH",
+    "PROFILE_WATCH_ENABLED",
+    "PROFILE_WATCH_INTERVAL_S",
+    "PROFILE_WATCH_DEBOUNCE_S",
+    "VECTOR_BACKEND",
+    "NUMPY_STORE_DIR",
+    "NUMPY_STORE_DTYPE",
+    "CHROMA_MODE",
+    "CHROMA_HOST",
+    "CHROMA_PORT",
+    "CHROMA_SSL",
+    "CHROMA_HEADERS",
+    "CHROMA_HTTP_POOL_SIZE",
+    "COLLECTION_PREFIX",
+    "DEFAULT_TENANT",
+    "HNSW_SPACE",
+    "HNSW_M",
+    "HNSW_EF_CONSTRUCTION",
+    "HNSW_EF_SEARCH",
+    "JD_MAX_AGE_DAYS",
+    "GENERATION_DEADLINE_S",
+    "REUSE_ENABLED",
+    "REUSE_DB_PATH",
+    "REUSE_MAX_DISTANCE",
+    "REUSE_TEXT_DISTANCE",
+    "REUSE_MAX_ENTRIES",
+    "SPECULATIVE_ENABLED",
+    "SPECULATIVE_DEBOUNCE_S",
+    "SPECULATIVE_CACHE_SIZE",
+    "PROFILING_ENABLED",
+    "PROFILE_DIR",
+    "PROFILE_TRACEMALLOC_FRAMES",
+    "PROFILE_TOP_N",
+    "JOBS_DB_PATH",
+    "JOB_RESULTS_DIR",
+    "JOB_WORKERS",
+    "JOB_MAX_ATTEMPTS",
+    "JOB_RETRY_BACKOFF_S",
+    "JOB_POLL_INTERVAL_S",
+    "JOB_LEASE_S",
     "EMBED_MODEL",
+    "EMBED_IDLE_UNLOAD_S",
+    "EMBED_MAX_RSS_MB",
+    "EMBED_CHECK_INTERVAL_S",
     "MODEL_NAME",
     "OLLAMA_HOST_DEFAULT",
     "OLLAMA_HOST",
+    "OLLAMA_HOSTS",
+    "LLM_MAX_CONCURRENCY_PER_HOST",
+    "LLM_EJECT_AFTER_FAILURES",
+    "LLM_EJECT_COOLDOWN_S",
+    "LLM_PROBE_TIMEOUT_S",
+    "LLM_TEMPERATURE",
+    "LLM_TIMEOUT_S",
+    "LLM_CONNECT_TIMEOUT_S",
+    "LLM_READ_TIMEOUT_S",
+    "LLM_MAX_RETRIES",
+    "LLM_RETRY_BACKOFF_S",
+    "LLM_MAX_CONNECTIONS",
+    "LLM_MAX_KEEPALIVE_CONNECTIONS",
+    "LLM_KEEP_ALIVE",
+    "LLM_WARMUP",
+    "LLM_COLD_LOAD_THRESHOLD_S",
+    "LLM_HEARTBEAT_ENABLED",
+    "LLM_HEARTBEAT_INTERVAL_S",
+    "LLM_HEARTBEAT_HOURS",
+    "LLM_HEARTBEAT_DAYS",
 ]
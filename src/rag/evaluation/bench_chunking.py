@@ -0,0 +1,111 @@
+"""
+bench_chunking.py
+Compare the structured token splitter with the legacy character splitter.
+
+For each splitter the profile documents are chunked, embedded into a
+throwaway numpy store and probed with queries. Reported: chunk count, tokens
+embedded (and chunks over the model's max sequence length, whose tail is
+silently dropped), embedding time and hit rate@k.
+
+Without ``--queries`` the probes are sentences sampled from the documents; a
+hit means one of the top-k chunks contains the whole sentence, so a splitter
+that cuts bullets mid-sentence is penalised. A queries file is JSONL with
+``{"query": ..., "answer": ...}`` where ``answer`` must appear in a hit.
+
+    python -m rag.evaluation.bench_chunking --k 5
+    python -m rag.evaluation.bench_chunking --queries data/eval/chunk_queries.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from rag.config.settings import PROFILE_DOC_DIR
+from rag.ingestion.chunking.structured import parse_blocks
+from rag.ingestion.chunking.text_splitter import build_splitter
+from rag.ingestion.chunking.tokens import count_tokens
+from rag.ingestion.ingest import load_docs_from
+from rag.models.embedding_model.factory import get_embeddings
+from rag.vectorstore.clients.numpy_store import NumpyStore
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _norm(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def sample_queries(docs, n: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """Sentences of 8+ words from the documents, used as their own answers."""
+    sentences = []
+    for doc in docs:
+        for _, block in parse_blocks(doc.page_content):
+            for sentence in _SENTENCE_END.split(block):
+                sentence = re.sub(r"^\W+", "", sentence).strip()
+                if len(sentence.split()) >= 8:
+                    sentences.append(sentence)
+    random.Random(seed).shuffle(sentences)
+    return [(s, s) for s in sentences[:n]]
+
+
+def load_queries(path: Path) -> List[Tuple[str, str]]:
+    rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    return [(r["query"], r["answer"]) for r in rows]
+
+
+def bench_splitter(kind: str, docs, queries: List[Tuple[str, str]], k: int, max_seq: int) -> Dict[str, float]:
+    chunks = build_splitter(kind).split_documents(docs)
+    tokens = [count_tokens(c.page_content) for c in chunks]
+    with tempfile.TemporaryDirectory(prefix=f"bench-chunk-{kind}-") as tmp:
+        store = NumpyStore(Path(tmp), embedding_function=get_embeddings())
+        start = time.perf_counter()
+        store.add_documents(chunks)
+        embed_s = time.perf_counter() - start
+
+        query_vectors = get_embeddings().embed_documents([q for q, _ in queries])
+        results = store.search_by_vectors(query_vectors, k=k)
+    hits = sum(
+        any(_norm(answer) in _norm(doc.page_content) for doc, _ in found)
+        for (_, answer), found in zip(queries, results)
+    )
+    return {
+        "chunks": len(chunks),
+        "tokens": sum(tokens),
+        "over_max_seq": sum(t > max_seq for t in tokens),
+        "embed_s": embed_s,
+        "hit_rate": hits / len(queries) if queries else 0.0,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark structured vs character chunking.")
+    ap.add_argument("--docs", type=Path, default=PROFILE_DOC_DIR, help="Folder of profile documents.")
+    ap.add_argument("--queries", type=Path, default=None, help="JSONL with query/answer pairs.")
+    ap.add_argument("--n-queries", type=int, default=100)
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--max-seq", type=int, default=256, help="Embedding model max sequence length.")
+    args = ap.parse_args()
+
+    docs = load_docs_from(args.docs, "profile")
+    if not docs:
+        raise SystemExit(f"No documents found in {args.docs}")
+    queries = load_queries(args.queries) if args.queries else sample_queries(docs, args.n_queries)
+    print(f"docs={len(docs)} queries={len(queries)} k={args.k}")
+    print(f"{'splitter':>10} {'chunks':>7} {'tokens':>8} {'>max_seq':>9} {'embed_s':>8} {'hit@k':>7}")
+    for kind in ("recursive", "structured"):
+        r = bench_splitter(kind, docs, queries, args.k, args.max_seq)
+        print(
+            f"{kind:>10} {r['chunks']:>7} {r['tokens']:>8} {r['over_max_seq']:>9} "
+            f"{r['embed_s']:>8.2f} {r['hit_rate']:>7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+bench_hnsw.py
+Recall@k vs query latency for a grid of Chroma HNSW settings.
+
+Vectors come from an existing tenant collection (``--tenant``) or are
+synthetic (``--synthetic N``). Exact top-k from a brute-force scan is the
+ground truth; each (M, ef_construction, ef_search) combination is built in a
+throwaway in-memory Chroma client.
+
+    python -m rag.evaluation.bench_hnsw --tenant default --queries 200
+    python -m rag.evaluation.bench_hnsw --synthetic 20000 --M 8 16 32 --ef-search 10 50 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import time
+import uuid
+from typing import Dict, List, Tuple
+
+import numpy as np
+import chromadb
+
+from rag.config.settings import HNSW_SPACE
+from rag.vectorstore.chroma_instance import CHROMA_SETTINGS, hnsw_metadata
+from rag.vectorstore.factory import get_vector_store
+
+
+def load_vectors(tenant: str) -> np.ndarray:
+    data = get_vector_store(tenant).get(include_embeddings=True)
+    return np.asarray(data["embeddings"], dtype=np.float32)
+
+
+def synthetic_vectors(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    # A handful of clusters is closer to real chunk embeddings than pure noise.
+    centers = rng.normal(size=(max(1, n // 200), dim)).astype(np.float32)
+    labels = rng.integers(0, len(centers), size=n)
+    return centers[labels] + 0.3 * rng.normal(size=(n, dim)).astype(np.float32)
+
+
+def exact_topk(corpus: np.ndarray, queries: np.ndarray, k: int, space: str) -> np.ndarray:
+    if space == "ip":
+        scores = queries @ corpus.T
+    elif space == "cosine":
+        c = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+        q = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+        scores = q @ c.T
+    else:  # l2: rank by -||q - c||^2 (the ||q||^2 term is constant per query)
+        scores = 2 * queries @ corpus.T - (corpus ** 2).sum(axis=1)
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def bench_setting(
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    k: int,
+    space: str,
+    m: int,
+    ef_construction: int,
+    ef_search: int,
+) -> Dict[str, float]:
+    client = chromadb.EphemeralClient(settings=CHROMA_SETTINGS)
+    col = client.create_collection(
+        name=f"bench-{uuid.uuid4().hex[:12]}",
+        metadata=hnsw_metadata(space, m, ef_construction, ef_search),
+    )
+    ids = [str(i) for i in range(len(corpus))]
+    start = time.perf_counter()
+    for i in range(0, len(corpus), 5000):
+        col.add(ids=ids[i:i + 5000], embeddings=corpus[i:i + 5000].tolist())
+    build_s = time.perf_counter() - start
+
+    latencies: List[float] = []
+    hits = 0
+    for q, expected in zip(queries, truth):
+        t0 = time.perf_counter()
+        res = col.query(query_embeddings=[q.tolist()], n_results=k)
+        latencies.append(time.perf_counter() - t0)
+        hits += len({int(x) for x in res["ids"][0]} & set(expected.tolist()))
+    client.delete_collection(col.name)
+
+    lat = np.asarray(latencies) * 1000
+    return {
+        "recall": hits / (len(queries) * k),
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p95_ms": float(np.percentile(lat, 95)),
+        "build_s": build_s,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark Chroma HNSW recall vs latency.")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--tenant", default=None, help="Use vectors from this tenant's collection.")
+    src.add_argument("--synthetic", type=int, default=5000, help="Number of synthetic vectors.")
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=6)
+    ap.add_argument("--space", default=HNSW_SPACE, choices=["l2", "cosine", "ip"])
+    ap.add_argument("--M", type=int, nargs="+", default=[8, 16, 32])
+    ap.add_argument("--ef-construction", type=int, nargs="+", default=[100, 200])
+    ap.add_argument("--ef-search", type=int, nargs="+", default=[10, 50, 100])
+    args = ap.parse_args()
+
+    corpus = load_vectors(args.tenant) if args.tenant else synthetic_vectors(args.synthetic, args.dim)
+    if len(corpus) <= args.k:
+        raise SystemExit(f"Need more than k={args.k} vectors, got {len(corpus)}")
+    rng = np.random.default_rng(1)
+    picks = rng.choice(len(corpus), size=min(args.queries, len(corpus)), replace=False)
+    queries = corpus[picks] + 0.05 * rng.normal(size=(len(picks), corpus.shape[1])).astype(np.float32)
+    truth = exact_topk(corpus, queries, args.k, args.space)
+
+    print(f"corpus={len(corpus)} dim={corpus.shape[1]} queries={len(queries)} k={args.k} space={args.space}")
+    print(f"{'M':>4} {'ef_c':>6} {'ef_s':>6} {'recall':>8} {'p50_ms':>8} {'p95_ms':>8} {'build_s':>8}")
+    grid: List[Tuple[int, int, int]] = list(itertools.product(args.M, args.ef_construction, args.ef_search))
+    for m, ef_c, ef_s in grid:
+        r = bench_setting(corpus, queries, truth, args.k, args.space, m, ef_c, ef_s)
+        print(
+            f"{m:>4} {ef_c:>6} {ef_s:>6} {r['recall']:>8.3f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['build_s']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+bench_skills.py
+Skill-matching latency vs lexicon size: semantic matrix matcher vs fuzzy.
+
+For each lexicon size the real hard/soft lexicons are padded with synthetic
+skill names. Reported per size: one-time lexicon embedding (``build_s``),
+matrix size, and per-JD latency of matching the JD candidates with
+:class:`~rag.ingestion.preprocessing.semantic_skills.SkillMatcher`
+(candidate embedding + one matrix product) and with the fuzzy
+``fuzzy_match_candidates`` loop the pipeline uses without it.
+
+    python -m rag.evaluation.bench_skills
+    python -m rag.evaluation.bench_skills --sizes 100 1000 20000 --jd data/sample/jd.txt
+    python -m rag.evaluation.bench_skills --random-dim 384   # no model: isolates the matrix cost
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import itertools
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from rag.ingestion.preprocessing.semantic_skills import SkillMatcher
+from rag.utils.text import (
+    HARD_SKILL_LEXICON,
+    SOFT_SKILL_LEXICON,
+    fuzzy_match_candidates,
+    normalize_text,
+    tokenize_lower,
+    top_terms,
+)
+
+QUALIFIERS = [
+    "Cloud", "Distributed", "Applied", "Enterprise", "Realtime", "Embedded", "Mobile",
+    "Secure", "Scalable", "Serverless", "Streaming", "Batch", "Edge", "Data", "Platform",
+]
+DOMAINS = [
+    "Engineering", "Architecture", "Operations", "Analytics", "Testing", "Automation",
+    "Security", "Modelling", "Design", "Integration", "Monitoring", "Optimisation",
+]
+
+
+class HashEmbeddings:
+    """Deterministic random vectors per text, for timing without a model."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def _vector(self, text: str) -> List[float]:
+        seed = int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+        return np.random.default_rng(seed).normal(size=self.dim).astype(np.float32).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(t) for t in texts]
+
+
+def synthetic_lexicon(size: int) -> List[str]:
+    """The real lexicons padded with generated skill names up to ``size``."""
+    terms = sorted(HARD_SKILL_LEXICON | SOFT_SKILL_LEXICON)
+    base = sorted(HARD_SKILL_LEXICON)
+    for q, b, d in itertools.product(QUALIFIERS, base, [""] + DOMAINS):
+        if len(terms) >= size:
+            break
+        terms.append(" ".join(p for p in (q, b, d) if p))
+    i = 0
+    while len(terms) < size:
+        terms.append(f"{QUALIFIERS[i % len(QUALIFIERS)]} {base[i % len(base)]} {i}")
+        i += 1
+    return terms[:size]
+
+
+def jd_candidates(jd_path: Optional[Path], seed: int = 0) -> List[str]:
+    """The 80 candidate terms the keyword extractor would consider."""
+    if jd_path is not None:
+        text = jd_path.read_text(encoding="utf-8")
+    else:
+        rng = random.Random(seed)
+        skills = rng.sample(sorted(HARD_SKILL_LEXICON), 12) + rng.sample(sorted(SOFT_SKILL_LEXICON), 4)
+        filler = "we are hiring an engineer to build reliable services with strong ownership and clear communication"
+        text = " ".join(f"{filler} experience with {s} preferred." for s in skills)
+    return top_terms(tokenize_lower(normalize_text(text)), topn=80, min_len=2)
+
+
+def bench_size(size: int, embeddings, candidates: List[str], repeats: int, fuzzy_repeats: int) -> Dict[str, float]:
+    lexicon = synthetic_lexicon(size)
+    start = time.perf_counter()
+    matcher = SkillMatcher(lexicon, embeddings, cache_dir=None)
+    build_s = time.perf_counter() - start
+
+    semantic: List[float] = []
+    for _ in range(repeats):
+        matcher._cache.clear()  # every JD brings new candidate terms
+        t0 = time.perf_counter()
+        matcher.match_lexicon(candidates)
+        semantic.append((time.perf_counter() - t0) * 1000)
+
+    fuzzy: List[float] = []
+    for _ in range(fuzzy_repeats):
+        t0 = time.perf_counter()
+        fuzzy_match_candidates(candidates, lexicon, cutoff=86)
+        fuzzy.append((time.perf_counter() - t0) * 1000)
+
+    return {
+        "size": size,
+        "build_s": build_s,
+        "matrix_mb": matcher.matrix.nbytes / 1e6,
+        "semantic_p50_ms": float(np.percentile(semantic, 50)),
+        "semantic_p95_ms": float(np.percentile(semantic, 95)),
+        "fuzzy_p50_ms": float(np.percentile(fuzzy, 50)) if fuzzy else float("nan"),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark semantic vs fuzzy skill matching by lexicon size.")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000, 20000])
+    ap.add_argument("--jd", type=Path, default=None, help="JD text file (default: a synthetic JD).")
+    ap.add_argument("--repeats", type=int, default=20)
+    ap.add_argument("--fuzzy-repeats", type=int, default=3, help="0 skips the fuzzy baseline.")
+    ap.add_argument("--random-dim", type=int, default=0, help="Use random vectors of this size instead of the model.")
+    args = ap.parse_args()
+
+    if args.random_dim:
+        embeddings = HashEmbeddings(args.random_dim)
+    else:
+        from rag.models.embedding_model.factory import get_embeddings
+
+        embeddings = get_embeddings()
+    candidates = jd_candidates(args.jd)
+    print(f"candidates={len(candidates)} embeddings={'random' if args.random_dim else 'model'}")
+    print(f"{'lexicon':>8} {'build_s':>8} {'matrix_mb':>9} {'sem_p50_ms':>10} {'sem_p95_ms':>10} {'fuzzy_ms':>9}")
+    for size in args.sizes:
+        r = bench_size(size, embeddings, candidates, args.repeats, args.fuzzy_repeats)
+        print(
+            f"{r['size']:>8} {r['build_s']:>8.2f} {r['matrix_mb']:>9.1f} {r['semantic_p50_ms']:>10.2f} "
+            f"{r['semantic_p95_ms']:>10.2f} {r['fuzzy_p50_ms']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+bench_vectorstore.py
+Chroma vs the numpy memmap backend: build time, disk size, cold start and
+query latency (with and without a metadata filter).
+
+Cold start runs in a fresh interpreter per backend and measures
+import + open + first query, which is what a new app process pays.
+
+    python -m rag.evaluation.bench_vectorstore --synthetic 5000
+    python -m rag.evaluation.bench_vectorstore --tenant default --dtype float16
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from rag.evaluation.bench_hnsw import load_vectors, synthetic_vectors
+from rag.utils.helpers import dir_size
+
+COLLECTION = "bench"
+
+_COLD_START = r"""
+import json, sys, time
+t0 = time.perf_counter()
+backend, path, qfile, k = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+import numpy as np
+query = np.load(qfile)
+import rag.vectorstore.base
+if backend == "chroma":
+    import chromadb
+    from rag.vectorstore.chroma_instance import CHROMA_SETTINGS
+    t1 = time.perf_counter()
+    col = chromadb.PersistentClient(path=path, settings=CHROMA_SETTINGS).get_collection("bench")
+    t2 = time.perf_counter()
+    col.query(query_embeddings=[query.tolist()], n_results=k)
+else:
+    from rag.vectorstore.clients.numpy_store import NumpyStore
+    t1 = time.perf_counter()
+    store = NumpyStore(path)
+    t2 = time.perf_counter()
+    store.search_by_vectors([query], k=k)
+t3 = time.perf_counter()
+print(json.dumps({"import_s": t1 - t0, "open_s": t2 - t1, "first_query_s": t3 - t2, "total_s": t3 - t0}))
+"""
+
+
+def _records(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    ids = [f"c{i}" for i in range(n)]
+    docs = [f"chunk {i}" for i in range(n)]
+    metas = [{"doc_type": "profile" if x < 0.8 else "jd", "source": "bench"} for x in rng.random(n)]
+    return ids, docs, metas
+
+
+def build_chroma(path: Path, corpus: np.ndarray, ids, docs, metas) -> float:
+    import chromadb
+
+    from rag.vectorstore.chroma_instance import CHROMA_SETTINGS, hnsw_metadata
+
+    client = chromadb.PersistentClient(path=str(path), settings=CHROMA_SETTINGS)
+    col = client.create_collection(COLLECTION, metadata=hnsw_metadata())
+    start = time.perf_counter()
+    for i in range(0, len(ids), 5000):
+        col.add(
+            ids=ids[i:i + 5000],
+            embeddings=corpus[i:i + 5000].tolist(),
+            documents=docs[i:i + 5000],
+            metadatas=metas[i:i + 5000],
+        )
+    return time.perf_counter() - start
+
+
+def build_numpy(path: Path, corpus: np.ndarray, ids, docs, metas, dtype: str) -> float:
+    from rag.vectorstore.clients.numpy_store import NumpyStore
+
+    start = time.perf_counter()
+    NumpyStore(path, dtype=dtype).add_embeddings(ids, corpus, docs, metas)
+    return time.perf_counter() - start
+
+
+def cold_start(backend: str, path: Path, query: np.ndarray, k: int, runs: int) -> Dict[str, float]:
+    qfile = path.parent / f"{backend}-query.npy"
+    np.save(qfile, query)
+    src_root = str(Path(__file__).resolve().parents[2])
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [src_root, os.environ.get("PYTHONPATH")])))
+    samples: List[Dict[str, float]] = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _COLD_START, backend, str(path), str(qfile), str(k)],
+            check=True,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {key: float(np.median([s[key] for s in samples])) for key in samples[0]}
+
+
+def query_latency(search, queries: np.ndarray) -> Dict[str, float]:
+    search(queries[0])  # fault in pages / load the HNSW index before timing
+    lat = []
+    for q in queries:
+        t0 = time.perf_counter()
+        search(q)
+        lat.append(time.perf_counter() - t0)
+    lat_ms = np.asarray(lat) * 1000
+    return {"p50_ms": float(np.percentile(lat_ms, 50)), "p95_ms": float(np.percentile(lat_ms, 95))}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark Chroma vs the numpy memmap vector store.")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--tenant", default=None, help="Use vectors from this tenant's store.")
+    src.add_argument("--synthetic", type=int, default=5000, help="Number of synthetic vectors.")
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=6)
+    ap.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    ap.add_argument("--cold-runs", type=int, default=3)
+    args = ap.parse_args()
+
+    corpus = load_vectors(args.tenant) if args.tenant else synthetic_vectors(args.synthetic, args.dim)
+    ids, docs, metas = _records(len(corpus))
+    rng = np.random.default_rng(1)
+    picks = rng.choice(len(corpus), size=min(args.queries, len(corpus)), replace=False)
+    queries = corpus[picks] + 0.05 * rng.normal(size=(len(picks), corpus.shape[1])).astype(np.float32)
+    where = {"doc_type": "jd"}
+
+    print(f"corpus={len(corpus)} dim={corpus.shape[1]} queries={len(queries)} k={args.k} dtype={args.dtype}")
+    with tempfile.TemporaryDirectory(prefix="bench-vs-") as tmp:
+        tmp = Path(tmp)
+        rows = {}
+
+        chroma_path = tmp / "chroma"
+        build_s = build_chroma(chroma_path, corpus, ids, docs, metas)
+        import chromadb
+
+        from rag.vectorstore.chroma_instance import CHROMA_SETTINGS
+
+        col = chromadb.PersistentClient(path=str(chroma_path), settings=CHROMA_SETTINGS).get_collection(COLLECTION)
+        rows["chroma"] = {
+            "build_s": build_s,
+            "disk_mb": dir_size(chroma_path) / 1e6,
+            "cold": cold_start("chroma", chroma_path, queries[0], args.k, args.cold_runs),
+            "query": query_latency(lambda q: col.query(query_embeddings=[q.tolist()], n_results=args.k), queries),
+            "filtered": query_latency(
+                lambda q: col.query(query_embeddings=[q.tolist()], n_results=args.k, where=where), queries
+            ),
+        }
+
+        from rag.vectorstore.clients.numpy_store import NumpyStore
+
+        numpy_path = tmp / "numpy"
+        build_s = build_numpy(numpy_path, corpus, ids, docs, metas, args.dtype)
+        store = NumpyStore(numpy_path)
+        rows["numpy"] = {
+            "build_s": build_s,
+            "disk_mb": dir_size(numpy_path) / 1e6,
+            "cold": cold_start("numpy", numpy_path, queries[0], args.k, args.cold_runs),
+            "query": query_latency(lambda q: store.search_by_vectors([q], k=args.k), queries),
+            "filtered": query_latency(lambda q: store.search_by_vectors([q], k=args.k, filter=where), queries),
+        }
+
+    print(
+        f"{'backend':>8} {'build_s':>8} {'disk_mb':>8} {'cold_s':>8} {'open_ms':>8} "
+        f"{'p50_ms':>8} {'p95_ms':>8} {'filt_p50':>9} {'filt_p95':>9}"
+    )
+    for name, r in rows.items():
+        print(
+            f"{name:>8} {r['build_s']:>8.2f} {r['disk_mb']:>8.2f} {r['cold']['total_s']:>8.2f} "
+            f"{(r['cold']['open_s'] + r['cold']['first_query_s']) * 1000:>8.1f} "
+            f"{r['query']['p50_ms']:>8.3f} {r['query']['p95_ms']:>8.3f} "
+            f"{r['filtered']['p50_ms']:>9.3f} {r['filtered']['p95_ms']:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
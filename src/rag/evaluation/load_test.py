@@ -0,0 +1,319 @@
+"""
+load_test.py
+Concurrent-user load test of the application-package pipeline.
+
+Synthetic JDs arrive as a Poisson process at ``--rate`` per second and are
+served either
+
+- ``inprocess``: by a thread pool of ``--concurrency`` workers calling
+  ``generate_application_package`` directly, or
+- ``jobs``: through a scratch :class:`JobQueue` drained by a
+  :class:`WorkerPool` of ``--concurrency`` workers (the path the UI uses).
+
+By default the LLM is one or more local mock Ollama servers with tunable
+prefill/decode speed and per-host parallelism, so the numbers describe the
+pipeline and the concurrency limits rather than a particular GPU. The report
+gives throughput and p50/p95/p99 per stage (queue wait, each pipeline stage
+from ``result["timings"]``, end to end).
+
+    python -m rag.evaluation.load_test --requests 40 --rate 0.5 --concurrency 4 \\
+        --mock-hosts 2 --prefill-tps 800 --decode-tps 40 --parallel 2
+    python -m rag.evaluation.load_test --mode jobs --hosts http://gpu-1:11434
+
+The pipeline indexes every synthetic JD into the active profile's tenant;
+those chunks (and only those, matched by ``jd_hash``) are deleted afterwards
+unless ``--keep-chunks`` is given. ``--deadline-s`` applies in both modes.
+The Streamlit app has no HTTP API, so "over the wire" here means the job
+queue + worker pool, and the HTTP hop to (mock) Ollama.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from rag.config.settings import LLM_MAX_CONCURRENCY_PER_HOST
+from rag.utils.text import HARD_SKILL_LEXICON, SOFT_SKILL_LEXICON
+
+ROLES = ["Machine Learning Engineer", "AI Engineer", "Data Scientist", "MLOps Engineer", "Applied Scientist"]
+COMPANIES = ["Acme Robotics", "Northwind AI", "Globex", "Initech Labs", "Umbrella Health", "Stark Analytics"]
+DUTIES = [
+    "design, train and deploy {a} models for production use",
+    "build retrieval pipelines with {a} and {b}",
+    "own the evaluation and monitoring of {a} services",
+    "collaborate with product teams to ship {a} features",
+    "optimise inference latency and cost on {a}",
+    "maintain CI/CD and infrastructure for {a} workloads",
+]
+
+
+def synthetic_jd(rng: random.Random) -> str:
+    """A plausible, unique JD (so package reuse never short-circuits the run)."""
+    hard = rng.sample(sorted(HARD_SKILL_LEXICON), 8)
+    soft = rng.sample(sorted(SOFT_SKILL_LEXICON), 3)
+    role, company = rng.choice(ROLES), rng.choice(COMPANIES)
+    duties = [d.format(a=rng.choice(hard), b=rng.choice(hard)) for d in rng.sample(DUTIES, 4)]
+    return "\n".join(
+        [
+            f"{role} - {company} (req #{rng.randrange(10**6):06d})",
+            "",
+            "About the role",
+            f"{company} is growing its team and hiring an experienced {role}.",
+            "",
+            "Responsibilities",
+            *[f"- {d[0].upper()}{d[1:]}." for d in duties],
+            "",
+            "Requirements",
+            *[f"- {rng.randint(2, 6)}+ years with {skill}." for skill in hard[:5]],
+            f"- Familiarity with {', '.join(hard[5:])}.",
+            f"- Strong {', '.join(s.lower() for s in soft)} skills.",
+        ]
+    )
+
+
+@dataclass
+class Sample:
+    ok: bool
+    queue_wait_s: float
+    total_s: float
+    timings: Dict[str, float] = field(default_factory=dict)
+    partial: bool = False
+    error: Optional[str] = None
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    arr = np.asarray(values, dtype=float)
+    return {
+        "n": len(values),
+        "p50": float(np.percentile(arr, 50)),
+        "p95": float(np.percentile(arr, 95)),
+        "p99": float(np.percentile(arr, 99)),
+        "max": float(arr.max()),
+    }
+
+
+def arrival_times(n: int, rate: float, rng: random.Random) -> List[float]:
+    """Offsets (seconds) of ``n`` Poisson arrivals at ``rate`` per second; all at 0 if rate <= 0."""
+    t, out = 0.0, []
+    for _ in range(n):
+        out.append(t)
+        if rate > 0:
+            t += rng.expovariate(rate)
+    return out
+
+
+def run_inprocess(jds: List[str], offsets: List[float], concurrency: int, deadline_s: Optional[float]) -> List[Sample]:
+    from rag.generation.generator import generate_application_package
+
+    samples: List[Sample] = []
+    lock = threading.Lock()
+
+    def serve(jd: str, arrived: float) -> None:
+        started = time.perf_counter()
+        try:
+            result = generate_application_package(jd, deadline_s=deadline_s, reuse=False)
+            sample = Sample(True, started - arrived, time.perf_counter() - arrived, result["timings"], result["partial"])
+        except Exception as exc:
+            sample = Sample(False, started - arrived, time.perf_counter() - arrived, error=f"{type(exc).__name__}: {exc}")
+        with lock:
+            samples.append(sample)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load") as pool:
+        for jd, offset in zip(jds, offsets):
+            delay = t0 + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(serve, jd, time.perf_counter())
+    return samples
+
+
+def run_jobs(
+    jds: List[str], offsets: List[float], concurrency: int, workdir: Path, deadline_s: Optional[float]
+) -> List[Sample]:
+    from rag.jobs import FINAL_STATUSES, SUCCEEDED, JobQueue, WorkerPool
+
+    queue = JobQueue(db_path=workdir / "jobs.sqlite3", results_dir=workdir / "results")
+    pool = WorkerPool(queue, workers=concurrency, poll_interval_s=0.05).start()
+    ids: List[str] = []
+    try:
+        t0 = time.perf_counter()
+        for jd, offset in zip(jds, offsets):
+            delay = t0 + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            payload: Dict[str, Any] = {"jd_text": jd, "reuse": False}
+            if deadline_s is not None:
+                # The worker builds the job's CancelToken from this.
+                payload["deadline_s"] = deadline_s
+            ids.append(queue.submit(payload, max_attempts=1))
+        pending = set(ids)
+        while pending:
+            time.sleep(0.2)
+            pending = {i for i in pending if queue.get(i).status not in FINAL_STATUSES}
+    finally:
+        pool.stop()
+
+    samples = []
+    for job_id in ids:
+        job = queue.get(job_id)
+        started = job.started_at or job.finished_at or job.created_at
+        sample = Sample(
+            ok=job.status == SUCCEEDED,
+            queue_wait_s=started - job.created_at,
+            total_s=(job.finished_at or time.time()) - job.created_at,
+            error=job.error,
+        )
+        if sample.ok:
+            result = queue.load_result(job_id) or {}
+            sample.timings = result.get("timings", {})
+            sample.partial = result.get("partial", False)
+        samples.append(sample)
+    return samples
+
+
+def report(samples: List[Sample], wall_s: float) -> Dict[str, Any]:
+    ok = [s for s in samples if s.ok]
+    stages: Dict[str, List[float]] = defaultdict(list)
+    for s in ok:
+        stages["queue_wait"].append(s.queue_wait_s)
+        for name, value in s.timings.items():
+            if name != "total":
+                stages[name].append(value)
+        stages["end_to_end"].append(s.total_s)
+    errors: Dict[str, int] = defaultdict(int)
+    for s in samples:
+        if not s.ok:
+            errors[(s.error or "unknown").splitlines()[0][:120]] += 1
+    return {
+        "requests": len(samples),
+        "succeeded": len(ok),
+        "partial": sum(s.partial for s in ok),
+        "failed": len(samples) - len(ok),
+        "wall_s": wall_s,
+        "throughput_rps": len(ok) / wall_s if wall_s else 0.0,
+        "stages": {name: _percentiles(values) for name, values in stages.items()},
+        "errors": dict(errors),
+    }
+
+
+def print_report(rep: Dict[str, Any]) -> None:
+    print(
+        f"requests={rep['requests']} ok={rep['succeeded']} partial={rep['partial']} failed={rep['failed']} "
+        f"wall={rep['wall_s']:.1f}s throughput={rep['throughput_rps']:.3f} req/s "
+        f"({rep['throughput_rps'] * 60:.1f}/min)"
+    )
+    print(f"{'stage':<16} {'n':>5} {'p50_s':>8} {'p95_s':>8} {'p99_s':>8} {'max_s':>8}")
+    for name, p in rep["stages"].items():
+        print(f"{name:<16} {p['n']:>5} {p['p50']:>8.3f} {p['p95']:>8.3f} {p['p99']:>8.3f} {p['max']:>8.3f}")
+    for error, count in rep["errors"].items():
+        print(f"  {count}x {error}")
+
+
+def _point_llm_at(hosts: List[str], host_concurrency: int) -> None:
+    """Make the shared LLM client talk to ``hosts`` for the rest of this process."""
+    from rag.models.llm.host_pool import HostPool
+    from rag.models.llm.ollama_client import OllamaClient
+    from rag.resources import REGISTRY
+
+    REGISTRY.register("llm", lambda: OllamaClient(pool=HostPool(hosts, max_concurrency=host_concurrency)))
+    REGISTRY.reset("llm")
+
+
+def _delete_run_chunks(jds: List[str]) -> int:
+    """Delete the chunks indexed for the synthetic JDs (matched by ``jd_hash``, not by time)."""
+    from rag.profile import load_profile, profile_tenant
+    from rag.utils.fingerprint import content_hash
+    from rag.vectorstore.factory import get_vector_store
+
+    store = get_vector_store(profile_tenant(load_profile()))
+    hashes = sorted({content_hash(jd) for jd in jds})
+    where = {"$and": [{"doc_type": "jd"}, {"jd_hash": {"$in": hashes}}]}
+    ids = store.get(where=where)["ids"]
+    if ids:
+        store.delete(ids=ids)
+    return len(ids)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Load-test the application-package pipeline.")
+    ap.add_argument("--mode", choices=["inprocess", "jobs"], default="inprocess")
+    ap.add_argument("--requests", type=int, default=20)
+    ap.add_argument("--rate", type=float, default=0.5, help="Mean arrivals per second (Poisson); 0 = all at once.")
+    ap.add_argument("--concurrency", type=int, default=4, help="Worker threads serving requests.")
+    ap.add_argument("--deadline-s", type=float, default=None)
+    ap.add_argument("--seed", type=int, default=0)
+    llm = ap.add_mutually_exclusive_group()
+    llm.add_argument("--hosts", nargs="+", default=None, help="Real Ollama hosts instead of mock servers.")
+    llm.add_argument("--mock-hosts", type=int, default=1)
+    ap.add_argument("--host-concurrency", type=int, default=LLM_MAX_CONCURRENCY_PER_HOST)
+    ap.add_argument("--prefill-tps", type=float, default=800.0)
+    ap.add_argument("--decode-tps", type=float, default=40.0)
+    ap.add_argument("--parallel", type=int, default=1, help="Requests each mock host processes at once.")
+    ap.add_argument("--reply-tokens", type=int, default=250)
+    ap.add_argument("--keep-chunks", action="store_true")
+    ap.add_argument("--json", type=Path, default=None, help="Also write the report here.")
+    args = ap.parse_args()
+
+    servers = []
+    hosts = args.hosts
+    if hosts is None:
+        from rag.tests.mock_ollama import start_mock_server
+
+        servers = [
+            start_mock_server(
+                prefill_tps=args.prefill_tps,
+                decode_tps=args.decode_tps,
+                parallel=args.parallel,
+                reply_tokens=args.reply_tokens,
+            )
+            for _ in range(args.mock_hosts)
+        ]
+        hosts = [s.url for s in servers]
+    _point_llm_at(hosts, args.host_concurrency)
+
+    rng = random.Random(args.seed)
+    jds = [synthetic_jd(rng) for _ in range(args.requests)]
+    offsets = arrival_times(args.requests, args.rate, rng)
+    print(
+        f"mode={args.mode} requests={args.requests} rate={args.rate}/s concurrency={args.concurrency} "
+        f"hosts={len(hosts)}x{args.host_concurrency}"
+        + (f" mock(prefill={args.prefill_tps}tps decode={args.decode_tps}tps parallel={args.parallel})" if servers else "")
+    )
+
+    start = time.perf_counter()
+    if args.mode == "jobs":
+        with tempfile.TemporaryDirectory() as tmp:
+            samples = run_jobs(jds, offsets, args.concurrency, Path(tmp), args.deadline_s)
+    else:
+        samples = run_inprocess(jds, offsets, args.concurrency, args.deadline_s)
+    rep = report(samples, time.perf_counter() - start)
+    if servers:
+        rep["mock"] = [
+            {"url": s.url, "requests": s.config.requests, "max_inflight": s.config.max_inflight} for s in servers
+        ]
+    print_report(rep)
+    if not args.keep_chunks:
+        print(f"Removed {_delete_run_chunks(jds)} synthetic JD chunks")
+    if args.json:
+        args.json.write_text(json.dumps(rep, indent=2), encoding="utf-8")
+    for server in servers:
+        server.shutdown()
+
+
+__all__ = ["arrival_times", "report", "run_inprocess", "run_jobs", "synthetic_jd"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+from rag.evaluation.metrics.retrieval import (
+    LabelledQuery,
+    RankingScores,
+    load_labelled_queries,
+    normalize,
+    recall_at_k,
+    reciprocal_rank,
+)
+
+__all__ = [
+    "LabelledQuery",
+    "RankingScores",
+    "load_labelled_queries",
+    "normalize",
+    "recall_at_k",
+    "reciprocal_rank",
+]
@@ -0,0 +1,94 @@
+"""
+retrieval.py
+Ranking metrics for labelled retrieval queries.
+
+Chunk ids change whenever the chunking changes, so relevance is expressed as
+text: a query lists the ``expected`` passages, and a retrieved chunk is
+relevant to a passage when it contains it (whitespace and case-insensitive).
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+@dataclass
+class LabelledQuery:
+    query: str
+    expected: List[str]
+    doc_type: Optional[str] = None
+
+    def __post_init__(self):
+        self._norm = [normalize(e) for e in self.expected]
+
+    def matches(self, chunk: str) -> List[int]:
+        """Indices of the expected passages contained in ``chunk``."""
+        text = normalize(chunk)
+        return [i for i, e in enumerate(self._norm) if e in text]
+
+
+def load_labelled_queries(path: Path) -> List[LabelledQuery]:
+    """
+    JSONL, one query per line: ``{"query": ..., "expected": [passage, ...]}``
+    (``"answer": passage`` is accepted too) and an optional ``"doc_type"``.
+    """
+    queries = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        expected = row.get("expected") or [row["answer"]]
+        queries.append(LabelledQuery(row["query"], list(expected), row.get("doc_type")))
+    return queries
+
+
+def recall_at_k(query: LabelledQuery, chunks: Sequence[str], k: int) -> float:
+    """Fraction of the expected passages found in the top ``k`` chunks."""
+    found = set()
+    for chunk in chunks[:k]:
+        found.update(query.matches(chunk))
+    return len(found) / len(query.expected) if query.expected else 0.0
+
+
+def reciprocal_rank(query: LabelledQuery, chunks: Sequence[str], k: int) -> float:
+    """1 / rank of the first chunk containing any expected passage (0 if none in the top ``k``)."""
+    for rank, chunk in enumerate(chunks[:k], 1):
+        if query.matches(chunk):
+            return 1.0 / rank
+    return 0.0
+
+
+@dataclass
+class RankingScores:
+    k: int
+    recall: List[float] = field(default_factory=list)
+    rr: List[float] = field(default_factory=list)
+
+    def add(self, query: LabelledQuery, chunks: Sequence[str]) -> None:
+        self.recall.append(recall_at_k(query, chunks, self.k))
+        self.rr.append(reciprocal_rank(query, chunks, self.k))
+
+    def as_dict(self) -> Dict[str, float]:
+        n = len(self.recall)
+        return {
+            f"recall@{self.k}": sum(self.recall) / n if n else 0.0,
+            f"mrr@{self.k}": sum(self.rr) / n if n else 0.0,
+            "hit_rate": sum(r > 0 for r in self.rr) / n if n else 0.0,
+        }
+
+
+__all__ = [
+    "LabelledQuery",
+    "RankingScores",
+    "load_labelled_queries",
+    "normalize",
+    "recall_at_k",
+    "reciprocal_rank",
+]
@@ -0,0 +1,237 @@
+"""
+sweep_retrieval.py
+Sweep chunking and top-k settings against a labelled query set.
+
+For every chunking configuration the documents are chunked and embedded into
+a throwaway numpy store (exact search, so the numbers reflect chunking and k
+rather than ANN recall), then every labelled query is retrieved the way the
+pipeline does it (over-fetch + near-duplicate suppression unless
+``--no-dedup``). Reported per (chunking, k):
+
+- quality: recall@k, MRR@k, hit rate (see :mod:`rag.evaluation.metrics`);
+- cost: chunks, embedded tokens, index size, ingestion time, query latency
+  (p50/p95, embed + search) and context tokens per query (what the k
+  snippets add to the prompt).
+
+With ``--min-recall`` / ``--min-mrr`` the cheapest configuration meeting the
+bar (by ``--cost``) is printed as a settings.yaml snippet.
+
+    python -m rag.evaluation.sweep_retrieval --queries data/eval/retrieval.jsonl --min-recall 0.8
+    python -m rag.evaluation.sweep_retrieval --queries q.jsonl --splitters recursive \\
+        --chunk-sizes 400 800 --chunk-overlaps 0 100 --k 3 5 8 --json sweep.json
+
+Queries file: JSONL ``{"query": ..., "expected": ["passage", ...], "doc_type": "profile"}``.
+Without ``--queries`` sentences sampled from the documents are used as
+self-labelled probes (a rough signal only).
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from rag.config.settings import DEDUP_ENABLED, DEDUP_FETCH_MULTIPLIER, PROFILE_DOC_DIR
+from rag.evaluation.bench_chunking import sample_queries
+from rag.evaluation.metrics import LabelledQuery, RankingScores, load_labelled_queries
+from rag.ingestion.chunking.text_splitter import build_splitter
+from rag.ingestion.chunking.tokens import count_tokens
+from rag.ingestion.ingest import load_docs_from
+from rag.models.embedding_model.factory import get_embeddings
+from rag.retrieval.dedup import dedupe_docs
+from rag.retrieval.retriever import format_docs
+from rag.utils.text import estimate_tokens
+from rag.vectorstore.clients.numpy_store import NumpyStore
+
+COSTS = ["context_tokens", "embedded_tokens", "index_bytes", "p50_ms"]
+
+
+@dataclass(frozen=True)
+class ChunkConfig:
+    splitter: str
+    size: int
+    overlap: int
+    # Structured chunking is per doc_type; the swept sizes apply to this key.
+    doc_type: str = "default"
+
+    @property
+    def label(self) -> str:
+        unit = "tok" if self.splitter == "structured" else "ch"
+        return f"{self.splitter}:{self.size}{unit}/{self.overlap}"
+
+    def build(self):
+        if self.splitter == "structured":
+            return build_splitter(
+                "structured", strategies={self.doc_type: {"max_tokens": self.size, "overlap_tokens": self.overlap}}
+            )
+        return build_splitter("recursive", chunk_size=self.size, chunk_overlap=self.overlap)
+
+    def settings_snippet(self, k: int) -> str:
+        if self.splitter == "structured":
+            chunking = (
+                f"  splitter: structured\n  chunking:\n"
+                f"    {self.doc_type}: {{max_tokens: {self.size}, overlap_tokens: {self.overlap}}}\n"
+            )
+        else:
+            chunking = f"  splitter: recursive\n  chunk_size: {self.size}\n  chunk_overlap: {self.overlap}\n"
+        return f"rag:\n{chunking}  top_k: {k}\n  package_top_k: {k}"
+
+
+def chunk_configs(args: argparse.Namespace) -> List[ChunkConfig]:
+    configs = []
+    if "structured" in args.splitters:
+        for size, overlap in itertools.product(args.max_tokens, args.overlap_tokens):
+            if overlap < size:
+                configs.append(ChunkConfig("structured", size, overlap, args.doc_type))
+    if "recursive" in args.splitters:
+        for size, overlap in itertools.product(args.chunk_sizes, args.chunk_overlaps):
+            if overlap < size:
+                configs.append(ChunkConfig("recursive", size, overlap, args.doc_type))
+    return configs
+
+
+def evaluate_config(
+    config: ChunkConfig,
+    docs,
+    queries: List[LabelledQuery],
+    ks: List[int],
+    dedup: bool,
+) -> List[Dict[str, Any]]:
+    """One row per k for a chunking configuration."""
+    embeddings = get_embeddings()
+    with tempfile.TemporaryDirectory(prefix="sweep-") as tmp:
+        store = NumpyStore(Path(tmp), embedding_function=embeddings)
+        start = time.perf_counter()
+        chunks = config.build().split_documents(docs)
+        store.add_documents(chunks)
+        ingest_s = time.perf_counter() - start
+        index_bytes = store.storage_bytes()
+
+        k_max = max(ks)
+        fetch = k_max * DEDUP_FETCH_MULTIPLIER if dedup else k_max
+        latencies: List[float] = []
+        scores = {k: RankingScores(k) for k in ks}
+        context_tokens: Dict[int, List[int]] = {k: [] for k in ks}
+        for query in queries:
+            t0 = time.perf_counter()
+            vector = embeddings.embed_query(query.query)
+            where = {"doc_type": query.doc_type} if query.doc_type else None
+            candidates = store.similarity_search_by_vector(vector, k=fetch, filter=where)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            for k in ks:
+                docs_k = dedupe_docs(candidates, k)[0] if dedup else candidates[:k]
+                scores[k].add(query, [d.page_content for d in docs_k])
+                context_tokens[k].append(estimate_tokens(format_docs(docs_k)))
+
+    base = {
+        "config": config.label,
+        "splitter": config.splitter,
+        "size": config.size,
+        "overlap": config.overlap,
+        "chunks": len(chunks),
+        "embedded_tokens": sum(count_tokens(c.page_content) for c in chunks),
+        "index_bytes": index_bytes,
+        "ingest_s": ingest_s,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+    }
+    rows = []
+    for k in ks:
+        quality = scores[k].as_dict()
+        rows.append(
+            {
+                **base,
+                "k": k,
+                "recall": quality[f"recall@{k}"],
+                "mrr": quality[f"mrr@{k}"],
+                "hit_rate": quality["hit_rate"],
+                "context_tokens": float(np.mean(context_tokens[k])),
+            }
+        )
+    return rows
+
+
+def pick_cheapest(rows: List[Dict[str, Any]], min_recall: float, min_mrr: float, cost: str) -> Optional[Dict[str, Any]]:
+    """Cheapest row meeting the quality bar; ties go to higher recall, then MRR."""
+    passing = [r for r in rows if r["recall"] >= min_recall and r["mrr"] >= min_mrr]
+    if not passing:
+        return None
+    return min(passing, key=lambda r: (r[cost], -r["recall"], -r["mrr"]))
+
+
+def print_rows(rows: List[Dict[str, Any]]) -> None:
+    print(
+        f"{'config':<24} {'k':>3} {'recall':>7} {'mrr':>6} {'chunks':>7} {'emb_tok':>8} {'idx_kb':>8} "
+        f"{'ingest_s':>8} {'p50_ms':>7} {'p95_ms':>7} {'ctx_tok':>8}"
+    )
+    for r in rows:
+        print(
+            f"{r['config']:<24} {r['k']:>3} {r['recall']:>7.3f} {r['mrr']:>6.3f} {r['chunks']:>7} "
+            f"{r['embedded_tokens']:>8} {r['index_bytes'] / 1024:>8.0f} {r['ingest_s']:>8.2f} "
+            f"{r['p50_ms']:>7.1f} {r['p95_ms']:>7.1f} {r['context_tokens']:>8.0f}"
+        )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Sweep chunking and k against labelled retrieval queries.")
+    ap.add_argument("--docs", type=Path, default=PROFILE_DOC_DIR)
+    ap.add_argument("--doc-type", default="profile", help="doc_type stamped on the documents.")
+    ap.add_argument("--queries", type=Path, default=None, help="Labelled JSONL (see module docstring).")
+    ap.add_argument("--n-queries", type=int, default=100, help="Sampled probes when --queries is not given.")
+    ap.add_argument("--splitters", nargs="+", default=["structured", "recursive"], choices=["structured", "recursive"])
+    ap.add_argument("--max-tokens", type=int, nargs="+", default=[96, 128, 200, 256])
+    ap.add_argument("--overlap-tokens", type=int, nargs="+", default=[0, 16])
+    ap.add_argument("--chunk-sizes", type=int, nargs="+", default=[400, 800, 1200])
+    ap.add_argument("--chunk-overlaps", type=int, nargs="+", default=[0, 200])
+    ap.add_argument("--k", type=int, nargs="+", default=[3, 4, 6, 8])
+    ap.add_argument("--no-dedup", dest="dedup", action="store_false", default=DEDUP_ENABLED)
+    ap.add_argument("--min-recall", type=float, default=0.8)
+    ap.add_argument("--min-mrr", type=float, default=0.0)
+    ap.add_argument("--cost", choices=COSTS, default="context_tokens", help="What 'cheapest' minimises.")
+    ap.add_argument("--json", type=Path, default=None, help="Also write all rows here.")
+    args = ap.parse_args()
+
+    docs = load_docs_from(args.docs, args.doc_type)
+    if not docs:
+        raise SystemExit(f"No documents found in {args.docs}")
+    if args.queries:
+        queries = load_labelled_queries(args.queries)
+    else:
+        print("No --queries given: using sentences sampled from the documents as probes.")
+        queries = [LabelledQuery(q, [a]) for q, a in sample_queries(docs, args.n_queries)]
+    configs = chunk_configs(args)
+    ks = sorted(set(args.k))
+    print(f"docs={len(docs)} queries={len(queries)} configs={len(configs)} k={ks} dedup={args.dedup}")
+
+    rows: List[Dict[str, Any]] = []
+    for config in configs:
+        rows.extend(evaluate_config(config, docs, queries, ks, args.dedup))
+    print_rows(rows)
+
+    best = pick_cheapest(rows, args.min_recall, args.min_mrr, args.cost)
+    if best is None:
+        print(f"\nNo configuration reaches recall >= {args.min_recall} and MRR >= {args.min_mrr}.")
+    else:
+        print(
+            f"\nCheapest by {args.cost} with recall >= {args.min_recall} and MRR >= {args.min_mrr}: "
+            f"{best['config']} k={best['k']} (recall {best['recall']:.3f}, MRR {best['mrr']:.3f}, "
+            f"{best['context_tokens']:.0f} context tokens)\n"
+        )
+        config = ChunkConfig(best["splitter"], best["size"], best["overlap"], args.doc_type)
+        print(config.settings_snippet(best["k"]))
+    if args.json:
+        args.json.write_text(json.dumps({"rows": rows, "best": best}, indent=2), encoding="utf-8")
+
+
+__all__ = ["ChunkConfig", "evaluate_config", "pick_cheapest"]
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ from rag.generation.generator import (
     gen_cover,
     gen_emails,
     gen_ats,
+    prepare_inputs,
     generate_application_package,
     generate_all_from_jd,
 )
@@ -12,6 +13,7 @@ __all__ = [
     "gen_cover",
     "gen_emails",
     "gen_ats",
+    "prepare_inputs",
     "generate_application_package",
     "generate_all_from_jd",
 ]
@@ -5,11 +5,27 @@ Construct the composite context block fed into generation prompts.
 
 from __future__ import annotations
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from rag.utils.text import bullet_list
 
 
+def render_profile_block(profile: Dict) -> str:
+    """The JD-independent ``[PROFILE]`` block (precompiled per profile version)."""
+    return f"""[PROFILE]
+Name: {profile.get('name', '')} | Title: {profile.get('title', '')} | Location: {profile.get('location', '')}
+Email: {profile.get('email', '')} | Phone: {profile.get('phone', '')} | Links: {", ".join(profile.get('links', []))}
+
+Pitch:
+{profile.get('pitch', '')}
+
+Skills:
+{bullet_list(profile.get('skills', []))}
+
+Achievements:
+{bullet_list(profile.get('achievements', []))}"""
+
+
 def build_context(
     profile: Dict,
     jd_text: str,
@@ -21,21 +37,16 @@ def build_context(
     have_hard: List[str],
     have_soft: List[str],
     gaps: List[str],
+    profile_block: Optional[str] = None,
 ) -> str:
-    """Combine profile, JD, snippets, keywords, and alignment summary."""
+    """
+    Combine profile, JD, snippets, keywords, and alignment summary.
+    ``profile_block`` is the pre-rendered ``[PROFILE]`` block when available.
+    """
+    if profile_block is None:
+        profile_block = render_profile_block(profile)
     return f"""
-[PROFILE]
-Name: {profile['name']} | Title: {profile['title']} | Location: {profile['location']}
-Email: {profile['email']} | Phone: {profile['phone']} | Links: {", ".join(profile['links'])}
-
-Pitch:
-{profile['pitch']}
-
-Skills:
-{bullet_list(profile['skills'])}
-
-Achievements:
-{bullet_list(profile['achievements'])}
+{profile_block}
 
 [JOB_DESCRIPTION_RAW]
 {jd_text}
@@ -58,4 +69,4 @@ Gaps to phrase carefully: {", ".join(gaps)}
 """
 
 
-__all__ = ["build_context"]
+__all__ = ["build_context", "render_profile_block"]
@@ -5,105 +5,310 @@ High-level generation helpers and the overall application workflow.
 
 from __future__ import annotations
 
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Any
-
-from rag.config.settings import OUT_DIR
-from rag.profile import load_profile
-from rag.utils.exceptions import ProfileNotConfiguredError
-from rag.ingestion.ingest import index_profile_docs, index_jd_text
-from rag.retrieval.retriever import retrieve, format_docs
-from rag.ingestion.preprocessing.keywords import extract_keywords, compute_alignment
+from typing import Dict, Any, Iterator, List, Optional
+
+from rag.config.settings import OUT_DIR, GENERATION_DEADLINE_S, PACKAGE_TOP_K, REUSE_ENABLED
+from rag.profile import get_compiled_profile, load_profile, profile_tenant
+from rag.utils.cancellation import CancelToken
+from rag.utils.exceptions import ProfileNotConfiguredError, DeadlineExceeded
+from rag.utils.fingerprint import content_hash
+from rag.utils.logging import logger
+from rag.utils.profiling import profiled
+from rag.ingestion.ingest import index_jd_text, jd_where
+from rag.ingestion.watcher import ensure_profile_index
+from rag.retrieval.dedup import DedupStats
+from rag.retrieval.retriever import retrieve_many_with_stats, format_docs
 from rag.generation.context_builder import build_context
+from rag.generation.speculative import take_prepared
+from rag.generation.reuse import extract, get_package_store, input_signatures, profile_key, section_versions
 from rag.models.llm.ollama_client import run_prompt
 from rag.generation.prompts.templates import (
     SYSTEM_SKILLS,
     SYSTEM_COVER,
     SYSTEM_EMAILS,
     SYSTEM_ATS,
+    SECTION_OPTIONS,
 )
 
 
-def gen_skills(context: str) -> str:
-    return run_prompt(SYSTEM_SKILLS, context)
+def gen_skills(context: str, token: Optional[CancelToken] = None) -> str:
+    return run_prompt(
+        SYSTEM_SKILLS,
+        context,
+        token=token,
+        options=SECTION_OPTIONS["skills"].as_ollama_options(),
+        stop=SECTION_OPTIONS["skills"].stop,
+        name="skills",
+    )
+
+
+def gen_cover(context: str, token: Optional[CancelToken] = None) -> str:
+    return run_prompt(
+        SYSTEM_COVER,
+        context,
+        token=token,
+        options=SECTION_OPTIONS["cover"].as_ollama_options(),
+        stop=SECTION_OPTIONS["cover"].stop,
+        name="cover",
+    )
+
+
+def gen_emails(context: str, token: Optional[CancelToken] = None) -> str:
+    return run_prompt(
+        SYSTEM_EMAILS,
+        context,
+        token=token,
+        options=SECTION_OPTIONS["emails"].as_ollama_options(),
+        stop=SECTION_OPTIONS["emails"].stop,
+        name="emails",
+    )
+
+
+def gen_ats(context: str, token: Optional[CancelToken] = None) -> str:
+    return run_prompt(
+        SYSTEM_ATS,
+        context,
+        token=token,
+        options=SECTION_OPTIONS["ats"].as_ollama_options(),
+        stop=SECTION_OPTIONS["ats"].stop,
+        name="ats",
+    )
+
+
+# Section key -> (generator, output file suffix), in generation order.
+SECTION_GENERATORS = {
+    "skills": (gen_skills, "skills_keywords"),
+    "cover": (gen_cover, "cover_letter"),
+    "emails": (gen_emails, "emails"),
+    "ats": (gen_ats, "ats_summary"),
+}
+
+
+@contextmanager
+def _stage(timings: Dict[str, float], name: str) -> Iterator[None]:
+    """Record the wall time of one pipeline stage in ``timings`` (seconds)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round(time.perf_counter() - start, 4)
 
 
-def gen_cover(context: str) -> str:
-    return run_prompt(SYSTEM_COVER, context)
+def _save_sections(result: Dict[str, Any], completed: List[str]) -> None:
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    for name in completed:
+        suffix = SECTION_GENERATORS[name][1]
+        (OUT_DIR / f"{ts}_{suffix}.md").write_text(result[name], encoding="utf-8")
 
 
-def gen_emails(context: str) -> str:
-    return run_prompt(SYSTEM_EMAILS, context)
+def prepare_inputs(
+    jd_text: str,
+    profile: Dict[str, Any],
+    token: Optional[CancelToken] = None,
+    extraction: Optional[Dict[str, Any]] = None,
+    timings: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    The non-LLM stages for ``jd_text``: extraction (unless ``extraction`` is
+    given), profile index freshness, JD indexing, retrieval and the context
+    block. Run inline by :func:`generate_application_package` or ahead of the
+    request by :mod:`rag.generation.speculative`.
+    """
+    if token is None:
+        token = CancelToken()
+    if timings is None:
+        timings = {}
+    if extraction is None:
+        with _stage(timings, "extract"):
+            extraction = extract(jd_text, profile)
+
+    tenant = profile_tenant(profile)
+    token.check()
+    with _stage(timings, "index_profile"):
+        profile_index = ensure_profile_index(tenant)
+    token.check()
+    with _stage(timings, "index_jd"):
+        jd_chunks = index_jd_text(jd_text, tenant)
 
+    with _stage(timings, "retrieve"):
+        (jd_focus, jd_stats), (profile_focus, profile_stats) = retrieve_many_with_stats(
+            [
+                "List must-have requirements and responsibilities.",
+                "Find bullets that prove impact, results, metrics.",
+            ],
+            k=PACKAGE_TOP_K,
+            # Other JDs of the tenant (drafts, other sessions) share the collection.
+            filters=[jd_where(content_hash(jd_text)), {"doc_type": "profile"}],
+            token=token,
+            tenant=tenant,
+        )
+    retrieval = DedupStats().add(jd_stats).add(profile_stats)
+    logger.info(
+        "Retrieval dedup: %d dropped, %d merged, ~%d prompt tokens saved",
+        retrieval.dropped,
+        retrieval.merged,
+        retrieval.tokens_saved,
+    )
+    rag_jd = format_docs(jd_focus)
+    rag_profile = format_docs(profile_focus)
 
-def gen_ats(context: str) -> str:
-    return run_prompt(SYSTEM_ATS, context)
+    with _stage(timings, "context"):
+        ctx = build_context(
+            profile,
+            jd_text,
+            rag_jd,
+            rag_profile,
+            extraction["jd_hard"],
+            extraction["jd_soft"],
+            extraction["keywords"],
+            extraction["have_hard"],
+            extraction["have_soft"],
+            extraction["gaps"],
+            profile_block=get_compiled_profile(profile).profile_block,
+        )
+    return {
+        "tenant": tenant,
+        "extraction": extraction,
+        "profile_index": profile_index,
+        "jd_chunks": jd_chunks,
+        "retrieval": retrieval.as_dict(),
+        "context": ctx,
+        "timings": timings,
+    }
 
 
-def generate_application_package(jd_text: str, save_to_disk: bool = False) -> Dict[str, Any]:
+@profiled
+def generate_application_package(
+    jd_text: str,
+    save_to_disk: bool = False,
+    token: Optional[CancelToken] = None,
+    deadline_s: Optional[float] = None,
+    reuse: bool = REUSE_ENABLED,
+) -> Dict[str, Any]:
     """
     Full workflow:
-    1. Index profile docs and this JD.
-    2. Retrieve focused snippets.
-    3. Extract skills/keywords + compute alignment.
-    4. Build the consolidated context block.
-    5. Generate skills, cover letter, emails, ATS summary.
+    1. Extract skills/keywords + compute alignment.
+    2. With ``reuse``, look up a package generated for a near-duplicate JD
+       (see :mod:`rag.generation.reuse`); if every section is reusable,
+       return it without indexing, retrieval or LLM calls.
+    3. Bring the profile index up to date (with the background watcher
+       running, only its freshness is recorded in ``result["profile_index"]``)
+       and index this JD.
+    4. Retrieve focused snippets.
+    5. Build the consolidated context block.
+    6. Generate skills, cover letter, emails, ATS summary (only the sections
+       that could not be reused).
+
+    Steps 1 and 3-5 are taken from :mod:`rag.generation.speculative` when
+    the UI already prepared this JD while it was being edited; ``result
+    ["speculative"]`` then records how long ago and how much time it saved.
+
+    ``token`` cancels the run (raising ``GenerationCancelled``). If the
+    request deadline (``deadline_s`` or ``GENERATION_DEADLINE_S``) expires,
+    the sections finished so far are returned with ``partial=True``.
+
+    ``result["timings"]`` holds the wall time of each stage that ran
+    (``extract``, ``reuse_lookup``, ``index_profile``, ``index_jd``,
+    ``retrieve``, ``context``, ``llm_<section>``) and the ``total``.
     """
+    started = time.perf_counter()
     profile = load_profile()
     if not profile:
         raise ProfileNotConfiguredError(
             "USER_PROFILE is not set. Use the UI profile settings or edit data/job_rag/profile_settings.json."
         )
 
-    index_profile_docs()
-    index_jd_text(jd_text)
+    if token is None:
+        token = CancelToken(GENERATION_DEADLINE_S if deadline_s is None else deadline_s)
 
-    jd_focus = retrieve("List must-have requirements and responsibilities.", k=6, doc_type="jd")
-    profile_focus = retrieve("Find bullets that prove impact, results, metrics.", k=6, doc_type="profile")
-    rag_jd = format_docs(jd_focus)
-    rag_profile = format_docs(profile_focus)
+    result: Dict[str, Any] = {
+        "context": "",
+        **{name: "" for name in SECTION_GENERATORS},
+        "jd_hard": [],
+        "jd_soft": [],
+        "keywords": [],
+        "have_hard": [],
+        "have_soft": [],
+        "gaps": [],
+        "partial": False,
+        "missing_sections": [],
+        "retrieval": {},
+        "profile_index": {},
+        "reused": {},
+        "speculative": {},
+        "timings": {},
+    }
+    timings = result["timings"]
+    completed: List[str] = []
+    match = None
 
-    jd_hard, jd_soft, keywords = extract_keywords(jd_text)
-    have_hard, have_soft, gaps = compute_alignment(profile.get("skills", []), jd_hard, jd_soft)
-
-    ctx = build_context(
-        profile,
-        jd_text,
-        rag_jd,
-        rag_profile,
-        jd_hard,
-        jd_soft,
-        keywords,
-        have_hard,
-        have_soft,
-        gaps,
-    )
+    try:
+        token.check()
+        prepared = take_prepared(jd_text, profile, token)
+        if prepared is not None:
+            extraction = prepared["extraction"]
+            result["speculative"] = {
+                "age_s": round(time.time() - prepared["prepared_at"], 1),
+                "saved_s": round(sum(prepared["timings"].values()), 4),
+            }
+        else:
+            with _stage(timings, "extract"):
+                extraction = extract(jd_text, profile)
+        result.update(extraction)
 
-    skills_out = gen_skills(ctx)
-    cover_out = gen_cover(ctx)
-    emails_out = gen_emails(ctx)
-    ats_out = gen_ats(ctx)
+        if reuse:
+            with _stage(timings, "reuse_lookup"):
+                store = get_package_store()
+                key = profile_key(profile)
+                signatures = input_signatures(extraction)
+                versions = section_versions()
+                match = store.find(jd_text, key, signatures, versions)
+        if match is not None:
+            for name in match.reusable:
+                result[name] = match.result[name]
+                completed.append(name)
+            result["reused"] = match.summary()
+            logger.info(
+                "Near-duplicate of package %d (distance %d): reusing %s",
+                match.package_id,
+                match.distance,
+                ", ".join(match.reusable) or "nothing",
+            )
+            if match.complete:
+                result.update(context=match.result.get("context", ""), retrieval=match.result.get("retrieval", {}))
+                if save_to_disk:
+                    _save_sections(result, completed)
+                timings["total"] = round(time.perf_counter() - started, 4)
+                return result
 
-    if save_to_disk:
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        (OUT_DIR / f"{ts}_skills_keywords.md").write_text(skills_out, encoding="utf-8")
-        (OUT_DIR / f"{ts}_cover_letter.md").write_text(cover_out, encoding="utf-8")
-        (OUT_DIR / f"{ts}_emails.md").write_text(emails_out, encoding="utf-8")
-        (OUT_DIR / f"{ts}_ats_summary.md").write_text(ats_out, encoding="utf-8")
+        if prepared is None:
+            prepared = prepare_inputs(jd_text, profile, token, extraction, timings)
+        ctx = prepared["context"]
+        result.update(context=ctx, retrieval=prepared["retrieval"], profile_index=prepared["profile_index"])
 
-    return {
-        "context": ctx,
-        "skills": skills_out,
-        "cover": cover_out,
-        "emails": emails_out,
-        "ats": ats_out,
-        "jd_hard": jd_hard,
-        "jd_soft": jd_soft,
-        "keywords": keywords,
-        "have_hard": have_hard,
-        "have_soft": have_soft,
-        "gaps": gaps,
-    }
+        for name, (gen, _) in SECTION_GENERATORS.items():
+            if name in completed:
+                continue
+            with _stage(timings, f"llm_{name}"):
+                result[name] = gen(ctx, token=token)
+            completed.append(name)
+        if reuse:
+            store.put(jd_text, key, result, signatures, versions)
+    except DeadlineExceeded:
+        result["partial"] = True
+        result["missing_sections"] = [name for name in SECTION_GENERATORS if name not in completed]
+        logger.warning(
+            "Generation deadline exceeded; returning partial package (missing: %s)",
+            ", ".join(result["missing_sections"]),
+        )
+
+    if save_to_disk:
+        _save_sections(result, completed)
+    timings["total"] = round(time.perf_counter() - started, 4)
+    return result
 
 
 # Backwards-compatible alias for legacy imports
@@ -115,6 +320,8 @@ __all__ = [
     "gen_cover",
     "gen_emails",
     "gen_ats",
+    "SECTION_GENERATORS",
+    "prepare_inputs",
     "generate_application_package",
     "generate_all_from_jd",
 ]
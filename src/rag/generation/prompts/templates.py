@@ -5,7 +5,14 @@ System prompts and builders for the Job Application Assistant.
 
 from __future__ import annotations
 
-from typing import Optional, Dict
+import hashlib
+import json
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Optional, Dict, Tuple
+
+from rag.utils.text import TOKENS_PER_WORD
 
 
 def build_basic_system_prompt(profile: Optional[Dict] = None) -> str:
@@ -42,6 +49,16 @@ def build_basic_system_prompt(profile: Optional[Dict] = None) -> str:
     )
 
 
+def profile_role_label(profile: Dict) -> str:
+    """Role the quick-answer pipeline tailors its replies to."""
+    return (
+        profile.get("target_role")
+        or profile.get("domain_focus")
+        or profile.get("role_preferences", {}).get("role_description")
+        or "AI/ML"
+    )
+
+
 SYSTEM_SKILLS = """
 You are a job-application copilot. From the context:
 1) HARD skills explicitly relevant to the JD and present in candidate/profile.
@@ -85,10 +102,86 @@ Keep to 80–120 words. Ground in [RETRIEVED_*]; no fabrications.
 """
 
 
+# ----------------------------------------------------------------------
+# Per-section generation options
+# ----------------------------------------------------------------------
+# TOKENS_PER_WORD (from rag.utils.text) is a prose average; the headroom covers
+# denser markdown output.
+TOKEN_HEADROOM = 1.2
+
+# Small models sometimes start echoing the context blocks once they are done.
+CONTEXT_ECHO_STOPS: Tuple[str, ...] = (
+    "\n[PROFILE]",
+    "\n[JOB_DESCRIPTION_RAW]",
+    "\n[RETRIEVED_",
+)
+
+_WORD_LIMIT_RE = re.compile(r"(?:<=\s*|\d+\s*[–-]\s*)?(\d+)\s*words")
+
+
+def word_budget(prompt: str) -> int:
+    """Sum the upper bounds of every "N words" / "A–B words" limit in a prompt."""
+    return sum(int(m) for m in _WORD_LIMIT_RE.findall(prompt))
+
+
+@dataclass(frozen=True)
+class GenerationOptions:
+    """Decode settings for one section; ``num_predict`` follows the word budget."""
+
+    max_words: int
+    temperature: float = 0.3
+    stop: Tuple[str, ...] = CONTEXT_ECHO_STOPS
+
+    @property
+    def num_predict(self) -> int:
+        return int(math.ceil(self.max_words * TOKENS_PER_WORD * TOKEN_HEADROOM))
+
+    def as_ollama_options(self) -> Dict[str, Any]:
+        """Decode options only; ``stop`` goes through the call's ``stop=`` (see ``OllamaClient.run``)."""
+        return {
+            "num_predict": self.num_predict,
+            "temperature": self.temperature,
+        }
+
+
+SECTION_OPTIONS: Dict[str, GenerationOptions] = {
+    # No explicit limit: three short bullet lists with up to 25 keywords.
+    "skills": GenerationOptions(max_words=300, temperature=0.2),
+    # Letter body plus the 'Relevant Highlights' list and sign-off.
+    "cover": GenerationOptions(max_words=word_budget(SYSTEM_COVER) + 60, temperature=0.4),
+    # Three bodies plus 2–3 subject lines and headers each.
+    "emails": GenerationOptions(
+        max_words=word_budget(SYSTEM_EMAILS) + 90,
+        stop=CONTEXT_ECHO_STOPS + ("=== Email 4 ===",),
+    ),
+    "ats": GenerationOptions(max_words=word_budget(SYSTEM_ATS) + 20, temperature=0.2),
+}
+
+SECTION_PROMPTS: Dict[str, str] = {
+    "skills": SYSTEM_SKILLS,
+    "cover": SYSTEM_COVER,
+    "emails": SYSTEM_EMAILS,
+    "ats": SYSTEM_ATS,
+}
+
+
+def prompt_version(section: str) -> str:
+    """Short hash of a section's system prompt and decode options."""
+    options = SECTION_OPTIONS[section]
+    payload = json.dumps([SECTION_PROMPTS[section], options.as_ollama_options(), list(options.stop)], sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
 __all__ = [
     "build_basic_system_prompt",
+    "profile_role_label",
     "SYSTEM_SKILLS",
     "SYSTEM_COVER",
     "SYSTEM_EMAILS",
     "SYSTEM_ATS",
+    "GenerationOptions",
+    "SECTION_OPTIONS",
+    "SECTION_PROMPTS",
+    "prompt_version",
+    "word_budget",
 ]
@@ -0,0 +1,349 @@
+"""
+reuse.py
+Near-duplicate JD detection and reuse of previously generated packages.
+
+Every finished package is stored with the JD's SimHash, the profile key
+(profile settings + profile documents), a prompt version per section and a
+signature of each section's non-LLM inputs. For a new JD under the same
+profile key, the closest stored JD within ``REUSE_MAX_DISTANCE`` bits is
+found through an LSH index, and each section is reused when
+
+- its prompt version (system prompt, decode options, model) is unchanged, and
+- its inputs did not materially change: the extracted skills/keywords for
+  ``skills`` and ``ats``; the JD text itself (within ``REUSE_TEXT_DISTANCE``
+  bits) for the cover letter and emails.
+
+The LSH index splits the 64-bit fingerprint into ``max_distance + 2`` bands
+and indexes every pair of bands. Two fingerprints within ``max_distance``
+bits share at least two untouched bands, so one pair lookup is guaranteed to
+hit, and each lookup only touches a bucket of ~N / 2^13 entries.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass, field
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from rag.config.settings import (
+    PROFILE_DOC_DIR,
+    REUSE_DB_PATH,
+    REUSE_MAX_DISTANCE,
+    REUSE_MAX_ENTRIES,
+    REUSE_TEXT_DISTANCE,
+)
+from rag.ingestion.preprocessing.keywords import compute_alignment, extract_keywords
+from rag.ingestion.preprocessing.semantic_skills import get_skill_matcher
+from rag.generation.prompts.templates import SECTION_PROMPTS, prompt_version
+from rag.profile.compiled import get_compiled_profile
+from rag.profile.service import profile_version
+from rag.utils.fingerprint import normalized_hash, hamming, simhash
+from rag.utils.helpers import ensure_dir
+
+# Bag-of-words fingerprint: a reworded re-post keeps nearly all of its words.
+JD_SHINGLE = 1
+
+# Section -> which input signature decides whether it can be reused.
+SECTION_INPUTS = {
+    "skills": "skills",
+    "ats": "ats",
+    "cover": "jd_text",
+    "emails": "jd_text",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS packages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    jd_hash TEXT NOT NULL,
+    simhash INTEGER NOT NULL,
+    profile_key TEXT NOT NULL,
+    prompt_versions TEXT NOT NULL,
+    signatures TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_packages_exact ON packages (profile_key, jd_hash);
+CREATE TABLE IF NOT EXISTS lsh (
+    tbl INTEGER NOT NULL,
+    key INTEGER NOT NULL,
+    package_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lsh ON lsh (tbl, key);
+CREATE INDEX IF NOT EXISTS idx_lsh_package ON lsh (package_id);
+CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT NOT NULL);
+"""
+
+
+def _to_signed(h: int) -> int:
+    return h - (1 << 64) if h >= 1 << 63 else h
+
+
+def _to_unsigned(h: int) -> int:
+    return h + (1 << 64) if h < 0 else h
+
+
+def jd_fingerprint(jd_text: str) -> int:
+    return simhash(jd_text, shingle=JD_SHINGLE)
+
+
+def lsh_keys(h: int, n_bands: int) -> List[Tuple[int, int]]:
+    """``(table, key)`` for every pair of bands of a 64-bit fingerprint."""
+    bounds = [round(i * 64 / n_bands) for i in range(n_bands + 1)]
+    bands = [(h >> lo) & ((1 << (hi - lo)) - 1) for lo, hi in zip(bounds, bounds[1:])]
+    widths = [hi - lo for lo, hi in zip(bounds, bounds[1:])]
+    return [(i * n_bands + j, (bands[i] << widths[j]) | bands[j]) for i, j in combinations(range(n_bands), 2)]
+
+
+def profile_docs_version(folder: Path = PROFILE_DOC_DIR) -> str:
+    """Changes whenever a profile document is added, removed or modified."""
+    entries = []
+    for path in sorted(folder.glob("*")):
+        if path.is_file():
+            st = path.stat()
+            entries.append(f"{path.name}:{st.st_size}:{st.st_mtime_ns}")
+    return hashlib.sha1("\n".join(entries).encode("utf-8")).hexdigest()[:16]
+
+
+def profile_key(profile: Dict[str, Any]) -> str:
+    return f"{profile_version(profile)}:{profile_docs_version()}"
+
+
+def section_versions() -> Dict[str, str]:
+    from rag.models.llm.ollama_client import LLM_MODEL
+
+    return {name: f"{prompt_version(name)}:{LLM_MODEL}" for name in SECTION_PROMPTS}
+
+
+def _digest(*parts: Sequence[str]) -> str:
+    return hashlib.sha1(json.dumps([sorted(p) for p in parts]).encode("utf-8")).hexdigest()[:16]
+
+
+def input_signatures(extraction: Dict[str, Any]) -> Dict[str, str]:
+    """Signatures of the non-LLM inputs the skills and ATS sections depend on."""
+    return {
+        "skills": _digest(
+            extraction["jd_hard"], extraction["jd_soft"], extraction["have_hard"], extraction["have_soft"], extraction["gaps"]
+        ),
+        "ats": _digest(extraction["jd_hard"], extraction["keywords"][:30], extraction["gaps"]),
+    }
+
+
+@dataclass
+class ReuseMatch:
+    package_id: int
+    created_at: float
+    distance: int
+    result: Dict[str, Any]
+    reusable: List[str] = field(default_factory=list)
+    stale: List[str] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return not self.stale
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "package_id": self.package_id,
+            "created_at": self.created_at,
+            "distance": self.distance,
+            "reused_sections": list(self.reusable),
+            "regenerated_sections": list(self.stale),
+        }
+
+
+class PackageStore:
+    """SQLite store of finished packages with an LSH index on JD fingerprints."""
+
+    def __init__(
+        self,
+        db_path: Path = REUSE_DB_PATH,
+        max_distance: int = REUSE_MAX_DISTANCE,
+        text_distance: int = REUSE_TEXT_DISTANCE,
+        max_entries: int = REUSE_MAX_ENTRIES,
+    ):
+        self.db_path = Path(db_path)
+        self.max_distance = max_distance
+        self.text_distance = text_distance
+        self.max_entries = max_entries
+        self.n_bands = max_distance + 2
+        ensure_dir(self.db_path.parent)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            row = conn.execute("SELECT v FROM meta WHERE k = 'n_bands'").fetchone()
+            if row is None or int(row["v"]) != self.n_bands:
+                self._rebuild_index(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _rebuild_index(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM lsh")
+        for row in conn.execute("SELECT id, simhash FROM packages").fetchall():
+            self._index(conn, row["id"], _to_unsigned(row["simhash"]))
+        conn.execute("INSERT OR REPLACE INTO meta (k, v) VALUES ('n_bands', ?)", (str(self.n_bands),))
+
+    def _index(self, conn: sqlite3.Connection, package_id: int, h: int) -> None:
+        conn.executemany(
+            "INSERT INTO lsh (tbl, key, package_id) VALUES (?, ?, ?)",
+            [(tbl, key, package_id) for tbl, key in lsh_keys(h, self.n_bands)],
+        )
+
+    def _candidates(self, conn: sqlite3.Connection, jd_text: str, profile_key: str) -> List[sqlite3.Row]:
+        exact = conn.execute(
+            "SELECT * FROM packages WHERE profile_key = ? AND jd_hash = ? ORDER BY created_at DESC LIMIT 1",
+            (profile_key, normalized_hash(jd_text)),
+        ).fetchall()
+        if exact:
+            return exact
+        keys = lsh_keys(jd_fingerprint(jd_text), self.n_bands)
+        placeholders = ", ".join(["(?, ?)"] * len(keys))
+        return conn.execute(
+            f"SELECT DISTINCT p.* FROM lsh l JOIN packages p ON p.id = l.package_id "
+            f"WHERE (l.tbl, l.key) IN (VALUES {placeholders}) AND p.profile_key = ?",
+            [v for pair in keys for v in pair] + [profile_key],
+        ).fetchall()
+
+    def find(
+        self,
+        jd_text: str,
+        profile_key: str,
+        signatures: Dict[str, str],
+        versions: Dict[str, str],
+    ) -> Optional[ReuseMatch]:
+        """Closest stored package for a near-duplicate JD, with its per-section reuse plan."""
+        h = jd_fingerprint(jd_text)
+        with closing(self._connect()) as conn, conn:
+            rows = self._candidates(conn, jd_text, profile_key)
+        best = None
+        for row in rows:
+            distance = hamming(h, _to_unsigned(row["simhash"]))
+            if distance <= self.max_distance and (best is None or (distance, -row["created_at"]) < best[0]):
+                best = ((distance, -row["created_at"]), row)
+        if best is None:
+            return None
+        (distance, _), row = best
+        match = ReuseMatch(
+            package_id=row["id"],
+            created_at=row["created_at"],
+            distance=distance,
+            result=json.loads(row["result"]),
+        )
+        stored_versions = json.loads(row["prompt_versions"])
+        stored_signatures = json.loads(row["signatures"])
+        for name, depends_on in SECTION_INPUTS.items():
+            same_prompt = stored_versions.get(name) == versions.get(name)
+            if depends_on == "jd_text":
+                same_inputs = distance <= self.text_distance
+            else:
+                same_inputs = stored_signatures.get(depends_on) == signatures.get(depends_on)
+            (match.reusable if same_prompt and same_inputs and match.result.get(name) else match.stale).append(name)
+        return match
+
+    def put(
+        self,
+        jd_text: str,
+        profile_key: str,
+        result: Dict[str, Any],
+        signatures: Dict[str, str],
+        versions: Dict[str, str],
+    ) -> int:
+        h = jd_fingerprint(jd_text)
+        stored = {k: v for k, v in result.items() if k not in ("reused", "speculative", "timings", "profile_index")}
+        with closing(self._connect()) as conn, conn:
+            cur = conn.execute(
+                "INSERT INTO packages (jd_hash, simhash, profile_key, prompt_versions, signatures, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    normalized_hash(jd_text),
+                    _to_signed(h),
+                    profile_key,
+                    json.dumps(versions),
+                    json.dumps(signatures),
+                    json.dumps(stored),
+                    time.time(),
+                ),
+            )
+            package_id = cur.lastrowid
+            self._index(conn, package_id, h)
+            self._prune(conn)
+        return package_id
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        old = [
+            r["id"]
+            for r in conn.execute(
+                "SELECT id FROM packages ORDER BY created_at DESC LIMIT -1 OFFSET ?", (self.max_entries,)
+            ).fetchall()
+        ]
+        if old:
+            marks = ", ".join("?" * len(old))
+            conn.execute(f"DELETE FROM lsh WHERE package_id IN ({marks})", old)
+            conn.execute(f"DELETE FROM packages WHERE id IN ({marks})", old)
+
+    def count(self) -> int:
+        with closing(self._connect()) as conn, conn:
+            return conn.execute("SELECT COUNT(*) FROM packages").fetchone()[0]
+
+
+_store: Optional[PackageStore] = None
+
+
+def get_package_store() -> PackageStore:
+    global _store
+    if _store is None or _store.db_path != Path(REUSE_DB_PATH):
+        _store = PackageStore()
+    return _store
+
+
+def extract(jd_text: str, profile: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Keyword extraction and profile alignment (the non-LLM, non-retrieval inputs)."""
+    matcher = get_skill_matcher()
+    jd_hard, jd_soft, keywords = extract_keywords(jd_text, matcher)
+    compiled = get_compiled_profile(profile)
+    have_hard, have_soft, gaps = compute_alignment(
+        list(compiled.skills), jd_hard, jd_soft, compiled.skill_index, matcher
+    )
+    return {
+        "jd_hard": jd_hard,
+        "jd_soft": jd_soft,
+        "keywords": keywords,
+        "have_hard": have_hard,
+        "have_soft": have_soft,
+        "gaps": gaps,
+    }
+
+
+def preview_reuse(
+    jd_text: str, profile: Dict[str, Any], extraction: Optional[Dict[str, List[str]]] = None
+) -> Optional[ReuseMatch]:
+    """
+    What a run for ``jd_text`` would reuse right now (used by the UI before
+    submitting). Pass ``extraction`` when it is already known to skip re-extracting.
+    """
+    if extraction is None:
+        extraction = extract(jd_text, profile)
+    return get_package_store().find(jd_text, profile_key(profile), input_signatures(extraction), section_versions())
+
+
+__all__ = [
+    "PackageStore",
+    "ReuseMatch",
+    "SECTION_INPUTS",
+    "get_package_store",
+    "extract",
+    "input_signatures",
+    "jd_fingerprint",
+    "lsh_keys",
+    "preview_reuse",
+    "profile_key",
+    "section_versions",
+]
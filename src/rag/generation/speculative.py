@@ -0,0 +1,199 @@
+"""
+speculative.py
+Background preparation of a job description while it is still being edited.
+
+The UI calls :func:`speculate` whenever the JD text changes. After
+``SPECULATIVE_DEBOUNCE_S`` without a newer edit, a worker thread runs the
+non-LLM stages (:func:`~rag.generation.generator.prepare_inputs`: keyword
+extraction and alignment, profile index check, JD indexing, retrieval, the
+context block) and keeps the result keyed by the exact JD text and the
+profile key (profile settings + documents version).
+
+When Generate is pressed, :func:`take_prepared` hands that result to the
+generator, which goes straight to the LLM sections; a speculation still in
+flight for the same JD is waited for instead of started again. Each caller
+(``slot``, one per UI session) has one live speculation: a newer JD cancels
+the previous one, drops its prepared result and deletes the JD chunks it
+indexed. Prepared work is only shared within one server process; a worker in
+another process simply runs the stages itself.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from rag.config.settings import SPECULATIVE_CACHE_SIZE, SPECULATIVE_DEBOUNCE_S, SPECULATIVE_ENABLED
+from rag.generation.reuse import profile_key
+from rag.ingestion.ingest import drop_jd_text
+from rag.profile import profile_tenant
+from rag.utils.cancellation import CancelToken
+from rag.utils.exceptions import DeadlineExceeded, GenerationCancelled
+from rag.utils.fingerprint import content_hash
+from rag.utils.logging import logger
+
+READY = "ready"
+RUNNING = "running"
+
+
+@dataclass
+class _Speculation:
+    key: str
+    token: CancelToken = field(default_factory=CancelToken)
+    # Set to skip the rest of the debounce (a request is waiting, or it was cancelled).
+    go: threading.Event = field(default_factory=threading.Event)
+    claimed: bool = False
+    future: Optional[Future] = None
+
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="jd-speculate")
+_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_running: Dict[str, _Speculation] = {}
+_latest: Dict[str, str] = {}
+_lock = threading.Lock()
+
+
+def speculation_key(jd_text: str, profile: Dict[str, Any]) -> str:
+    return f"{content_hash(jd_text)}:{profile_key(profile)}"
+
+
+def _is_live(key: str) -> bool:
+    return key in _latest.values()
+
+
+def _jd_in_use(jd_hash: str) -> bool:
+    keys = set(_latest.values()) | set(_running) | set(_cache)
+    return any(k.split(":", 1)[0] == jd_hash for k in keys)
+
+
+def _cleanup(key: str, jd_text: str, tenant: Optional[str]) -> None:
+    """Delete the JD chunks of abandoned work unless another speculation needs the same JD."""
+    with _lock:
+        if _jd_in_use(key.split(":", 1)[0]):
+            return
+    try:
+        drop_jd_text(jd_text, tenant)
+    except Exception:
+        logger.exception("Removing chunks of an abandoned JD draft failed")
+
+
+def _run(spec: _Speculation, jd_text: str, profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # Imported here: the generator imports this module.
+    from rag.generation.generator import prepare_inputs
+
+    spec.go.wait(SPECULATIVE_DEBOUNCE_S)
+    started = not spec.token.cancelled
+    prepared = None
+    if started:
+        try:
+            prepared = prepare_inputs(jd_text, profile, spec.token)
+        except (GenerationCancelled, DeadlineExceeded):
+            pass
+        except Exception:
+            logger.exception("Speculative JD preparation failed")
+
+    with _lock:
+        _running.pop(spec.key, None)
+        claimed = spec.claimed
+        keep = prepared is not None and (claimed or _is_live(spec.key))
+        if keep:
+            prepared.update(jd_text=jd_text, prepared_at=time.time())
+            _cache[spec.key] = prepared
+            while len(_cache) > SPECULATIVE_CACHE_SIZE:
+                _cache.popitem(last=False)
+    if started and not keep and not claimed:
+        _cleanup(spec.key, jd_text, profile_tenant(profile))
+    return prepared if keep else None
+
+
+def speculate(jd_text: str, profile: Dict[str, Any], slot: str = "default") -> Optional[str]:
+    """
+    Make ``jd_text`` the live speculation of ``slot`` and start preparing it
+    after the debounce; earlier work of the slot for another JD is discarded.
+    Returns the speculation key, or ``None`` when disabled or nothing to do.
+    """
+    if not SPECULATIVE_ENABLED or not jd_text.strip() or not profile:
+        return None
+    key = speculation_key(jd_text, profile)
+    stale: Optional[Dict[str, Any]] = None
+    with _lock:
+        previous = _latest.get(slot)
+        _latest[slot] = key
+        if previous is not None and previous != key and not _is_live(previous):
+            spec = _running.get(previous)
+            if spec is not None and not spec.claimed:
+                # _run notices the cancellation and cleans up after itself.
+                spec.token.cancel("superseded")
+                spec.go.set()
+            stale = _cache.pop(previous, None)
+        if key in _cache:
+            _cache.move_to_end(key)
+        elif key not in _running:
+            spec = _Speculation(key)
+            _running[key] = spec
+            spec.future = _executor.submit(_run, spec, jd_text, profile)
+    if stale is not None:
+        _executor.submit(_cleanup, previous, stale["jd_text"], stale["tenant"])
+    return key
+
+
+def status(jd_text: str, profile: Dict[str, Any]) -> Optional[str]:
+    """``ready``, ``running`` (debouncing or preparing) or ``None`` for this JD."""
+    if not SPECULATIVE_ENABLED or not jd_text.strip() or not profile:
+        return None
+    key = speculation_key(jd_text, profile)
+    with _lock:
+        if key in _cache:
+            return READY
+        spec = _running.get(key)
+        return RUNNING if spec is not None and not spec.token.cancelled else None
+
+
+def peek(jd_text: str, profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The prepared inputs for this JD if ready, without consuming them."""
+    if not SPECULATIVE_ENABLED or not jd_text.strip() or not profile:
+        return None
+    key = speculation_key(jd_text, profile)
+    with _lock:
+        return _cache.get(key)
+
+
+def take_prepared(
+    jd_text: str, profile: Dict[str, Any], token: Optional[CancelToken] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Prepared inputs for this JD, consuming them; waits (honouring ``token``)
+    for a speculation already running for it. ``None`` when there is none.
+    """
+    if not SPECULATIVE_ENABLED or not jd_text.strip():
+        return None
+    key = speculation_key(jd_text, profile)
+    with _lock:
+        prepared = _cache.pop(key, None)
+        spec = _running.get(key) if prepared is None else None
+        if spec is not None:
+            if spec.token.cancelled:
+                return None
+            spec.claimed = True
+            spec.go.set()
+    if prepared is not None or spec is None:
+        return prepared
+    while not wait([spec.future], timeout=0.2).done:
+        if token is not None:
+            token.check()
+    prepared = spec.future.result()
+    with _lock:
+        _cache.pop(key, None)
+    return prepared
+
+
+def stats() -> Dict[str, int]:
+    with _lock:
+        return {"prepared": len(_cache), "running": len(_running), "slots": len(_latest)}
+
+
+__all__ = ["READY", "RUNNING", "peek", "speculate", "speculation_key", "stats", "status", "take_prepared"]
@@ -1,3 +1,12 @@
-from rag.ingestion.ingest import load_docs_from, index_profile_docs, index_jd_text
+from rag.ingestion.ingest import load_docs_from, index_profile_docs, index_jd_text, drop_jd_text, sync_profile_docs
+from rag.ingestion.watcher import ProfileWatcher, ensure_profile_index
 
-__all__ = ["load_docs_from", "index_profile_docs", "index_jd_text"]
+__all__ = [
+    "load_docs_from",
+    "index_profile_docs",
+    "index_jd_text",
+    "drop_jd_text",
+    "sync_profile_docs",
+    "ProfileWatcher",
+    "ensure_profile_index",
+]
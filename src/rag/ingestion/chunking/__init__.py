@@ -1,3 +1,5 @@
-from rag.ingestion.chunking.text_splitter import SPLITTER
+from rag.ingestion.chunking.text_splitter import SPLITTER, build_splitter
+from rag.ingestion.chunking.structured import ChunkStrategy, StructuredTokenSplitter
+from rag.ingestion.chunking.tokens import count_tokens
 
-__all__ = ["SPLITTER"]
+__all__ = ["SPLITTER", "build_splitter", "ChunkStrategy", "StructuredTokenSplitter", "count_tokens"]
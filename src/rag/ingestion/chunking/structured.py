@@ -0,0 +1,182 @@
+"""
+structured.py
+Structure-aware chunking measured in embedding-model tokens.
+
+Text is parsed into blocks (paragraphs and bullets, with wrapped lines joined)
+under the nearest heading. Blocks are packed greedily into chunks of at most
+``max_tokens``; a block is only cut (at sentence, then word, boundaries) when
+it alone exceeds the budget. Each chunk is prefixed with its heading so it
+stays meaningful on its own, and overlap is whole blocks rather than a fixed
+character window.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from rag.ingestion.chunking.tokens import count_tokens
+
+_BULLET = re.compile(r"^\s*(?:[-*•●▪◦‣–·]|\d{1,2}[.)])\s+")
+_MD_HEADING = re.compile(r"^\s*(#{1,6})\s+(.*\S)\s*$")
+_SENTENCE_END = re.compile(r"(?<=[.!?;])\s+(?=[A-Z0-9(\"'])")
+# Plain headings ("EXPERIENCE", "Requirements:") sit below any markdown heading.
+_PLAIN_LEVEL = 7
+
+
+@dataclass(frozen=True)
+class ChunkStrategy:
+    max_tokens: int = 200
+    overlap_tokens: int = 0
+    heading_prefix: bool = True
+
+
+def is_plain_heading(line: str) -> bool:
+    """Short all-caps line or short line ending with a colon."""
+    s = line.strip()
+    if not s or len(s) > 60 or _BULLET.match(s):
+        return False
+    if len(s.rstrip(":").split()) > 6:
+        return False
+    if s.endswith(":"):
+        return True
+    letters = [c for c in s if c.isalpha()]
+    return len(letters) >= 4 and all(c.isupper() for c in letters)
+
+
+def parse_blocks(text: str) -> List[Tuple[str, str]]:
+    """Split text into ``(section, block)`` pairs; no text is dropped."""
+    blocks: List[Tuple[str, str]] = []
+    path: List[Tuple[int, str]] = []
+    current: List[str] = []
+    section_has_body = True
+
+    def section() -> str:
+        return " > ".join(title for _, title in path)
+
+    def flush() -> None:
+        nonlocal section_has_body
+        if current:
+            blocks.append((section(), " ".join(current)))
+            current.clear()
+            section_has_body = True
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            flush()
+            continue
+        md = _MD_HEADING.match(line)
+        if md or is_plain_heading(line):
+            flush()
+            if not section_has_body and path:
+                # Heading followed by another heading: keep it as content.
+                blocks.append((" > ".join(t for _, t in path[:-1]), path[-1][1]))
+            level, title = (len(md.group(1)), md.group(2)) if md else (_PLAIN_LEVEL, line.rstrip(":").strip())
+            path = [(lvl, t) for lvl, t in path if lvl < level] + [(level, title)]
+            section_has_body = False
+            continue
+        if _BULLET.match(line):
+            flush()
+        current.append(line)
+    flush()
+    if not section_has_body and path:
+        blocks.append((" > ".join(t for _, t in path[:-1]), path[-1][1]))
+    return blocks
+
+
+class StructuredTokenSplitter:
+    """Drop-in replacement for the langchain splitter's ``split_documents``."""
+
+    def __init__(
+        self,
+        strategies: Optional[Dict[str, ChunkStrategy]] = None,
+        default: ChunkStrategy = ChunkStrategy(),
+        length_function: Callable[[str], int] = count_tokens,
+    ):
+        self.strategies = dict(strategies or {})
+        self.default = default
+        self.length_function = length_function
+
+    def strategy_for(self, doc_type: Optional[str]) -> ChunkStrategy:
+        return self.strategies.get(doc_type or "", self.default)
+
+    def _split_long(self, text: str, budget: int) -> List[Tuple[str, int]]:
+        pieces: List[Tuple[str, int]] = []
+        for sentence in _SENTENCE_END.split(text):
+            n = self.length_function(sentence)
+            if n <= budget:
+                pieces.append((sentence, n))
+                continue
+            words: List[str] = []
+            used = 0
+            for word in sentence.split():
+                w = self.length_function(word)
+                if words and used + w > budget:
+                    pieces.append((" ".join(words), used))
+                    words, used = [], 0
+                words.append(word)
+                used += w
+            if words:
+                pieces.append((" ".join(words), used))
+        return pieces
+
+    def split_sections(self, text: str, strategy: ChunkStrategy) -> List[Tuple[str, str, int]]:
+        """``(section, chunk_text, tokens)`` for one text."""
+        chunks: List[Tuple[str, str, int]] = []
+        for section, group in groupby(parse_blocks(text), key=lambda b: b[0]):
+            prefix = f"{section}\n" if section and strategy.heading_prefix else ""
+            prefix_tokens = self.length_function(prefix)
+            budget = max(strategy.max_tokens - prefix_tokens, 16)
+
+            pieces: List[Tuple[str, int]] = []
+            for _, block in group:
+                n = self.length_function(block)
+                pieces.extend([(block, n)] if n <= budget else self._split_long(block, budget))
+
+            current: List[Tuple[str, int]] = []
+            for piece in pieces:
+                if current and sum(n for _, n in current) + piece[1] > budget:
+                    chunks.append(self._emit(section, prefix, prefix_tokens, current))
+                    current = self._overlap(current, strategy.overlap_tokens, budget - piece[1])
+                current.append(piece)
+            if current:
+                chunks.append(self._emit(section, prefix, prefix_tokens, current))
+        return chunks
+
+    @staticmethod
+    def _overlap(pieces: List[Tuple[str, int]], overlap_tokens: int, room: int) -> List[Tuple[str, int]]:
+        tail: List[Tuple[str, int]] = []
+        used = 0
+        for piece in reversed(pieces):
+            if used + piece[1] > min(overlap_tokens, room):
+                break
+            tail.insert(0, piece)
+            used += piece[1]
+        return tail
+
+    @staticmethod
+    def _emit(section: str, prefix: str, prefix_tokens: int, pieces: List[Tuple[str, int]]) -> Tuple[str, str, int]:
+        return section, prefix + "\n".join(t for t, _ in pieces), prefix_tokens + sum(n for _, n in pieces)
+
+    def split_text(self, text: str, doc_type: Optional[str] = None) -> List[str]:
+        return [chunk for _, chunk, _ in self.split_sections(text, self.strategy_for(doc_type))]
+
+    def split_documents(self, docs: Iterable[Document]) -> List[Document]:
+        out: List[Document] = []
+        for doc in docs:
+            strategy = self.strategy_for(doc.metadata.get("doc_type"))
+            for index, (section, chunk, tokens) in enumerate(self.split_sections(doc.page_content, strategy)):
+                metadata = dict(doc.metadata)
+                metadata["section"] = section
+                metadata["chunk_index"] = index
+                metadata["chunk_tokens"] = tokens
+                out.append(Document(page_content=chunk, metadata=metadata))
+        return out
+
+
+__all__ = ["ChunkStrategy", "StructuredTokenSplitter", "parse_blocks", "is_plain_heading"]
@@ -2,14 +2,40 @@
 
 from __future__ import annotations
 
+from typing import Any, Dict, Optional
+
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-from rag.config.settings import CHUNK_SIZE, CHUNK_OVERLAP
+from rag.config.settings import CHUNK_SIZE, CHUNK_OVERLAP, CHUNK_SPLITTER, CHUNK_STRATEGIES
+from rag.ingestion.chunking.structured import ChunkStrategy, StructuredTokenSplitter
+
+
+def build_splitter(
+    kind: str = CHUNK_SPLITTER,
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP,
+    strategies: Optional[Dict[str, Dict[str, Any]]] = None,
+):
+    """
+    ``structured`` (token-based, per doc_type) or the legacy ``recursive`` character splitter.
+    The keyword arguments override the configured sizes (used by the evaluation sweeps).
+    """
+    if kind == "recursive":
+        return RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            separators=["\n\n", "\n", " ", ""],
+        )
+    if kind != "structured":
+        raise ValueError(f"Unknown splitter {kind!r}; expected 'structured' or 'recursive'")
+    by_type = {
+        name: ChunkStrategy(**cfg)
+        for name, cfg in (CHUNK_STRATEGIES if strategies is None else strategies).items()
+    }
+    default = by_type.pop("default", ChunkStrategy())
+    return StructuredTokenSplitter(strategies=by_type, default=default)
+
 
-SPLITTER = RecursiveCharacterTextSplitter(
-    chunk_size=CHUNK_SIZE,
-    chunk_overlap=CHUNK_OVERLAP,
-    separators=["\n\n", "\n", " ", ""],
-)
+SPLITTER = build_splitter()
 
-__all__ = ["SPLITTER"]
+__all__ = ["SPLITTER", "build_splitter"]
@@ -0,0 +1,50 @@
+"""
+tokens.py
+Token counting with the embedding model's own tokenizer.
+
+Chunk budgets are expressed in the tokens the embedding model sees, so a
+chunk never gets silently truncated at the model's max sequence length. When
+``transformers`` or the tokenizer files are unavailable we fall back to a
+word/punctuation estimate.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from functools import lru_cache
+
+from rag.config.settings import EMBED_MODEL
+from rag.utils.logging import logger
+
+# WordPiece splits roughly 1.3 pieces per word/punctuation mark on English CVs.
+_PIECES_PER_WORD = 1.3
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache(maxsize=1)
+def embedding_tokenizer():
+    """Tokenizer matching ``EMBED_MODEL`` (None if it cannot be loaded)."""
+    try:
+        from transformers import AutoTokenizer
+    except ImportError:
+        return None
+    name = EMBED_MODEL if "/" in EMBED_MODEL else f"sentence-transformers/{EMBED_MODEL}"
+    try:
+        return AutoTokenizer.from_pretrained(name)
+    except Exception as exc:
+        logger.warning("Could not load tokenizer for %s (%s); estimating token counts", name, exc)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Number of embedding-model tokens in ``text`` (special tokens excluded)."""
+    if not text:
+        return 0
+    tokenizer = embedding_tokenizer()
+    if tokenizer is None:
+        return math.ceil(len(_WORD_RE.findall(text)) * _PIECES_PER_WORD)
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+
+__all__ = ["embedding_tokenizer", "count_tokens"]
@@ -1,29 +1,62 @@
 """
 ingest.py
-Load and index profile documents or job descriptions into Chroma.
+Load and index profile documents or job descriptions into the vector store.
+
+Profile documents are synced incrementally (:func:`sync_profile_docs`): a
+manifest keyed by tenant collection records each file's size, mtime and
+content hash, so only added or changed files are re-embedded and chunks of
+removed files are deleted. A sync holds a lock file next to the manifest, so
+app processes and the CLI never sync (or rewrite the manifest) at once.
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import threading
+import time
 import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
+from langchain_core.documents import Document
 
-from rag.config.settings import PROFILE_DOC_DIR, RAG_DIR
+from rag.config.settings import PROFILE_DOC_DIR, PROFILE_MANIFEST_PATH, RAG_DIR
 from rag.ingestion.chunking.text_splitter import SPLITTER
-from rag.vectorstore.chroma_instance import get_vectordb
+from rag.utils.fingerprint import content_hash
+from rag.utils.helpers import file_lock
+from rag.utils.logging import logger
+from rag.utils.profiling import profiled
+from rag.vectorstore.base import collection_name
+from rag.vectorstore.factory import get_vector_store
+
+LOADABLE_SUFFIXES = {".pdf", ".txt", ".md"}
+
+_sync_lock = threading.Lock()
+
+
+def _load_file(path: Path) -> List:
+    if path.suffix.lower() == ".pdf":
+        return PyPDFLoader(str(path)).load()
+    if path.suffix.lower() in {".txt", ".md"}:
+        return TextLoader(str(path), encoding="utf-8").load()
+    return []
 
 
+@profiled
 def load_docs_from(folder: Path, doc_type: str):
     """Load PDFs / text / markdown files from a folder and tag metadata."""
     docs = []
     for path in sorted(folder.glob("*")):
-        if path.suffix.lower() == ".pdf":
-            docs += PyPDFLoader(str(path)).load()
-        elif path.suffix.lower() in {".txt", ".md"}:
-            docs += TextLoader(str(path), encoding="utf-8").load()
+        docs += _load_file(path)
+    return _tag(docs, folder, doc_type)
 
+
+def _tag(docs: List, folder: Path, doc_type: str) -> List:
     for doc in docs:
         doc.metadata["source"] = doc.metadata.get("source") or str(folder)
         doc.metadata["doc_type"] = doc_type
@@ -31,29 +64,204 @@ def load_docs_from(folder: Path, doc_type: str):
     return docs
 
 
-def index_profile_docs() -> int:
-    """Index persistent profile documents (CVs, summaries)."""
-    vectordb = get_vectordb()
-    docs = load_docs_from(PROFILE_DOC_DIR, "profile")
-    chunks = SPLITTER.split_documents(docs)
-    if chunks:
-        vectordb.add_documents(chunks)
-    return len(chunks)
+def stamp_chunks(chunks: List) -> List:
+    """Add the content hash and index time used by index maintenance."""
+    now = time.time()
+    for chunk in chunks:
+        chunk.metadata["content_hash"] = content_hash(chunk.page_content)
+        chunk.metadata["indexed_at"] = now
+    return chunks
+
+
+def scan_profile_docs(folder: Path = PROFILE_DOC_DIR) -> Dict[str, Tuple[int, int]]:
+    """Loadable files in ``folder`` with their ``(mtime_ns, size)``."""
+    found = {}
+    for path in sorted(folder.glob("*")):
+        if path.is_file() and path.suffix.lower() in LOADABLE_SUFFIXES:
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            found[str(path)] = (st.st_mtime_ns, st.st_size)
+    return found
+
+
+@dataclass
+class SyncStats:
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    chunks_indexed: int = 0
+    files: int = 0
+    total_chunks: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+def _read_manifest() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    try:
+        return json.loads(PROFILE_MANIFEST_PATH.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except ValueError:
+        logger.warning("Profile manifest %s is unreadable; re-indexing every file", PROFILE_MANIFEST_PATH)
+        return {}
+
+
+def _write_manifest(manifest: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+    tmp = PROFILE_MANIFEST_PATH.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, PROFILE_MANIFEST_PATH)
 
 
-def index_jd_text(jd_text: str) -> int:
-    """Index the current job description as a temporary doc."""
-    tmp = RAG_DIR / "jd.txt"
-    tmp.write_text(jd_text, encoding="utf-8")
+@contextmanager
+def manifest_lock() -> Iterator[None]:
+    """Exclusive access to profile syncs and the manifest, across threads and processes."""
+    with _sync_lock, file_lock(PROFILE_MANIFEST_PATH.with_suffix(".lock")):
+        yield
 
-    docs = load_docs_from(RAG_DIR, "jd")
-    docs = [d for d in docs if "jd.txt" in d.metadata.get("source", "")]
-    chunks = SPLITTER.split_documents(docs)
 
-    vectordb = get_vectordb()
+def manifest_entries(tenant: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """The tenant's manifest: source path -> size, mtime, sha1 and chunk count."""
+    return dict(_read_manifest().get(collection_name(tenant), {}))
+
+
+def set_manifest_entries(tenant: Optional[str], entries: Dict[str, Dict[str, Any]]) -> None:
+    """Replace the tenant's manifest entries; call while holding :func:`manifest_lock`."""
+    manifest = _read_manifest()
+    manifest[collection_name(tenant)] = dict(entries)
+    _write_manifest(manifest)
+
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def _source_where(source: str) -> Dict[str, Any]:
+    return {"$and": [{"doc_type": "profile"}, {"source": source}]}
+
+
+@profiled
+def sync_profile_docs(tenant: Optional[str] = None, folder: Path = PROFILE_DOC_DIR) -> SyncStats:
+    """
+    Bring the tenant's profile chunks in line with ``folder``: (re-)index
+    added and changed files, delete the chunks of removed ones. Files whose
+    mtime changed but whose content did not are only re-stamped.
+    """
+    with manifest_lock():
+        manifest = _read_manifest()
+        entries = manifest.setdefault(collection_name(tenant), {})
+        current = scan_profile_docs(folder)
+        store = get_vector_store(tenant)
+        stats = SyncStats()
+        if entries and store.count() == 0:
+            # The collection was dropped or rebuilt since the last sync.
+            entries.clear()
+
+        for source in sorted(set(entries) - set(current)):
+            store.delete(where=_source_where(source))
+            del entries[source]
+            stats.removed += 1
+
+        for source, (mtime_ns, size) in current.items():
+            entry = entries.get(source)
+            if entry and entry["mtime_ns"] == mtime_ns and entry["size"] == size:
+                stats.unchanged += 1
+                continue
+            path = Path(source)
+            try:
+                digest = _file_hash(path)
+                if entry and entry.get("sha1") == digest and not entry.get("error"):
+                    entry.update(mtime_ns=mtime_ns, size=size)
+                    stats.unchanged += 1
+                    continue
+                chunks = stamp_chunks(SPLITTER.split_documents(_tag(_load_file(path), folder, "profile")))
+                store.delete(where=_source_where(source))
+                if chunks:
+                    store.add_documents(chunks)
+            except Exception as exc:
+                # Recorded with its mtime so a broken file is retried only once it changes.
+                logger.exception("Indexing profile document %s failed", source)
+                entries[source] = {"mtime_ns": mtime_ns, "size": size, "sha1": None, "chunks": 0, "error": str(exc)}
+                stats.failed += 1
+                continue
+            entries[source] = {"mtime_ns": mtime_ns, "size": size, "sha1": digest, "chunks": len(chunks)}
+            if entry:
+                stats.updated += 1
+            else:
+                stats.added += 1
+            stats.chunks_indexed += len(chunks)
+
+        stats.files = len(entries)
+        stats.total_chunks = sum(e.get("chunks", 0) for e in entries.values())
+        _write_manifest(manifest)
+    if stats.changed or stats.failed:
+        logger.info(
+            "Profile docs synced for %s: +%d ~%d -%d files (%d chunks indexed, %d failed)",
+            collection_name(tenant),
+            stats.added,
+            stats.updated,
+            stats.removed,
+            stats.chunks_indexed,
+            stats.failed,
+        )
+    return stats
+
+
+def index_profile_docs(tenant: Optional[str] = None) -> int:
+    """Index persistent profile documents (CVs, summaries); only changed files are re-embedded."""
+    return sync_profile_docs(tenant).chunks_indexed
+
+
+def jd_where(jd_hash: str) -> Dict[str, Any]:
+    """Filter matching the chunks :func:`index_jd_text` added for one JD."""
+    return {"$and": [{"doc_type": "jd"}, {"jd_hash": jd_hash}]}
+
+
+@profiled
+def index_jd_text(jd_text: str, tenant: Optional[str] = None) -> int:
+    """
+    Index the current job description as a temporary doc. Chunks carry the
+    JD's ``jd_hash``; a JD already indexed for the tenant is not re-embedded.
+    """
+    jd_hash = content_hash(jd_text)
+    store = get_vector_store(tenant)
+    if store.get(where=jd_where(jd_hash))["ids"]:
+        return 0
+    # Built in memory rather than via a shared jd.txt, so concurrent requests cannot mix JDs.
+    doc = Document(page_content=jd_text, metadata={"source": str(RAG_DIR / "jd.txt")})
+    chunks = stamp_chunks(SPLITTER.split_documents(_tag([doc], RAG_DIR, "jd")))
+    for chunk in chunks:
+        chunk.metadata["jd_hash"] = jd_hash
     if chunks:
-        vectordb.add_documents(chunks)
+        store.add_documents(chunks)
     return len(chunks)
 
 
-__all__ = ["load_docs_from", "index_profile_docs", "index_jd_text"]
+def drop_jd_text(jd_text: str, tenant: Optional[str] = None) -> None:
+    """Delete the chunks :func:`index_jd_text` added for ``jd_text``."""
+    get_vector_store(tenant).delete(where=jd_where(content_hash(jd_text)))
+
+
+__all__ = [
+    "LOADABLE_SUFFIXES",
+    "SyncStats",
+    "load_docs_from",
+    "stamp_chunks",
+    "scan_profile_docs",
+    "sync_profile_docs",
+    "index_profile_docs",
+    "index_jd_text",
+    "drop_jd_text",
+    "jd_where",
+    "manifest_entries",
+    "manifest_lock",
+    "set_manifest_entries",
+]
@@ -6,7 +6,7 @@ JD keyword extraction and alignment helpers.
 from __future__ import annotations
 
 import re
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from rag.utils.text import (
     normalize_text,
@@ -16,35 +16,83 @@ from rag.utils.text import (
     HARD_SKILL_LEXICON,
     SOFT_SKILL_LEXICON,
     fuzzy_overlap,
+    skill_key,
 )
+from rag.ingestion.preprocessing.semantic_skills import SkillMatcher
 
 
-def extract_keywords(jd_text: str) -> Tuple[List[str], List[str], List[str]]:
-    """Tokenise the JD and extract hard skills, soft skills, and keywords."""
+def extract_keywords(
+    jd_text: str, matcher: Optional[SkillMatcher] = None
+) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Tokenise the JD and extract hard skills, soft skills, and keywords.
+    With a ``matcher`` the candidates are first matched semantically against
+    the lexicon; only those without a hit are fuzzy-matched.
+    """
     jd_norm = normalize_text(jd_text)
     toks = tokenize_lower(jd_norm)
     cands = top_terms(toks, topn=80, min_len=2)
 
-    jd_hard = fuzzy_match_candidates(cands, HARD_SKILL_LEXICON, cutoff=86)
-    jd_soft = fuzzy_match_candidates(cands, SOFT_SKILL_LEXICON, cutoff=86)
+    semantic_hard, semantic_soft, rest = set(), set(), cands
+    if matcher is not None:
+        rest = []
+        for cand, hit in zip(cands, matcher.match_lexicon(cands)):
+            if hit is None:
+                rest.append(cand)
+            elif hit[0] in HARD_SKILL_LEXICON:
+                semantic_hard.add(hit[0])
+            else:
+                semantic_soft.add(hit[0])
+
+    jd_hard = fuzzy_match_candidates(rest, HARD_SKILL_LEXICON, cutoff=86)
+    jd_soft = sorted(semantic_soft | set(fuzzy_match_candidates(rest, SOFT_SKILL_LEXICON, cutoff=86)))
 
     caps = sorted(set(re.findall(r"\b([A-Z][a-zA-Z0-9\-\+&/]{1,})\b", jd_text)))
     hard_lower_map = {s.lower(): s for s in HARD_SKILL_LEXICON}
     extra = fuzzy_match_candidates([c.lower() for c in caps], hard_lower_map.keys(), cutoff=90)
     extra_cased = [hard_lower_map.get(e, e) for e in extra]
 
-    jd_hard = sorted({s for s in (set(jd_hard) | set(extra_cased)) if s})
+    jd_hard = sorted({s for s in (set(jd_hard) | set(extra_cased) | semantic_hard) if s})
 
-    known = {t.lower() for t in jd_hard + jd_soft}
+    known = {t.lower() for t in jd_hard + jd_soft} | (set(cands) - set(rest))
     keywords = [t for t in cands if t not in known and len(t) >= 3]
 
     return jd_hard, jd_soft, keywords
 
 
-def compute_alignment(profile_skills: List[str], jd_hard: List[str], jd_soft: List[str]):
-    """Compare candidate skills vs JD demands to surface overlaps/gaps."""
-    have_hard = sorted({m[1] for m in fuzzy_overlap(profile_skills, jd_hard, cutoff=88)})
-    have_soft = sorted({m[1] for m in fuzzy_overlap(profile_skills, jd_soft, cutoff=88)})
+def _have(
+    profile_skills: List[str],
+    wanted: List[str],
+    skill_index: Dict[str, str],
+    matcher: Optional[SkillMatcher],
+) -> List[str]:
+    exact = {w for w in wanted if skill_key(w) in skill_index}
+    matched = {skill_index[skill_key(w)] for w in exact}
+    rest = [s for s in profile_skills if s not in matched]
+    semantic = set(matcher.covered([w for w in wanted if w not in exact], rest)) if matcher else set()
+    fuzzy = {m[1] for m in fuzzy_overlap(rest, wanted, cutoff=88)} if rest and wanted else set()
+    return sorted(exact | semantic | fuzzy)
+
+
+def compute_alignment(
+    profile_skills: List[str],
+    jd_hard: List[str],
+    jd_soft: List[str],
+    skill_index: Optional[Dict[str, str]] = None,
+    matcher: Optional[SkillMatcher] = None,
+):
+    """
+    Compare candidate skills vs JD demands to surface overlaps/gaps.
+
+    JD skills whose :func:`skill_key` is in ``skill_index`` (key -> profile
+    skill, precomputed by the compiled profile) match without fuzzing; only
+    the remaining profile skills are matched, semantically when a
+    ``matcher`` is given and by fuzzy string similarity.
+    """
+    if skill_index is None:
+        skill_index = {skill_key(s): s for s in profile_skills}
+    have_hard = _have(profile_skills, jd_hard, skill_index, matcher)
+    have_soft = _have(profile_skills, jd_soft, skill_index, matcher)
     gaps = [s for s in jd_hard + jd_soft if s not in set(have_hard + have_soft)]
     return have_hard, have_soft, gaps
 
@@ -0,0 +1,162 @@
+"""
+semantic_skills.py
+Embedding-based skill matching against a precomputed lexicon matrix.
+
+The skill lexicon is embedded once into a row-normalized float32 matrix,
+cached on disk per embedding model and lexicon content. Matching a batch of
+terms is then one embedding pass plus one matrix product: each term maps to
+its most similar lexicon entry when the cosine similarity reaches the
+threshold. This catches related names the fuzzy matcher cannot ("Teamwork"
+vs "Collaboration"); callers keep fuzzy matching as the fallback for terms
+without a semantic hit (typos, tool names the model does not know).
+
+Enabled with ``rag.semantic_skills.enabled`` / ``SEMANTIC_SKILLS=1``; the
+matcher is a registry resource (``skill_matcher``) so it is built once per
+process.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from rag.config.settings import (
+    EMBED_MODEL,
+    SEMANTIC_SKILLS_CACHE_DIR,
+    SEMANTIC_SKILLS_ENABLED,
+    SEMANTIC_SKILLS_THRESHOLD,
+)
+from rag.resources import REGISTRY
+from rag.utils.helpers import ensure_dir
+from rag.utils.logging import logger
+from rag.utils.text import HARD_SKILL_LEXICON, SOFT_SKILL_LEXICON, skill_key
+
+# Vectors of non-lexicon terms (JD words, profile skills) kept for reuse, least recently used evicted first.
+MAX_CACHED_TERMS = 5000
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class SkillMatcher:
+    """Cosine matcher over a fixed lexicon; see the module docstring."""
+
+    def __init__(
+        self,
+        lexicon: Iterable[str],
+        embeddings,
+        threshold: float = SEMANTIC_SKILLS_THRESHOLD,
+        cache_dir: Optional[Path] = SEMANTIC_SKILLS_CACHE_DIR,
+        model_name: str = EMBED_MODEL,
+    ):
+        self.terms: List[str] = sorted(set(lexicon))
+        self.threshold = threshold
+        self._embeddings = embeddings
+        self._row = {skill_key(t): i for i, t in enumerate(self.terms)}
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.matrix = self._load_matrix(cache_dir, model_name)
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        return _normalize(np.asarray(self._embeddings.embed_documents(texts), dtype=np.float32))
+
+    def _load_matrix(self, cache_dir: Optional[Path], model_name: str) -> np.ndarray:
+        key = hashlib.sha1(json.dumps([model_name, self.terms]).encode("utf-8")).hexdigest()[:16]
+        path = Path(cache_dir) / f"lexicon_{key}.npy" if cache_dir else None
+        if path is not None and path.exists():
+            try:
+                matrix = np.load(path)
+                if matrix.shape[0] == len(self.terms):
+                    return matrix
+            except (OSError, ValueError) as exc:
+                logger.warning("Re-embedding skill lexicon; cached matrix %s unreadable: %s", path, exc)
+        matrix = self._embed(self.terms) if self.terms else np.zeros((0, 0), dtype=np.float32)
+        if path is not None:
+            ensure_dir(path.parent)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp.npy")
+            np.save(tmp, matrix)
+            os.replace(tmp, path)
+        return matrix
+
+    def vectors(self, texts: Sequence[str]) -> np.ndarray:
+        """Normalized vectors; lexicon terms come from the matrix, the rest are embedded in one batch."""
+        texts = list(texts)
+        # Rows of this call are held here, so evicting them from the cache cannot lose them.
+        found: Dict[str, np.ndarray] = {}
+        missing: List[str] = []
+        with self._lock:
+            for t in dict.fromkeys(texts):
+                if skill_key(t) in self._row:
+                    continue
+                vector = self._cache.get(t)
+                if vector is None:
+                    missing.append(t)
+                else:
+                    self._cache.move_to_end(t)
+                    found[t] = vector
+        if missing:
+            fresh = dict(zip(missing, self._embed(missing)))
+            found.update(fresh)
+            with self._lock:
+                self._cache.update(fresh)
+                while len(self._cache) > MAX_CACHED_TERMS:
+                    self._cache.popitem(last=False)
+        rows = []
+        for t in texts:
+            i = self._row.get(skill_key(t))
+            rows.append(self.matrix[i] if i is not None else found[t])
+        return np.stack(rows) if rows else np.zeros((0, self.matrix.shape[1]), dtype=np.float32)
+
+    def match_lexicon(self, texts: Sequence[str]) -> List[Optional[Tuple[str, float]]]:
+        """Closest lexicon entry and its similarity per text, or ``None`` below the threshold."""
+        texts = list(texts)
+        if not texts or not self.terms:
+            return [None] * len(texts)
+        scores = self.vectors(texts) @ self.matrix.T
+        best = scores.argmax(axis=1)
+        return [
+            (self.terms[j], float(scores[i, j])) if scores[i, j] >= self.threshold else None
+            for i, j in enumerate(best)
+        ]
+
+    def covered(self, wanted: Sequence[str], have: Sequence[str]) -> List[str]:
+        """Entries of ``wanted`` whose closest ``have`` term reaches the threshold."""
+        wanted, have = list(wanted), list(have)
+        if not wanted or not have:
+            return []
+        scores = self.vectors(wanted) @ self.vectors(have).T
+        return [w for w, s in zip(wanted, scores.max(axis=1)) if s >= self.threshold]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "terms": len(self.terms),
+            "dim": int(self.matrix.shape[1]) if self.matrix.size else 0,
+            "cached_terms": len(self._cache),
+            "threshold": self.threshold,
+        }
+
+
+def build_skill_matcher() -> SkillMatcher:
+    """Matcher over the hard + soft skill lexicons using the shared embedding model."""
+    from rag.models.embedding_model.factory import get_embeddings
+
+    return SkillMatcher(HARD_SKILL_LEXICON | SOFT_SKILL_LEXICON, get_embeddings())
+
+
+def get_skill_matcher() -> Optional[SkillMatcher]:
+    """The process-wide matcher when semantic skill matching is enabled, else ``None``."""
+    if not SEMANTIC_SKILLS_ENABLED:
+        return None
+    return REGISTRY.get("skill_matcher")
+
+
+__all__ = ["SkillMatcher", "build_skill_matcher", "get_skill_matcher"]
@@ -0,0 +1,199 @@
+"""
+watcher.py
+Background re-indexing of the profile documents folder.
+
+A daemon thread polls ``PROFILE_DOC_DIR`` every ``interval_s``. Once a change
+(file added, modified or removed) has been stable for ``debounce_s`` it runs
+:func:`~rag.ingestion.ingest.sync_profile_docs` for the current profile's
+tenant, which only re-embeds the files that changed. A tenant change (the
+profile was renamed) triggers a sync as well.
+
+Generation never waits for it: while the watcher runs,
+:func:`ensure_profile_index` only reports its freshness (``fresh``,
+``pending``, ``indexing``, ``error``) and the package is built from whatever
+is indexed. Without a running watcher the request syncs inline as before,
+which is now incremental.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from rag.config.settings import (
+    PROFILE_DOC_DIR,
+    PROFILE_WATCH_DEBOUNCE_S,
+    PROFILE_WATCH_ENABLED,
+    PROFILE_WATCH_INTERVAL_S,
+)
+from rag.ingestion.ingest import scan_profile_docs, sync_profile_docs
+from rag.resources import REGISTRY
+from rag.utils.logging import logger
+
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+def _current_tenant() -> str:
+    from rag.profile import load_profile, profile_tenant
+
+    return profile_tenant(load_profile())
+
+
+@dataclass
+class Freshness:
+    state: str = "starting"
+    tenant: Optional[str] = None
+    files: int = 0
+    chunks: int = 0
+    pending_since: Optional[float] = None
+    last_scan_at: Optional[float] = None
+    last_sync_at: Optional[float] = None
+    last_sync: Dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["lag_s"] = round(time.time() - self.pending_since, 1) if self.pending_since else 0.0
+        return data
+
+
+class ProfileWatcher:
+    """Polling, debounced, incremental indexer for one folder; see the module docstring."""
+
+    def __init__(
+        self,
+        folder: Path = PROFILE_DOC_DIR,
+        interval_s: float = PROFILE_WATCH_INTERVAL_S,
+        debounce_s: float = PROFILE_WATCH_DEBOUNCE_S,
+        tenant_fn: Callable[[], str] = _current_tenant,
+    ):
+        self.folder = Path(folder)
+        self.interval_s = interval_s
+        self.debounce_s = debounce_s
+        self._tenant_fn = tenant_fn
+        self._state = Freshness()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._seen: Optional[Snapshot] = None
+        self._changed_at = 0.0
+        self._synced: Optional[Tuple[str, Snapshot]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "ProfileWatcher":
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="rag-profile-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def poke(self) -> None:
+        """Scan now instead of at the next interval."""
+        self._wake.set()
+
+    def freshness(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._state.as_dict()
+
+    def _update(self, **changes: Any) -> None:
+        with self._lock:
+            for key, value in changes.items():
+                setattr(self._state, key, value)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as exc:
+                logger.exception("Profile watcher scan failed")
+                self._update(state="error", error=f"{type(exc).__name__}: {exc}")
+            self._wake.wait(self.interval_s)
+            self._wake.clear()
+
+    def tick(self, now: Optional[float] = None) -> None:
+        """One scan; syncs when the folder (or tenant) changed and has settled."""
+        now = time.time() if now is None else now
+        tenant = self._tenant_fn()
+        snapshot = scan_profile_docs(self.folder)
+        if snapshot != self._seen:
+            # The first scan after start-up syncs without waiting.
+            self._changed_at = now if self._seen is not None else 0.0
+            self._seen = snapshot
+        self._update(last_scan_at=now, tenant=tenant)
+        if self._synced == (tenant, snapshot):
+            return
+
+        with self._lock:
+            if self._state.state != "error":
+                self._state.state = "pending"
+            self._state.pending_since = self._state.pending_since or now
+        if now - self._changed_at < self.debounce_s:
+            return
+
+        self._update(state="indexing")
+        try:
+            stats = sync_profile_docs(tenant, self.folder)
+        except Exception as exc:
+            logger.exception("Background profile sync failed")
+            # Back off for one debounce period before retrying.
+            self._changed_at = now
+            self._update(state="error", error=f"{type(exc).__name__}: {exc}")
+            return
+        self._synced = (tenant, snapshot)
+        self._update(
+            state="fresh",
+            files=stats.files,
+            chunks=stats.total_chunks,
+            pending_since=None,
+            last_sync_at=time.time(),
+            last_sync=stats.as_dict(),
+            error=None,
+        )
+
+
+def get_profile_watcher() -> Optional[ProfileWatcher]:
+    """The process-wide watcher (started on first use) when enabled, else ``None``."""
+    if not PROFILE_WATCH_ENABLED:
+        return None
+    return REGISTRY.get("profile_watcher")
+
+
+def ensure_profile_index(tenant: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Freshness of the profile index for a request. Never waits for background
+    indexing; without a running watcher the folder is synced inline.
+    """
+    watcher = get_profile_watcher()
+    if watcher is not None and watcher.running:
+        state = watcher.freshness()
+        if state["tenant"] != tenant:
+            # The profile changed since the last scan; the next tick picks it up.
+            watcher.poke()
+            state.update(state="pending", tenant=tenant)
+        return state
+    stats = sync_profile_docs(tenant)
+    return Freshness(
+        state="fresh",
+        tenant=tenant,
+        files=stats.files,
+        chunks=stats.total_chunks,
+        last_sync_at=time.time(),
+        last_sync=stats.as_dict(),
+    ).as_dict()
+
+
+__all__ = ["Freshness", "ProfileWatcher", "ensure_profile_index", "get_profile_watcher"]
@@ -0,0 +1,24 @@
+from rag.jobs.job_queue import (
+    Job,
+    JobQueue,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    FAILED,
+    CANCELLED,
+    FINAL_STATUSES,
+)
+from rag.jobs.worker import WorkerPool, run_package_job
+
+__all__ = [
+    "Job",
+    "JobQueue",
+    "QUEUED",
+    "RUNNING",
+    "SUCCEEDED",
+    "FAILED",
+    "CANCELLED",
+    "FINAL_STATUSES",
+    "WorkerPool",
+    "run_package_job",
+]
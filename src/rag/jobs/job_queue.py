@@ -0,0 +1,328 @@
+"""
+job_queue.py
+SQLite-backed durable queue for background generation jobs.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from rag.config.settings import (
+    JOBS_DB_PATH,
+    JOB_RESULTS_DIR,
+    JOB_MAX_ATTEMPTS,
+    JOB_LEASE_S,
+)
+from rag.utils.exceptions import JobNotFoundError
+from rag.utils.helpers import ensure_dir
+from rag.utils.logging import logger
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINAL_STATUSES = {SUCCEEDED, FAILED, CANCELLED}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    error TEXT,
+    result_path TEXT,
+    worker_id TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    lease_expires_at REAL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, available_at);
+"""
+
+
+@dataclass
+class Job:
+    """Snapshot of a job row."""
+
+    id: str
+    kind: str
+    status: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+    max_attempts: int = JOB_MAX_ATTEMPTS
+    error: Optional[str] = None
+    result_path: Optional[str] = None
+    worker_id: Optional[str] = None
+    cancel_requested: bool = False
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    available_at: float = 0.0
+    lease_expires_at: Optional[float] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINAL_STATUSES
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        data = dict(row)
+        data["payload"] = json.loads(data["payload"] or "{}")
+        data["cancel_requested"] = bool(data["cancel_requested"])
+        return cls(**data)
+
+
+class JobQueue:
+    """
+    Durable job queue persisted in a local SQLite file.
+
+    Jobs are claimed with a lease; a job whose worker died (lease expired while
+    still ``running``) is handed out again, so runs survive process restarts,
+    until ``max_attempts`` is used up and it is marked failed.
+    Results are written as JSON under ``JOB_RESULTS_DIR``.
+    """
+
+    def __init__(
+        self,
+        db_path: Path = JOBS_DB_PATH,
+        results_dir: Path = JOB_RESULTS_DIR,
+        lease_s: float = JOB_LEASE_S,
+    ):
+        self.db_path = Path(db_path)
+        self.results_dir = Path(results_dir)
+        self.lease_s = lease_s
+        ensure_dir(self.db_path.parent)
+        ensure_dir(self.results_dir)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def submit(
+        self,
+        payload: Dict[str, Any],
+        kind: str = "package",
+        max_attempts: Optional[int] = None,
+    ) -> str:
+        """Enqueue a job and return its id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, max_attempts, created_at, updated_at, available_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    kind,
+                    QUEUED,
+                    json.dumps(payload),
+                    max_attempts or JOB_MAX_ATTEMPTS,
+                    now,
+                    now,
+                    now,
+                ),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Job:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise JobNotFoundError(f"Unknown job id: {job_id}")
+        return Job.from_row(row)
+
+    def list_jobs(self, limit: int = 50, status: Optional[str] = None) -> List[Job]:
+        query = "SELECT * FROM jobs"
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params + (limit,)).fetchall()
+        return [Job.from_row(r) for r in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    def cancel(self, job_id: str) -> Job:
+        """Cancel a queued job, or flag a running one for cancellation."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, now, now, job_id, QUEUED),
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ? AND status = ?",
+                (now, job_id, RUNNING),
+            )
+        return self.get(job_id)
+
+    def load_result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.get(job_id)
+        if job.status != SUCCEEDED or not job.result_path:
+            return None
+        return json.loads(Path(job.result_path).read_text(encoding="utf-8"))
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+    def claim(self, worker_id: str) -> Optional[Job]:
+        """Atomically take the oldest runnable job (or an expired lease)."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # A lease that expired on the last attempt means the worker died mid-run
+            # (OOM, crash in the model runtime); retrying it again would loop forever.
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_expires_at = NULL, finished_at = ?, updated_at = ? "
+                "WHERE status = ? AND lease_expires_at < ? AND attempts >= max_attempts",
+                (FAILED, "Worker lost on the last attempt (lease expired)", now, now, RUNNING, now),
+            )
+            row = conn.execute(
+                "SELECT * FROM jobs "
+                "WHERE (status = ? AND available_at <= ?) "
+                "   OR (status = ? AND lease_expires_at < ? AND attempts < max_attempts) "
+                "ORDER BY created_at LIMIT 1",
+                (QUEUED, now, RUNNING, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, worker_id = ?, "
+                "lease_expires_at = ?, started_at = ?, updated_at = ? WHERE id = ?",
+                (RUNNING, worker_id, now + self.lease_s, now, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return self.get(row["id"])
+
+    def heartbeat(self, job_id: str) -> bool:
+        """Extend the lease of a running job; returns True if cancellation was requested."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET lease_expires_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (now + self.lease_s, now, job_id, RUNNING),
+            )
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def _owned_update(self, job_id: str, worker_id: str, decide) -> bool:
+        """
+        Apply ``decide(row) -> (sql_set, params)`` only while ``worker_id``
+        still holds the running job, in one write transaction.
+
+        A worker whose lease expired and was reclaimed must not overwrite the
+        outcome recorded by the new owner.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE id = ? AND status = ? AND worker_id = ?",
+                (job_id, RUNNING, worker_id),
+            ).fetchone()
+            if row is not None:
+                sql_set, params = decide(row)
+                conn.execute(
+                    f"UPDATE jobs SET {sql_set} WHERE id = ? AND status = ? AND worker_id = ?",
+                    (*params, job_id, RUNNING, worker_id),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        if row is None:
+            logger.warning("Job %s is no longer held by %s; dropping its outcome", job_id, worker_id)
+        return row is not None
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> Optional[Path]:
+        """Persist the result JSON and mark the job as succeeded; ``None`` if the worker lost the job."""
+        path = self.results_dir / f"{job_id}.json"
+        tmp = path.with_suffix(f".{worker_id}.tmp")
+        tmp.write_text(json.dumps(result, indent=2, default=str), encoding="utf-8")
+
+        def decide(row):
+            # Publish the file inside the transaction so a stale worker never replaces the owner's result.
+            tmp.replace(path)
+            now = time.time()
+            return (
+                "status = ?, result_path = ?, error = NULL, lease_expires_at = NULL, finished_at = ?, updated_at = ?",
+                (SUCCEEDED, str(path), now, now),
+            )
+
+        try:
+            return path if self._owned_update(job_id, worker_id, decide) else None
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry_in: float = 0.0) -> Job:
+        """Record a failure; requeue with a delay while attempts remain. No-op if the worker lost the job."""
+
+        def decide(row):
+            now = time.time()
+            retry = row["attempts"] < row["max_attempts"] and not row["cancel_requested"]
+            return (
+                "status = ?, error = ?, available_at = ?, lease_expires_at = NULL, finished_at = ?, updated_at = ?",
+                (QUEUED if retry else FAILED, error, now + retry_in, None if retry else now, now),
+            )
+
+        self._owned_update(job_id, worker_id, decide)
+        return self.get(job_id)
+
+    def mark_cancelled(self, job_id: str, worker_id: str, error: Optional[str] = None) -> None:
+        def decide(row):
+            now = time.time()
+            return (
+                "status = ?, error = ?, lease_expires_at = NULL, finished_at = ?, updated_at = ?",
+                (CANCELLED, error, now, now),
+            )
+
+        self._owned_update(job_id, worker_id, decide)
+
+
+__all__ = [
+    "Job",
+    "JobQueue",
+    "QUEUED",
+    "RUNNING",
+    "SUCCEEDED",
+    "FAILED",
+    "CANCELLED",
+    "FINAL_STATUSES",
+]
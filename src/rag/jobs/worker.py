@@ -0,0 +1,164 @@
+"""
+worker.py
+Thread-based worker pool that drains the background job queue.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+from rag.config.settings import (
+    JOB_WORKERS,
+    JOB_POLL_INTERVAL_S,
+    JOB_RETRY_BACKOFF_S,
+    GENERATION_DEADLINE_S,
+    REUSE_ENABLED,
+)
+from rag.jobs.job_queue import Job, JobQueue
+from rag.utils.cancellation import CancelToken
+from rag.utils.exceptions import GenerationCancelled
+from rag.utils.logging import logger
+
+JobHandler = Callable[[Job, CancelToken], Dict[str, Any]]
+
+
+def run_package_job(job: Job, token: CancelToken) -> Dict[str, Any]:
+    """Default handler: run the full application-package workflow."""
+    from rag.generation.generator import generate_application_package
+
+    payload = job.payload
+    return generate_application_package(
+        payload["jd_text"],
+        save_to_disk=payload.get("save_to_disk", False),
+        token=token,
+        reuse=payload.get("reuse", REUSE_ENABLED),
+    )
+
+
+class WorkerPool:
+    """
+    Pool of worker threads claiming jobs from a :class:`JobQueue`.
+
+    Generation is dominated by waiting on Ollama, so threads are enough to
+    overlap jobs; throughput scales with ``workers`` up to what the LLM
+    backend can serve.
+    """
+
+    def __init__(
+        self,
+        queue: Optional[JobQueue] = None,
+        workers: int = JOB_WORKERS,
+        handler: JobHandler = run_package_job,
+        poll_interval_s: float = JOB_POLL_INTERVAL_S,
+        retry_backoff_s: float = JOB_RETRY_BACKOFF_S,
+    ):
+        self.queue = queue or JobQueue()
+        self.workers = max(1, int(workers))
+        self.handler = handler
+        self.poll_interval_s = poll_interval_s
+        self.retry_backoff_s = retry_backoff_s
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._inflight: Dict[str, str] = {}
+        self._tokens: Dict[str, CancelToken] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def start(self) -> "WorkerPool":
+        if self.running:
+            return self
+        self._stop.clear()
+        # Unique across processes sharing the queue: completions are fenced on the claiming worker id.
+        prefix = f"{socket.gethostname()}-{os.getpid()}"
+        self._threads = [
+            threading.Thread(target=self._work, args=(f"{prefix}-worker-{i}",), name=f"rag-job-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        self._threads.append(
+            threading.Thread(target=self._heartbeat, name="rag-job-heartbeat", daemon=True)
+        )
+        for t in self._threads:
+            t.start()
+        logger.info("Started job worker pool with %d workers", self.workers)
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def inflight(self) -> Dict[str, str]:
+        """Map of job id -> worker id for jobs currently executing."""
+        with self._lock:
+            return dict(self._inflight)
+
+    def cancel(self, job_id: str) -> None:
+        """Cancel a job; a running job in this process is interrupted immediately."""
+        self.queue.cancel(job_id)
+        with self._lock:
+            token = self._tokens.get(job_id)
+        if token is not None:
+            token.cancel("cancelled by user")
+
+    def _work(self, worker_id: str) -> None:
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim(worker_id)
+            except Exception:
+                logger.exception("Job claim failed on %s", worker_id)
+                job = None
+            if job is None:
+                self._stop.wait(self.poll_interval_s)
+                continue
+            self._execute(worker_id, job)
+
+    def _execute(self, worker_id: str, job: Job) -> None:
+        token = CancelToken(job.payload.get("deadline_s", GENERATION_DEADLINE_S))
+        with self._lock:
+            self._inflight[job.id] = worker_id
+            self._tokens[job.id] = token
+        try:
+            if job.cancel_requested:
+                raise GenerationCancelled("cancelled before start")
+            logger.info("%s running job %s (attempt %d/%d)", worker_id, job.id, job.attempts, job.max_attempts)
+            result = self.handler(job, token)
+            self.queue.complete(job.id, worker_id, result)
+        except GenerationCancelled as exc:
+            logger.info("Job %s cancelled: %s", job.id, exc)
+            self.queue.mark_cancelled(job.id, worker_id, str(exc))
+        except Exception as exc:
+            logger.warning("Job %s failed: %s", job.id, exc)
+            self.queue.fail(
+                job.id,
+                worker_id,
+                f"{type(exc).__name__}: {exc}\n{traceback.format_exc()}",
+                retry_in=self.retry_backoff_s * job.attempts,
+            )
+        finally:
+            with self._lock:
+                self._inflight.pop(job.id, None)
+                self._tokens.pop(job.id, None)
+
+    def _heartbeat(self) -> None:
+        # Frequent enough to pick up cancel requests made from other processes.
+        interval = min(max(self.poll_interval_s, 0.5), self.queue.lease_s / 3)
+        while not self._stop.wait(interval):
+            with self._lock:
+                tokens = dict(self._tokens)
+            for job_id, token in tokens.items():
+                try:
+                    if self.queue.heartbeat(job_id):
+                        token.cancel("cancel requested")
+                except Exception:
+                    logger.exception("Heartbeat failed for job %s", job_id)
+
+
+__all__ = ["WorkerPool", "JobHandler", "run_package_job"]
@@ -1,3 +1,11 @@
-from rag.models.embedding_model.factory import EMBEDDINGS
+from rag.models.embedding_model.factory import build_embeddings, build_managed_embeddings, get_embeddings
+from rag.models.embedding_model.managed import ManagedEmbeddings
 
-__all__ = ["EMBEDDINGS"]
+
+def __getattr__(name: str):
+    if name == "EMBEDDINGS":
+        return get_embeddings()
+    raise AttributeError(name)
+
+
+__all__ = ["build_embeddings", "build_managed_embeddings", "get_embeddings", "ManagedEmbeddings", "EMBEDDINGS"]
@@ -5,17 +5,40 @@ Embedding model factory shared across the RAG pipeline.
 
 from __future__ import annotations
 
-import torch
 from langchain_huggingface import HuggingFaceEmbeddings
 
 from rag.config.settings import EMBED_MODEL
+from rag.models.embedding_model.managed import ManagedEmbeddings
+from rag.resources import REGISTRY
 
-device = "cuda" if torch.cuda.is_available() else "cpu"
 
-# Sentence Transformer embeddings used across ingestion/retrieval.
-EMBEDDINGS = HuggingFaceEmbeddings(
-    model_name=EMBED_MODEL,
-    model_kwargs={"device": device},
-)
+def build_embeddings() -> HuggingFaceEmbeddings:
+    """Load the sentence-transformer used across ingestion/retrieval."""
+    import torch
 
-__all__ = ["EMBEDDINGS"]
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    return HuggingFaceEmbeddings(
+        model_name=EMBED_MODEL,
+        model_kwargs={"device": device},
+    )
+
+
+def build_managed_embeddings() -> ManagedEmbeddings:
+    """Embedding model behind an idle-evicting holder (loaded immediately)."""
+    return ManagedEmbeddings(build_embeddings).load()
+
+
+def get_embeddings() -> ManagedEmbeddings:
+    """Return the process-wide embedding model (loaded on first use, unloaded when idle)."""
+    return REGISTRY.get("embeddings")
+
+
+def __getattr__(name: str):
+    # Backwards compatibility: ``EMBEDDINGS`` is resolved lazily so importing
+    # this module no longer loads the model.
+    if name == "EMBEDDINGS":
+        return get_embeddings()
+    raise AttributeError(name)
+
+
+__all__ = ["build_embeddings", "build_managed_embeddings", "get_embeddings", "EMBEDDINGS"]
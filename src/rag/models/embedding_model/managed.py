@@ -0,0 +1,181 @@
+"""
+managed.py
+Embedding model holder that loads on demand and unloads when idle.
+
+Embedding is only needed while ingesting and for the retrieval queries, so a
+long-running server does not need the sentence-transformer resident between
+requests. :class:`ManagedEmbeddings` is a drop-in LangChain ``Embeddings``:
+vector stores keep a reference to the holder, never to the model, so the model
+can be dropped after ``idle_unload_s`` (or while the process is above
+``max_rss_mb``) and is reloaded transparently on the next call.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import gc
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from rag.config.settings import EMBED_CHECK_INTERVAL_S, EMBED_IDLE_UNLOAD_S, EMBED_MAX_RSS_MB
+from rag.utils.helpers import process_rss_bytes
+from rag.utils.logging import logger
+
+
+def _release_memory() -> None:
+    """Give freed model memory back to the OS where the allocator allows it."""
+    gc.collect()
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class ManagedEmbeddings(Embeddings):
+    """``Embeddings`` proxy around a model built by ``loader``, with idle eviction."""
+
+    def __init__(
+        self,
+        loader: Callable[[], Embeddings],
+        idle_unload_s: float = EMBED_IDLE_UNLOAD_S,
+        max_rss_mb: float = EMBED_MAX_RSS_MB,
+        check_interval_s: float = EMBED_CHECK_INTERVAL_S,
+    ):
+        self._loader = loader
+        self.idle_unload_s = idle_unload_s
+        self.max_rss_mb = max_rss_mb
+        self.check_interval_s = check_interval_s
+        self._model: Optional[Embeddings] = None
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._last_used = time.monotonic()
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+        self.loads = 0
+        self.reloads = 0
+        self.unloads = 0
+        self.last_load_s: Optional[float] = None
+        self.last_unload_reason: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self) -> "ManagedEmbeddings":
+        """Load the model now (no-op if resident)."""
+        with self._lock:
+            self._ensure_loaded()
+        return self
+
+    def _ensure_loaded(self) -> Embeddings:
+        # Caller holds self._lock.
+        if self._model is None:
+            start = time.perf_counter()
+            self._model = self._loader()
+            self.last_load_s = time.perf_counter() - start
+            self.loads += 1
+            if self.loads > 1:
+                self.reloads += 1
+            logger.info("Embedding model loaded in %.2fs (load #%d)", self.last_load_s, self.loads)
+            self._start_reaper()
+        self._last_used = time.monotonic()
+        return self._model
+
+    def unload(self, reason: str = "manual") -> bool:
+        """Drop the model unless an embedding call is in flight."""
+        with self._lock:
+            if self._model is None or self._in_use:
+                return False
+            self._model = None
+            self.unloads += 1
+            self.last_unload_reason = reason
+        _release_memory()
+        logger.info("Embedding model unloaded (%s)", reason)
+        return True
+
+    def idle_for(self) -> float:
+        return time.monotonic() - self._last_used
+
+    def maybe_evict(self) -> Optional[str]:
+        """Unload if idle for too long or the process is over its memory ceiling."""
+        if self._model is None or self._in_use:
+            return None
+        if self.idle_unload_s and self.idle_for() >= self.idle_unload_s:
+            reason = "idle"
+        elif self.max_rss_mb and process_rss_bytes() / 1e6 > self.max_rss_mb:
+            reason = "memory"
+        else:
+            return None
+        return reason if self.unload(reason) else None
+
+    def _start_reaper(self) -> None:
+        if not (self.idle_unload_s or self.max_rss_mb):
+            return
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+        self._stop.clear()
+        self._reaper = threading.Thread(target=self._reap, name="rag-embeddings-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap(self) -> None:
+        while not self._stop.wait(self.check_interval_s):
+            try:
+                if self.maybe_evict() or self._model is None:
+                    return
+            except Exception:
+                logger.exception("Embedding model eviction check failed")
+
+    def close(self) -> None:
+        self._stop.set()
+        self.unload("close")
+
+    @contextmanager
+    def _use(self) -> Iterator[Embeddings]:
+        with self._lock:
+            model = self._ensure_loaded()
+            self._in_use += 1
+        try:
+            yield model
+        finally:
+            with self._lock:
+                self._in_use -= 1
+                self._last_used = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Embeddings interface
+    # ------------------------------------------------------------------
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self._use() as model:
+            return model.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with self._use() as model:
+            return model.embed_query(text)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model_loaded": self.loaded,
+            "loads": self.loads,
+            "reloads": self.reloads,
+            "unloads": self.unloads,
+            "last_unload_reason": self.last_unload_reason,
+            "idle_s": round(self.idle_for(), 1),
+            "rss_mb": round(process_rss_bytes() / 1e6, 1),
+        }
+
+
+__all__ = ["ManagedEmbeddings"]
@@ -1,3 +1,3 @@
-from rag.models.llm.ollama_client import run_prompt
+from rag.models.llm.ollama_client import OllamaClient, get_client, run_prompt, get_llm_stats
 
-__all__ = ["run_prompt"]
+__all__ = ["OllamaClient", "get_client", "run_prompt", "get_llm_stats"]
@@ -0,0 +1,182 @@
+"""
+host_pool.py
+Least-loaded routing across a pool of Ollama hosts.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from rag.config.settings import (
+    LLM_MAX_CONCURRENCY_PER_HOST,
+    LLM_EJECT_AFTER_FAILURES,
+    LLM_EJECT_COOLDOWN_S,
+    LLM_PROBE_TIMEOUT_S,
+)
+from rag.utils.cancellation import CancelToken
+from rag.utils.exceptions import LLMError, LLMTimeoutError
+from rag.utils.logging import logger
+
+
+def probe_host(url: str, timeout_s: float = LLM_PROBE_TIMEOUT_S) -> bool:
+    """Cheap liveness check against the Ollama tags endpoint."""
+    try:
+        resp = httpx.get(f"{url.rstrip('/')}/api/tags", timeout=timeout_s)
+        return resp.status_code == 200
+    except httpx.HTTPError:
+        return False
+
+
+@dataclass
+class HostState:
+    url: str
+    max_concurrency: int
+    inflight: int = 0
+    consecutive_failures: int = 0
+    ejected_until: float = 0.0
+    probing: bool = False
+    calls: int = 0
+    failures: int = 0
+    ejections: int = 0
+    ewma_latency_s: float = 0.0
+
+    @property
+    def ejected(self) -> bool:
+        return self.ejected_until > 0.0
+
+    @property
+    def load(self) -> float:
+        return self.inflight / self.max_concurrency
+
+
+class HostPool:
+    """
+    Route calls to the least-loaded healthy host, honouring per-host caps.
+
+    A host is ejected after ``eject_after`` consecutive failures. Once its
+    cooldown elapses it is re-probed before taking traffic again; a failed
+    probe doubles the cooldown (capped at 10x).
+    """
+
+    def __init__(
+        self,
+        hosts: List[str],
+        max_concurrency: int = LLM_MAX_CONCURRENCY_PER_HOST,
+        eject_after: int = LLM_EJECT_AFTER_FAILURES,
+        cooldown_s: float = LLM_EJECT_COOLDOWN_S,
+        probe: Callable[[str], bool] = probe_host,
+    ):
+        if not hosts:
+            raise LLMError("HostPool needs at least one Ollama host")
+        self.hosts: Dict[str, HostState] = {
+            url: HostState(url=url, max_concurrency=max(1, max_concurrency)) for url in dict.fromkeys(hosts)
+        }
+        self.eject_after = max(1, eject_after)
+        self.cooldown_s = cooldown_s
+        self.probe = probe
+        self._cond = threading.Condition()
+        self._cooldowns: Dict[str, float] = {url: cooldown_s for url in self.hosts}
+
+    def acquire(self, deadline: Optional[float] = None, token: Optional[CancelToken] = None) -> HostState:
+        """Reserve a slot on the best host, waiting for capacity until ``deadline``."""
+        while True:
+            if token is not None:
+                token.check()
+            with self._cond:
+                now = time.monotonic()
+                host = self._pick()
+                if host is not None:
+                    host.inflight += 1
+                    host.calls += 1
+                    return host
+                to_probe = [
+                    h for h in self.hosts.values()
+                    if h.ejected and not h.probing and h.ejected_until <= now
+                ]
+                for h in to_probe:
+                    h.probing = True
+                if not to_probe:
+                    wait = self._next_wakeup(now, deadline)
+                    if wait is not None and wait <= 0:
+                        raise LLMTimeoutError("No Ollama host had capacity before the deadline")
+                    if token is not None:
+                        # Wake periodically so a cancelled request stops queueing.
+                        wait = 0.5 if wait is None else min(wait, 0.5)
+                    self._cond.wait(wait)
+                    continue
+            self._probe_all(to_probe)
+
+    def release(self, host: HostState, ok: bool, latency_s: float = 0.0) -> None:
+        """Return a slot; ``ok=False`` counts towards ejecting the host."""
+        with self._cond:
+            host.inflight = max(0, host.inflight - 1)
+            if ok:
+                host.consecutive_failures = 0
+                host.ewma_latency_s = (
+                    latency_s if host.ewma_latency_s == 0.0 else 0.8 * host.ewma_latency_s + 0.2 * latency_s
+                )
+            else:
+                host.failures += 1
+                host.consecutive_failures += 1
+                if host.consecutive_failures >= self.eject_after and not host.ejected:
+                    host.ejected_until = time.monotonic() + self._cooldowns[host.url]
+                    host.ejections += 1
+                    logger.warning(
+                        "Ejecting Ollama host %s for %.0fs after %d failures",
+                        host.url,
+                        self._cooldowns[host.url],
+                        host.consecutive_failures,
+                    )
+            self._cond.notify_all()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            return [
+                {
+                    "url": h.url,
+                    "healthy": not h.ejected,
+                    "inflight": h.inflight,
+                    "max_concurrency": h.max_concurrency,
+                    "calls": h.calls,
+                    "failures": h.failures,
+                    "ejections": h.ejections,
+                    "ewma_latency_s": h.ewma_latency_s,
+                }
+                for h in self.hosts.values()
+            ]
+
+    def _pick(self) -> Optional[HostState]:
+        candidates = [h for h in self.hosts.values() if not h.ejected and h.inflight < h.max_concurrency]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda h: (h.load, h.ewma_latency_s))
+
+    def _next_wakeup(self, now: float, deadline: Optional[float]) -> Optional[float]:
+        waits = [h.ejected_until - now for h in self.hosts.values() if h.ejected and not h.probing]
+        if deadline is not None:
+            waits.append(deadline - now)
+        return min(waits) if waits else None
+
+    def _probe_all(self, hosts: List[HostState]) -> None:
+        results = {h.url: self.probe(h.url) for h in hosts}
+        with self._cond:
+            now = time.monotonic()
+            for h in hosts:
+                h.probing = False
+                if results[h.url]:
+                    logger.info("Ollama host %s is healthy again", h.url)
+                    h.ejected_until = 0.0
+                    h.consecutive_failures = 0
+                    self._cooldowns[h.url] = self.cooldown_s
+                else:
+                    self._cooldowns[h.url] = min(self._cooldowns[h.url] * 2, self.cooldown_s * 10)
+                    h.ejected_until = now + self._cooldowns[h.url]
+            self._cond.notify_all()
+
+
+__all__ = ["HostPool", "HostState", "probe_host"]
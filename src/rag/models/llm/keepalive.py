@@ -0,0 +1,141 @@
+"""
+keepalive.py
+Model warmup and business-hours heartbeat for Ollama hosts.
+
+Ollama unloads a model once its ``keep_alive`` expires, and the next request
+pays the load. :func:`warm_model` loads the model on a host (a chat request
+with no messages does exactly that), and :class:`ModelHeartbeat` repeats it
+every ``interval_s`` during the configured hours so the model stays resident
+while users are around, and is allowed to expire overnight.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import httpx
+
+from rag.config.settings import (
+    LLM_HEARTBEAT_DAYS,
+    LLM_HEARTBEAT_HOURS,
+    LLM_HEARTBEAT_INTERVAL_S,
+    LLM_KEEP_ALIVE,
+    LLM_TIMEOUT_S,
+)
+from rag.utils.logging import logger
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def _minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.strip().split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def in_business_hours(
+    now: Optional[datetime] = None,
+    hours: str = LLM_HEARTBEAT_HOURS,
+    days: Iterable[str] = LLM_HEARTBEAT_DAYS,
+) -> bool:
+    """Whether ``now`` (local time) falls in ``hours`` ("HH:MM-HH:MM") on one of ``days``."""
+    now = now or datetime.now()
+    if WEEKDAYS[now.weekday()] not in {d.lower()[:3] for d in days}:
+        return False
+    start, end = (_minutes(part) for part in hours.split("-"))
+    minute = now.hour * 60 + now.minute
+    if start <= end:
+        return start <= minute < end
+    return minute >= start or minute < end  # window spans midnight
+
+
+def warm_model(
+    url: str,
+    model: str,
+    keep_alive: Union[str, int] = LLM_KEEP_ALIVE,
+    timeout_s: float = LLM_TIMEOUT_S,
+) -> float:
+    """Load ``model`` on the Ollama host at ``url``; returns Ollama's load time in seconds."""
+    resp = httpx.post(
+        f"{url.rstrip('/')}/api/chat",
+        json={"model": model, "messages": [], "keep_alive": keep_alive, "stream": False},
+        timeout=timeout_s,
+    )
+    resp.raise_for_status()
+    return (resp.json().get("load_duration") or 0) / 1e9
+
+
+class ModelHeartbeat:
+    """Daemon thread that keeps the model loaded on every healthy host during business hours."""
+
+    def __init__(
+        self,
+        client: Any,
+        interval_s: float = LLM_HEARTBEAT_INTERVAL_S,
+        hours: str = LLM_HEARTBEAT_HOURS,
+        days: Iterable[str] = LLM_HEARTBEAT_DAYS,
+    ):
+        self.client = client
+        self.interval_s = interval_s
+        self.hours = hours
+        self.days = list(days)
+        self.pings = 0
+        self.failures = 0
+        self.reloads = 0
+        self.last_ping_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "ModelHeartbeat":
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="rag-llm-heartbeat", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def beat(self) -> List[Dict[str, Any]]:
+        """Ping every healthy host once (regardless of the schedule)."""
+        results = []
+        for host in self.client.pool.snapshot():
+            if not host["healthy"]:
+                continue
+            try:
+                load_s = warm_model(host["url"], self.client.model, self.client.keep_alive)
+                self.pings += 1
+                if load_s >= self.client.stats.cold_threshold_s:
+                    # The model had been evicted anyway (memory pressure, restart).
+                    self.reloads += 1
+                results.append({"url": host["url"], "load_s": load_s})
+            except httpx.HTTPError as exc:
+                self.failures += 1
+                logger.warning("LLM heartbeat to %s failed: %s", host["url"], exc)
+                results.append({"url": host["url"], "error": str(exc)})
+        self.last_ping_at = time.time()
+        return results
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            if in_business_hours(hours=self.hours, days=self.days):
+                self.beat()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "pings": self.pings,
+            "failures": self.failures,
+            "reloads": self.reloads,
+            "last_ping_at": self.last_ping_at,
+            "in_hours": in_business_hours(hours=self.hours, days=self.days),
+        }
+
+
+__all__ = ["ModelHeartbeat", "in_business_hours", "warm_model"]
@@ -1,37 +1,383 @@
 """
 ollama_client.py
 Shared LangChain Ollama client + helper to run prompts.
+
+One ``ChatOllama`` (and therefore one pooled HTTP client) is kept per Ollama
+host, prompt chains are compiled once per host and system prompt, calls are
+routed to the least-loaded healthy host, and every call is bounded by a
+deadline and retried with backoff on transient failures.
+
+Every call carries the configured ``keep_alive``; :meth:`OllamaClient.warmup`
+preloads the model on each host and a :class:`ModelHeartbeat` keeps it
+resident during business hours. Calls whose Ollama ``load_duration`` exceeds
+``cold_load_threshold_s`` are counted as cold starts, separately from warm calls.
 """
 
 from __future__ import annotations
 
+import json
 import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import httpx
 from langchain_ollama import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable
+from ollama import ResponseError
+
+from rag.config.settings import (
+    MODEL_NAME,
+    OLLAMA_HOSTS,
+    LLM_TEMPERATURE,
+    LLM_TIMEOUT_S,
+    LLM_CONNECT_TIMEOUT_S,
+    LLM_READ_TIMEOUT_S,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BACKOFF_S,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_KEEP_ALIVE,
+    LLM_COLD_LOAD_THRESHOLD_S,
+)
+from rag.models.llm.host_pool import HostPool, HostState
+from rag.models.llm.keepalive import ModelHeartbeat, warm_model
+from rag.resources import REGISTRY
+from rag.utils.cancellation import CancelToken
+from rag.utils.exceptions import RagError, LLMError, LLMTimeoutError
+from rag.utils.logging import logger
 
-from rag.config.settings import MODEL_NAME, OLLAMA_HOST
 LLM_MODEL = os.getenv("LLM_MODEL", MODEL_NAME)
 
-llm = ChatOllama(
-    base_url=OLLAMA_HOST,
-    model=LLM_MODEL,
-    temperature=0.3,
-)
-parser = StrOutputParser()
 
+def is_transient(exc: BaseException) -> bool:
+    """Network hiccups, timeouts and 5xx/429 responses are worth retrying."""
+    if isinstance(exc, (httpx.TransportError, LLMTimeoutError)):
+        return True
+    if isinstance(exc, ResponseError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return False
+
+
+def is_host_fault(exc: BaseException) -> bool:
+    """Failures that say something about the host (not our own deadline)."""
+    return is_transient(exc) and not isinstance(exc, LLMTimeoutError)
+
+
+class LLMStats:
+    """Thread-safe call, retry and latency counters (cold and warm calls split)."""
+
+    def __init__(self, cold_threshold_s: float = LLM_COLD_LOAD_THRESHOLD_S):
+        self._lock = threading.Lock()
+        self.cold_threshold_s = cold_threshold_s
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = 0
+            self.successes = 0
+            self.failures = 0
+            self.retries = 0
+            self.timeouts = 0
+            self.cancelled = 0
+            self.truncated = 0
+            self.total_latency_s = 0.0
+            self.max_latency_s = 0.0
+            self.last_latency_s = 0.0
+            self.cold_calls = 0
+            self.cold_latency_s = 0.0
+            self.cold_load_s = 0.0
+            self.warm_calls = 0
+            self.warm_latency_s = 0.0
+            self.warmups = 0
+            self.warmup_load_s = 0.0
+
+    def record(self, latency_s: float, ok: bool, load_s: Optional[float] = None) -> None:
+        """``load_s`` is Ollama's ``load_duration`` for the call, when known."""
+        with self._lock:
+            self.calls += 1
+            if ok:
+                self.successes += 1
+            else:
+                self.failures += 1
+            self.total_latency_s += latency_s
+            self.last_latency_s = latency_s
+            self.max_latency_s = max(self.max_latency_s, latency_s)
+            if ok and load_s is not None:
+                if load_s >= self.cold_threshold_s:
+                    self.cold_calls += 1
+                    self.cold_latency_s += latency_s
+                    self.cold_load_s += load_s
+                else:
+                    self.warm_calls += 1
+                    self.warm_latency_s += latency_s
+
+    def record_warmup(self, load_s: float) -> None:
+        with self._lock:
+            self.warmups += 1
+            self.warmup_load_s += load_s
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "successes": self.successes,
+                "failures": self.failures,
+                "retries": self.retries,
+                "timeouts": self.timeouts,
+                "cancelled": self.cancelled,
+                "truncated": self.truncated,
+                "avg_latency_s": self.total_latency_s / self.calls if self.calls else 0.0,
+                "max_latency_s": self.max_latency_s,
+                "last_latency_s": self.last_latency_s,
+                "cold_calls": self.cold_calls,
+                "avg_cold_latency_s": self.cold_latency_s / self.cold_calls if self.cold_calls else 0.0,
+                "avg_cold_load_s": self.cold_load_s / self.cold_calls if self.cold_calls else 0.0,
+                "warm_calls": self.warm_calls,
+                "avg_warm_latency_s": self.warm_latency_s / self.warm_calls if self.warm_calls else 0.0,
+                "warmups": self.warmups,
+                "warmup_load_s": self.warmup_load_s,
+            }
 
-def run_prompt(system_prompt: str, user_text: str) -> str:
-    """Build a chat prompt and invoke the Ollama model."""
-    prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", system_prompt),
-            ("user", "{input}"),
-        ]
+
+class OllamaClient:
+    """Pooled Ollama chat client with per-call deadlines and retries."""
+
+    def __init__(
+        self,
+        hosts: Optional[List[str]] = None,
+        model: str = LLM_MODEL,
+        temperature: float = LLM_TEMPERATURE,
+        timeout_s: float = LLM_TIMEOUT_S,
+        connect_timeout_s: float = LLM_CONNECT_TIMEOUT_S,
+        read_timeout_s: float = LLM_READ_TIMEOUT_S,
+        max_retries: int = LLM_MAX_RETRIES,
+        retry_backoff_s: float = LLM_RETRY_BACKOFF_S,
+        max_connections: int = LLM_MAX_CONNECTIONS,
+        max_keepalive_connections: int = LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keep_alive: Any = LLM_KEEP_ALIVE,
+        pool: Optional[HostPool] = None,
+    ):
+        self.pool = pool or HostPool(hosts or OLLAMA_HOSTS)
+        self.model = model
+        self.temperature = temperature
+        self.timeout_s = timeout_s
+        self.max_retries = max_retries
+        self.retry_backoff_s = retry_backoff_s
+        self.keep_alive = keep_alive
+        self.stats = LLMStats()
+        self.heartbeat: Optional[ModelHeartbeat] = None
+        self.llms: Dict[str, ChatOllama] = {
+            url: ChatOllama(
+                base_url=url,
+                model=model,
+                temperature=temperature,
+                keep_alive=keep_alive,
+                client_kwargs={
+                    "timeout": httpx.Timeout(read_timeout_s, connect=connect_timeout_s),
+                    "limits": httpx.Limits(
+                        max_connections=max_connections,
+                        max_keepalive_connections=max_keepalive_connections,
+                    ),
+                },
+            )
+            for url in self.pool.hosts
+        }
+        self._chains: Dict[Tuple[str, str, str], Runnable] = {}
+        self._lock = threading.Lock()
+
+    def chain_for(
+        self,
+        host: str,
+        system_prompt: str,
+        options: Optional[Dict[str, Any]] = None,
+        stop: Optional[Sequence[str]] = None,
+    ) -> Runnable:
+        """Return the compiled ``prompt | llm`` chain for a host, system prompt, options and stop list."""
+        options_key = json.dumps([options or {}, list(stop or [])], sort_keys=True) if options or stop else ""
+        key = (host, system_prompt, options_key)
+        chain = self._chains.get(key)
+        if chain is None:
+            with self._lock:
+                chain = self._chains.get(key)
+                if chain is None:
+                    prompt = ChatPromptTemplate.from_messages(
+                        [
+                            ("system", system_prompt),
+                            ("user", "{input}"),
+                        ]
+                    )
+                    llm = self.llms[host]
+                    bound: Dict[str, Any] = {}
+                    if options:
+                        # Ollama replaces the whole options block, so keep the defaults.
+                        bound["options"] = {"temperature": self.temperature, **options}
+                    if stop:
+                        # ChatOllama overwrites options["stop"] with the call-level stop.
+                        bound["stop"] = list(stop)
+                    if bound:
+                        llm = llm.bind(**bound)
+                    chain = prompt | llm
+                    self._chains[key] = chain
+        return chain
+
+    def run(
+        self,
+        system_prompt: str,
+        user_text: str,
+        timeout_s: Optional[float] = None,
+        token: Optional[CancelToken] = None,
+        options: Optional[Dict[str, Any]] = None,
+        name: Optional[str] = None,
+        stop: Optional[Sequence[str]] = None,
+    ) -> str:
+        """
+        Invoke the model, retrying transient errors until the deadline.
+
+        ``options`` are Ollama decode options (``num_predict``,
+        ``temperature``...) and ``stop`` the stop sequences; ``name`` labels
+        the call in truncation logs.
+        """
+        deadline = time.monotonic() + (timeout_s or self.timeout_s)
+        if token is not None and token.deadline is not None:
+            deadline = min(deadline, token.deadline)
+        attempt = 0
+        while True:
+            host: Optional[HostState] = None
+            start = time.monotonic()
+            try:
+                host = self.pool.acquire(deadline, token)
+                start = time.monotonic()
+                chain = self.chain_for(host.url, system_prompt, options, stop)
+                text, meta = self._stream(chain, user_text, deadline, token)
+            except Exception as exc:
+                latency = time.monotonic() - start
+                if host is not None:
+                    self.pool.release(host, ok=not is_host_fault(exc), latency_s=latency)
+                if token is not None and (token.cancelled or token.expired):
+                    self.stats.incr("cancelled")
+                    token.check()
+                self.stats.record(latency, ok=False)
+                if isinstance(exc, (LLMTimeoutError, httpx.TimeoutException)):
+                    self.stats.incr("timeouts")
+                remaining = deadline - time.monotonic()
+                if not is_transient(exc) or attempt >= self.max_retries or remaining <= 0:
+                    if isinstance(exc, RagError):
+                        raise
+                    where = host.url if host is not None else "Ollama"
+                    raise LLMError(f"Call to {where} failed: {exc}") from exc
+                delay = min(self.retry_backoff_s * (2 ** attempt) * (1 + random.random() / 2), remaining)
+                logger.warning("Transient LLM error (%s); retry %d in %.1fs", exc, attempt + 1, delay)
+                self.stats.incr("retries")
+                attempt += 1
+                if token is not None:
+                    token.wait(delay)
+                else:
+                    time.sleep(delay)
+                continue
+            latency = time.monotonic() - start
+            self.pool.release(host, ok=True, latency_s=latency)
+            load_ns = meta.get("load_duration")
+            self.stats.record(latency, ok=True, load_s=load_ns / 1e9 if load_ns is not None else None)
+            if meta.get("done_reason") == "length":
+                self.stats.incr("truncated")
+                logger.warning(
+                    "LLM output for %s truncated at num_predict=%s (eval_count=%s, %d words)",
+                    name or "prompt",
+                    (options or {}).get("num_predict"),
+                    meta.get("eval_count"),
+                    len(text.split()),
+                )
+            return text
+
+    def warmup(self) -> Dict[str, float]:
+        """Load the model on every healthy host; returns Ollama's load time per host."""
+        loaded = {}
+        for host in self.pool.snapshot():
+            if not host["healthy"]:
+                continue
+            try:
+                load_s = warm_model(host["url"], self.model, self.keep_alive)
+            except httpx.HTTPError as exc:
+                logger.warning("Warmup of %s on %s failed: %s", self.model, host["url"], exc)
+                continue
+            self.stats.record_warmup(load_s)
+            loaded[host["url"]] = load_s
+            logger.info("Warmed up %s on %s (load %.2fs)", self.model, host["url"], load_s)
+        return loaded
+
+    def start_heartbeat(self, **kwargs: Any) -> ModelHeartbeat:
+        """Start (once) the business-hours keep-alive pings."""
+        if self.heartbeat is None:
+            self.heartbeat = ModelHeartbeat(self, **kwargs)
+        return self.heartbeat.start()
+
+    def _stream(
+        self,
+        chain: Runnable,
+        user_text: str,
+        deadline: float,
+        token: Optional[CancelToken] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Stream one answer; returns the text and the final chunk's metadata."""
+        parts = []
+        meta: Dict[str, Any] = {}
+        stream = chain.stream({"input": user_text})
+        try:
+            for chunk in stream:
+                parts.append(chunk.content)
+                if chunk.response_metadata:
+                    meta = chunk.response_metadata
+                if token is not None:
+                    token.check()
+                if time.monotonic() > deadline:
+                    raise LLMTimeoutError("LLM call exceeded its deadline")
+        finally:
+            # Closing the generator closes the underlying HTTP response, which
+            # makes Ollama stop decoding for this request.
+            stream.close()
+        return "".join(parts), meta
+
+
+def get_client() -> OllamaClient:
+    """Return the process-wide Ollama client (singleton)."""
+    return REGISTRY.get("llm")
+
+
+def run_prompt(
+    system_prompt: str,
+    user_text: str,
+    timeout_s: Optional[float] = None,
+    token: Optional[CancelToken] = None,
+    options: Optional[Dict[str, Any]] = None,
+    name: Optional[str] = None,
+    stop: Optional[Sequence[str]] = None,
+) -> str:
+    """Run a system + user prompt through the shared Ollama client."""
+    return get_client().run(
+        system_prompt, user_text, timeout_s=timeout_s, token=token, options=options, name=name, stop=stop
     )
-    chain = prompt | llm | parser
-    return chain.invoke({"input": user_text})
 
 
-__all__ = ["run_prompt"]
+def get_llm_stats() -> Dict[str, Any]:
+    """Retry and latency counters for the shared client, plus per-host state."""
+    client = get_client()
+    heartbeat = client.heartbeat.snapshot() if client.heartbeat is not None else None
+    return {**client.stats.snapshot(), "hosts": client.pool.snapshot(), "heartbeat": heartbeat}
+
+
+__all__ = [
+    "OllamaClient",
+    "LLMStats",
+    "get_client",
+    "run_prompt",
+    "get_llm_stats",
+    "is_transient",
+    "is_host_fault",
+]
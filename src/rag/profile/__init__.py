@@ -2,14 +2,26 @@ from rag.profile.service import (
     load_profile,
     save_profile,
     reset_profile,
-    DEFAULT_PROFILE_PATH,
+    profile_tenant,
+    profile_version,
+    DEFAULT_PROFILE,
     PROFILE_STORE_PATH,
 )
+from rag.profile.compiled import (
+    CompiledProfile,
+    get_compiled_profile,
+    COMPILED_PROFILE_PATH,
+)
 
 __all__ = [
     "load_profile",
     "save_profile",
     "reset_profile",
-    "DEFAULT_PROFILE_PATH",
+    "profile_tenant",
+    "profile_version",
+    "DEFAULT_PROFILE",
     "PROFILE_STORE_PATH",
+    "CompiledProfile",
+    "get_compiled_profile",
+    "COMPILED_PROFILE_PATH",
 ]
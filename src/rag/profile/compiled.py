@@ -0,0 +1,132 @@
+"""
+compiled.py
+Profile-derived prompt material, built once per profile version.
+
+:func:`~rag.profile.service.save_profile` compiles the profile and persists
+the result next to ``profile_settings.json``:
+
+- the rendered ``[PROFILE]`` context block used by the generator;
+- the quick-answer system prompt and role label used by the query pipeline;
+- a skill index (normalized key -> profile skill) used by alignment.
+
+Requests call :func:`get_compiled_profile`, which hashes the current
+settings and recompiles only when that hash no longer matches (the JSON was
+edited by hand, or ``COMPILED_FORMAT`` was bumped after a renderer change).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from rag.profile.service import PROFILE_STORE_PATH, load_profile, profile_version
+from rag.utils.helpers import ensure_dir
+from rag.utils.logging import logger
+from rag.utils.text import skill_key
+
+COMPILED_PROFILE_PATH = PROFILE_STORE_PATH.with_name("profile_compiled.json")
+
+# Bump whenever a renderer's output changes so persisted artifacts are rebuilt.
+COMPILED_FORMAT = 1
+
+_lock = threading.Lock()
+_current: Optional["CompiledProfile"] = None
+
+
+@dataclass(frozen=True)
+class CompiledProfile:
+    version: str
+    profile_block: str
+    system_prompt: str
+    role_label: str
+    skills: Tuple[str, ...]
+    skill_index: Dict[str, str]
+    format: int = COMPILED_FORMAT
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompiledProfile":
+        return cls(**{**data, "skills": tuple(data["skills"])})
+
+
+def build_skill_index(skills: Sequence[str]) -> Dict[str, str]:
+    """Normalized key -> first profile skill with that key."""
+    index: Dict[str, str] = {}
+    for skill in skills:
+        index.setdefault(skill_key(skill), skill)
+    return index
+
+
+def compile_profile(profile: Dict[str, Any]) -> CompiledProfile:
+    # Imported here: rag.generation imports rag.profile.
+    from rag.generation.context_builder import render_profile_block
+    from rag.generation.prompts.templates import build_basic_system_prompt, profile_role_label
+
+    skills = tuple(profile.get("skills", []))
+    return CompiledProfile(
+        version=profile_version(profile),
+        profile_block=render_profile_block(profile),
+        system_prompt=build_basic_system_prompt(profile),
+        role_label=profile_role_label(profile),
+        skills=skills,
+        skill_index=build_skill_index(skills),
+    )
+
+
+def _read(version: str) -> Optional[CompiledProfile]:
+    try:
+        data = json.loads(COMPILED_PROFILE_PATH.read_text(encoding="utf-8"))
+        if data.get("version") != version or data.get("format") != COMPILED_FORMAT:
+            return None
+        return CompiledProfile.from_dict(data)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, TypeError, KeyError) as exc:
+        logger.warning("Ignoring unreadable compiled profile %s: %s", COMPILED_PROFILE_PATH, exc)
+        return None
+
+
+def _write(compiled: CompiledProfile) -> None:
+    ensure_dir(COMPILED_PROFILE_PATH.parent)
+    tmp = COMPILED_PROFILE_PATH.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(asdict(compiled), indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, COMPILED_PROFILE_PATH)
+
+
+def refresh_compiled_profile(profile: Dict[str, Any]) -> CompiledProfile:
+    """Compile ``profile``, persist the artifact and make it current."""
+    global _current
+    compiled = compile_profile(profile)
+    with _lock:
+        _write(compiled)
+        _current = compiled
+    return compiled
+
+
+def get_compiled_profile(profile: Optional[Dict[str, Any]] = None) -> CompiledProfile:
+    """Compiled form of ``profile`` (default: the saved one), rebuilt only when it changed."""
+    global _current
+    if profile is None:
+        profile = load_profile()
+    version = profile_version(profile)
+    with _lock:
+        if _current is not None and _current.version == version:
+            return _current
+        compiled = _read(version)
+        if compiled is None:
+            compiled = compile_profile(profile)
+            _write(compiled)
+        _current = compiled
+        return compiled
+
+
+__all__ = [
+    "COMPILED_PROFILE_PATH",
+    "CompiledProfile",
+    "build_skill_index",
+    "compile_profile",
+    "get_compiled_profile",
+    "refresh_compiled_profile",
+]
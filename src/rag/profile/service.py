@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import re
 from copy import deepcopy
 from pathlib import Path
 from typing import Any, Dict
 
-from rag.config.settings import RAG_DIR
+from rag.config.settings import RAG_DIR, DEFAULT_TENANT
 from rag.utils.helpers import ensure_dir
 
 PROFILE_STORE_PATH = RAG_DIR / "profile_settings.json"
@@ -109,20 +111,37 @@ def load_profile() -> Dict[str, Any]:
 
 
 def save_profile(profile: Dict[str, Any]) -> None:
+    """Persist the settings and rebuild the compiled profile next to them."""
+    # Imported here: compiled.py imports this module.
+    from rag.profile.compiled import refresh_compiled_profile
+
     ensure_dir(PROFILE_STORE_PATH.parent)
     with PROFILE_STORE_PATH.open("w", encoding="utf-8") as fh:
         json.dump(profile, fh, indent=2)
+    refresh_compiled_profile(profile)
 
 
 def reset_profile() -> Dict[str, Any]:
-    ensure_dir(PROFILE_STORE_PATH.parent)
-    with PROFILE_STORE_PATH.open("w", encoding="utf-8") as fh:
-        json.dump(DEFAULT_PROFILE, fh, indent=2)
+    save_profile(deepcopy(DEFAULT_PROFILE))
     return deepcopy(DEFAULT_PROFILE)
 
 
+def profile_version(profile: Dict[str, Any]) -> str:
+    """Short hash of the profile settings; changes whenever any field changes."""
+    payload = json.dumps(profile, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def profile_tenant(profile: Dict[str, Any]) -> str:
+    """Tenant id used to scope vector collections: explicit ``tenant`` or the name slug."""
+    tenant = profile.get("tenant") or profile.get("name") or DEFAULT_TENANT
+    return re.sub(r"[^a-z0-9]+", "-", str(tenant).lower()).strip("-") or DEFAULT_TENANT
+
+
 __all__ = [
     "DEFAULT_PROFILE",
+    "profile_tenant",
+    "profile_version",
     "PROFILE_STORE_PATH",
     "load_profile",
     "save_profile",
@@ -0,0 +1,249 @@
+"""
+resources.py
+Process-wide registry for the heavy shared resources of the RAG stack.
+
+Each resource (embedding model, vector store, LLM client) is built once per
+process on first use, or up front via :func:`warmup`, and reports its load
+time and health so the UI can surface cold starts. The embedding model sits
+behind a holder that unloads it when idle and reloads it on demand (see
+:mod:`rag.models.embedding_model.managed`); its load/unload counts and the
+process RSS are part of its health entry.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from rag.utils.logging import logger
+
+# Listing and counting every collection is a server round trip per collection;
+# the sidebar calls health() on every rerun.
+CHROMA_HEALTH_TTL_S = 30.0
+
+
+@dataclass
+class ResourceStatus:
+    name: str
+    loaded: bool = False
+    loading: bool = False
+    load_time_s: Optional[float] = None
+    loaded_at: Optional[float] = None
+    error: Optional[str] = None
+
+
+class ResourceRegistry:
+    """Lazily built, thread-safe singletons keyed by name."""
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._checks: Dict[str, Callable[[Any], Dict[str, Any]]] = {}
+        self._check_ttl: Dict[str, float] = {}
+        self._check_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._status: Dict[str, ResourceStatus] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def register(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        check: Optional[Callable[[Any], Dict[str, Any]]] = None,
+        check_ttl_s: float = 0.0,
+    ) -> None:
+        """``check`` adds live fields to the health entry; its result is reused for ``check_ttl_s``."""
+        self._loaders[name] = loader
+        if check is not None:
+            self._checks[name] = check
+            self._check_ttl[name] = check_ttl_s
+        self._status.setdefault(name, ResourceStatus(name=name))
+        self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Any:
+        """Return the shared instance, building it on first use."""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._locks[name]:
+            instance = self._instances.get(name)
+            if instance is not None:
+                return instance
+            status = self._status[name]
+            status.loading = True
+            start = time.perf_counter()
+            try:
+                instance = self._loaders[name]()
+            except Exception as exc:
+                status.error = f"{type(exc).__name__}: {exc}"
+                raise
+            finally:
+                status.loading = False
+            status.load_time_s = time.perf_counter() - start
+            status.loaded_at = time.time()
+            status.loaded = True
+            status.error = None
+            self._instances[name] = instance
+            logger.info("Loaded resource %s in %.2fs", name, status.load_time_s)
+            return instance
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def reset(self, name: str) -> None:
+        """Drop an instance so the next ``get`` rebuilds it."""
+        with self._locks[name]:
+            self._instances.pop(name, None)
+            self._check_cache.pop(name, None)
+            self._status[name] = ResourceStatus(name=name)
+
+    def warmup(self, names: Optional[Iterable[str]] = None) -> Dict[str, ResourceStatus]:
+        """Build the given (default: all) resources, logging failures instead of raising."""
+        for name in names or list(self._loaders):
+            try:
+                self.get(name)
+            except Exception:
+                logger.exception("Warmup of resource %s failed", name)
+        return {n: self._status[n] for n in self._loaders}
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        report = {}
+        for name, status in self._status.items():
+            entry = asdict(status)
+            check = self._checks.get(name)
+            if check is not None and name in self._instances:
+                entry.update(self._run_check(name, check))
+            report[name] = entry
+        return report
+
+    def _run_check(self, name: str, check: Callable[[Any], Dict[str, Any]]) -> Dict[str, Any]:
+        ttl = self._check_ttl.get(name, 0.0)
+        cached = self._check_cache.get(name)
+        if cached is not None and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        try:
+            result = check(self._instances[name])
+        except Exception as exc:
+            result = {"error": f"{type(exc).__name__}: {exc}"}
+        if ttl > 0:
+            self._check_cache[name] = (time.monotonic(), result)
+        return result
+
+
+REGISTRY = ResourceRegistry()
+
+
+def _load_embeddings():
+    from rag.models.embedding_model.factory import build_managed_embeddings
+
+    return build_managed_embeddings()
+
+
+def _load_chroma_client():
+    from rag.vectorstore.chroma_instance import build_chroma_client
+
+    return build_chroma_client()
+
+
+def _load_llm():
+    from rag.config.settings import LLM_HEARTBEAT_ENABLED, LLM_WARMUP
+    from rag.models.llm.ollama_client import OllamaClient
+
+    client = OllamaClient()
+    if LLM_WARMUP:
+        client.warmup()
+    if LLM_HEARTBEAT_ENABLED:
+        client.start_heartbeat()
+    return client
+
+
+def _load_skill_matcher():
+    from rag.ingestion.preprocessing.semantic_skills import build_skill_matcher
+
+    return build_skill_matcher()
+
+
+def _load_profile_watcher():
+    from rag.ingestion.watcher import ProfileWatcher
+
+    return ProfileWatcher().start()
+
+
+def _watcher_health(watcher) -> Dict[str, Any]:
+    state = watcher.freshness()
+    return {
+        "index": state["state"],
+        "files": state["files"],
+        "chunks": state["chunks"],
+        "lag_s": state["lag_s"],
+        "index_error": state["error"],
+    }
+
+
+def _embeddings_health(embeddings) -> Dict[str, Any]:
+    return embeddings.stats()
+
+
+def _llm_health(client) -> Dict[str, Any]:
+    hosts = client.pool.snapshot()
+    stats = client.stats.snapshot()
+    return {
+        "healthy_hosts": sum(h["healthy"] for h in hosts),
+        "hosts": len(hosts),
+        "cold_calls": stats["cold_calls"],
+        "warm_calls": stats["warm_calls"],
+        "avg_cold_latency_s": round(stats["avg_cold_latency_s"], 2),
+        "avg_warm_latency_s": round(stats["avg_warm_latency_s"], 2),
+    }
+
+
+def _chroma_health(client) -> Dict[str, Any]:
+    collections = client.list_collections()
+    return {"collections": len(collections), "chunks": sum(c.count() for c in collections)}
+
+
+REGISTRY.register("embeddings", _load_embeddings, check=_embeddings_health)
+REGISTRY.register("llm", _load_llm, check=_llm_health)
+
+
+def _register_optional() -> None:
+    from rag.config.settings import PROFILE_WATCH_ENABLED, SEMANTIC_SKILLS_ENABLED, VECTOR_BACKEND
+
+    if VECTOR_BACKEND == "chroma":
+        REGISTRY.register(
+            "chroma_client", _load_chroma_client, check=_chroma_health, check_ttl_s=CHROMA_HEALTH_TTL_S
+        )
+    if SEMANTIC_SKILLS_ENABLED:
+        REGISTRY.register("skill_matcher", _load_skill_matcher, check=lambda matcher: matcher.stats())
+    if PROFILE_WATCH_ENABLED:
+        REGISTRY.register("profile_watcher", _load_profile_watcher, check=_watcher_health)
+
+
+_register_optional()
+
+
+def warmup(names: Optional[Iterable[str]] = None, background: bool = False):
+    """
+    Preload shared resources (entry point for app start-up).
+
+    With ``background=True`` loading happens on a daemon thread and the thread
+    is returned; callers that need a resource simply block on it until ready.
+    """
+    if background:
+        thread = threading.Thread(target=REGISTRY.warmup, args=(names,), name="rag-warmup", daemon=True)
+        thread.start()
+        return thread
+    return REGISTRY.warmup(names)
+
+
+def health() -> Dict[str, Dict[str, Any]]:
+    return REGISTRY.health()
+
+
+__all__ = ["ResourceRegistry", "ResourceStatus", "REGISTRY", "warmup", "health"]
+
+
+if __name__ == "__main__":
+    for name, status in warmup().items():
+        print(f"{name:12s} loaded={status.loaded} load_time_s={status.load_time_s} error={status.error}")
@@ -1,4 +1,19 @@
-from rag.retrieval.retriever import retrieve, format_docs, cite_sources
+from rag.retrieval.retriever import (
+    retrieve,
+    retrieve_with_stats,
+    retrieve_many,
+    retrieve_many_with_stats,
+    format_docs,
+    cite_sources,
+)
 from rag.retrieval.query_pipeline import generate_answer
 
-__all__ = ["retrieve", "format_docs", "cite_sources", "generate_answer"]
+__all__ = [
+    "retrieve",
+    "retrieve_with_stats",
+    "retrieve_many",
+    "retrieve_many_with_stats",
+    "format_docs",
+    "cite_sources",
+    "generate_answer",
+]
@@ -0,0 +1,163 @@
+"""
+dedup.py
+Retrieval post-processing: suppress near-duplicate snippets.
+
+Candidates arrive in relevance order (over-fetched). Each one is
+- dropped if its text is contained in, or within a small SimHash distance
+  of, an already selected snippet;
+- swapped in for the selected snippets its text contains, keeping the rank of
+  the first of them;
+- merged into a selected snippet from the same source when the two overlap
+  textually or are neighbouring chunks of the same document;
+- otherwise selected, until ``k`` slots are filled.
+
+Slots freed by drops and merges are thus backfilled by the next distinct
+results. The tokens of the redundant text that no longer reaches the prompt
+are reported in :class:`DedupStats`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from rag.config.settings import DEDUP_MIN_OVERLAP_CHARS, DEDUP_SIMHASH_MAX_DISTANCE
+from rag.utils.fingerprint import hamming, simhash
+from rag.utils.text import estimate_tokens
+
+# Snippets are short, so word bigrams keep a few-word edit within a small
+# distance (~5-11 bits of 64) while unrelated snippets sit above ~20.
+SHINGLE = 2
+
+
+@dataclass
+class DedupStats:
+    candidates: int = 0
+    selected: int = 0
+    dropped: int = 0
+    merged: int = 0
+    tokens_saved: int = 0
+
+    def add(self, other: "DedupStats") -> "DedupStats":
+        for key, value in asdict(other).items():
+            setattr(self, key, getattr(self, key) + value)
+        return self
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+@dataclass
+class _Slot:
+    doc: Document
+    lo: Optional[int]
+    hi: Optional[int]
+    fingerprint: int
+    norm: str
+
+
+def _norm(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _doc_key(doc: Document) -> Tuple:
+    m = doc.metadata
+    return (m.get("source"), m.get("page"), m.get("uid"))
+
+
+def overlap_span(a: str, b: str, min_chars: int = DEDUP_MIN_OVERLAP_CHARS) -> int:
+    """Length of the longest suffix of ``a`` that is a prefix of ``b`` (0 if < ``min_chars``)."""
+    probe = b[:min_chars]
+    if len(probe) < min_chars:
+        return 0
+    start = a.find(probe)
+    while start != -1:
+        if b.startswith(a[start:]):
+            return len(a) - start
+        start = a.find(probe, start + 1)
+    return 0
+
+
+def _try_merge(slot: _Slot, doc: Document, min_chars: int) -> Optional[str]:
+    """Merge ``doc`` into ``slot`` if they are neighbours; returns the redundant text removed."""
+    if slot.doc.metadata.get("source") != doc.metadata.get("source"):
+        return None
+    index = doc.metadata.get("chunk_index")
+    same_doc = _doc_key(slot.doc) == _doc_key(doc) and index is not None and slot.lo is not None
+    before = same_doc and index == slot.lo - 1
+    after = same_doc and index == slot.hi + 1
+
+    head, tail = slot.doc.page_content, doc.page_content
+    span = overlap_span(head, tail, min_chars)
+    if not span and not after:
+        span_rev = overlap_span(tail, head, min_chars)
+        if not (span_rev or before):
+            return None
+        head, tail, span = tail, head, span_rev
+
+    removed = tail[:span]
+    tail = tail[span:]
+    section = doc.metadata.get("section")
+    prefix = f"{section}\n" if section else ""
+    if prefix and section == slot.doc.metadata.get("section") and tail.startswith(prefix):
+        removed += prefix
+        tail = tail[len(prefix):]
+
+    slot.doc = Document(
+        id=slot.doc.id,
+        page_content=head + tail if span else f"{head}\n{tail}",
+        metadata=dict(slot.doc.metadata),
+    )
+    if same_doc:
+        slot.lo, slot.hi = min(slot.lo, index), max(slot.hi, index)
+    slot.fingerprint = simhash(slot.doc.page_content, shingle=SHINGLE)
+    slot.norm = _norm(slot.doc.page_content)
+    return removed
+
+
+def dedupe_docs(
+    candidates: Sequence[Document],
+    k: int,
+    max_distance: int = DEDUP_SIMHASH_MAX_DISTANCE,
+    min_overlap_chars: int = DEDUP_MIN_OVERLAP_CHARS,
+) -> Tuple[List[Document], DedupStats]:
+    """Up to ``k`` distinct snippets from relevance-ordered ``candidates``."""
+    stats = DedupStats(candidates=len(candidates))
+    slots: List[_Slot] = []
+    for doc in candidates:
+        if len(slots) >= k:
+            break
+        text = doc.page_content
+        norm = _norm(text)
+        fingerprint = simhash(text, shingle=SHINGLE)
+        if any(norm in s.norm or hamming(fingerprint, s.fingerprint) <= max_distance for s in slots):
+            stats.dropped += 1
+            stats.tokens_saved += estimate_tokens(text)
+            continue
+        contained = [s for s in slots if s.norm in norm]
+        if contained:
+            # A superset of selected snippets: keep it in place of all of them.
+            stats.merged += len(contained)
+            stats.tokens_saved += sum(estimate_tokens(s.doc.page_content) for s in contained)
+            index = doc.metadata.get("chunk_index")
+            first = contained[0]
+            first.doc, first.lo, first.hi, first.fingerprint, first.norm = doc, index, index, fingerprint, norm
+            absorbed = {id(s) for s in contained[1:]}
+            slots = [s for s in slots if id(s) not in absorbed]
+            continue
+        for slot in slots:
+            removed = _try_merge(slot, doc, min_overlap_chars)
+            if removed is not None:
+                stats.merged += 1
+                stats.tokens_saved += estimate_tokens(removed)
+                break
+        else:
+            index = doc.metadata.get("chunk_index")
+            slots.append(_Slot(doc=doc, lo=index, hi=index, fingerprint=fingerprint, norm=norm))
+    stats.selected = len(slots)
+    return [s.doc for s in slots], stats
+
+
+__all__ = ["DedupStats", "dedupe_docs", "overlap_span"]
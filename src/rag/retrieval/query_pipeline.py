@@ -5,15 +5,17 @@ Utility for a lightweight RAG answer without full pipeline context.
 
 from __future__ import annotations
 
+from typing import Optional
+
 from rag.config.settings import TOP_K
-from rag.profile import load_profile
+from rag.profile import get_compiled_profile, load_profile, profile_tenant
+from rag.utils.cancellation import CancelToken
 from rag.utils.exceptions import ProfileNotConfiguredError
-from rag.vectorstore.chroma_instance import get_vectordb
-from rag.generation.prompts.templates import build_basic_system_prompt
+from rag.retrieval.retriever import retrieve
 from rag.models.llm.ollama_client import run_prompt
 
 
-def generate_answer(query: str, k: int = TOP_K) -> str:
+def generate_answer(query: str, k: int = TOP_K, token: Optional[CancelToken] = None) -> str:
     """Simple query over profile documents using the shared vector store."""
     profile = load_profile()
     if not profile:
@@ -21,22 +23,14 @@ def generate_answer(query: str, k: int = TOP_K) -> str:
             "USER_PROFILE is not set. Use the UI profile settings or edit data/job_rag/profile_settings.json."
         )
 
-    vectordb = get_vectordb()
-    retriever = vectordb.as_retriever(search_kwargs={"k": k})
-
-    docs = retriever.get_relevant_documents(query)
+    if token is not None:
+        token.check()
+    docs = retrieve(query, k=k, tenant=profile_tenant(profile))
     context = "\n\n".join(d.page_content for d in docs)
 
-    system_prompt = build_basic_system_prompt(profile)
-
-    role_label = (
-        profile.get("target_role")
-        or profile.get("domain_focus")
-        or profile.get("role_preferences", {}).get("role_description")
-        or "AI/ML"
-    )
+    compiled = get_compiled_profile(profile)
 
-    prompt_text = f"""{system_prompt}
+    prompt_text = f"""{compiled.system_prompt}
 
 Context from my documents:
 {context}
@@ -44,11 +38,11 @@ Context from my documents:
 User request:
 {query}
 
-Write a clear, professional answer tailored for {role_label} job applications.
+Write a clear, professional answer tailored for {compiled.role_label} job applications.
 Avoid hallucinating technologies I don't know unless the user explicitly asks to learn them.
 """
 
-    return run_prompt("You are a helpful assistant.", prompt_text)
+    return run_prompt("You are a helpful assistant.", prompt_text, token=token)
 
 
 __all__ = ["generate_answer"]
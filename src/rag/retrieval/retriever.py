@@ -1,22 +1,106 @@
 """
 retriever.py
-Utilities for querying and formatting snippets from Chroma.
+Utilities for querying and formatting snippets from the vector store.
 """
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple
 
-from rag.vectorstore.chroma_instance import get_vectordb
+from langchain_core.documents import Document
 
+from rag.config.settings import DEDUP_ENABLED, DEDUP_FETCH_MULTIPLIER
+from rag.retrieval.dedup import DedupStats, dedupe_docs
+from rag.utils.cancellation import CancelToken
+from rag.vectorstore.base import Where
+from rag.vectorstore.factory import get_vector_store
 
-def retrieve(query: str, k: int = 6, doc_type: Optional[str] = None):
-    """Retrieve top-k documents for a query, optionally filtered by type."""
-    vectordb = get_vectordb()
-    docs = vectordb.similarity_search(query, k=24)
-    if doc_type:
-        docs = [d for d in docs if d.metadata.get("doc_type") == doc_type]
-    return docs[:k]
+
+def retrieve_with_stats(
+    query: str,
+    k: int = 6,
+    doc_type: Optional[str] = None,
+    token: Optional[CancelToken] = None,
+    tenant: Optional[str] = None,
+    dedup: bool = DEDUP_ENABLED,
+    where: Optional[Where] = None,
+) -> Tuple[List[Document], DedupStats]:
+    """
+    Like :func:`retrieve`, also returning what near-duplicate suppression
+    saved. ``where`` replaces the ``doc_type`` filter with a full clause.
+    """
+    if token is not None:
+        token.check()
+    store = get_vector_store(tenant)
+    if where is None and doc_type:
+        where = {"doc_type": doc_type}
+    if not dedup:
+        docs = store.similarity_search(query, k=k, filter=where)
+        return docs, DedupStats(candidates=len(docs), selected=len(docs))
+    candidates = store.similarity_search(query, k=k * DEDUP_FETCH_MULTIPLIER, filter=where)
+    return dedupe_docs(candidates, k)
+
+
+def retrieve_many_with_stats(
+    queries: Sequence[str],
+    k: int = 6,
+    doc_types: Optional[Sequence[Optional[str]]] = None,
+    token: Optional[CancelToken] = None,
+    tenant: Optional[str] = None,
+    dedup: bool = DEDUP_ENABLED,
+    filters: Optional[Sequence[Optional[Where]]] = None,
+) -> List[Tuple[List[Document], DedupStats]]:
+    """
+    :func:`retrieve_with_stats` for several queries at once, in query order.
+    All queries are embedded in one ``embed_documents`` pass and searched in
+    one store call per distinct filter (``doc_types`` holds one entry per
+    query; ``None`` means unfiltered). ``filters`` gives full ``where``
+    clauses per query instead, e.g. to scope a query to one JD.
+    """
+    if token is not None:
+        token.check()
+    queries = list(queries)
+    if filters is None:
+        doc_types = list(doc_types) if doc_types is not None else [None] * len(queries)
+        filters = [{"doc_type": t} if t else None for t in doc_types]
+    filters = list(filters)
+    if len(filters) != len(queries):
+        raise ValueError(f"Got {len(filters)} filters for {len(queries)} queries")
+    if not queries:
+        return []
+    store = get_vector_store(tenant)
+    vectors = store.embeddings.embed_documents(queries)
+    if token is not None:
+        token.check()
+    fetch = k * DEDUP_FETCH_MULTIPLIER if dedup else k
+    results = store.similarity_search_by_vectors(vectors, k=fetch, filters=filters)
+    if not dedup:
+        return [(docs, DedupStats(candidates=len(docs), selected=len(docs))) for docs in results]
+    return [dedupe_docs(candidates, k) for candidates in results]
+
+
+def retrieve_many(
+    queries: Sequence[str],
+    k: int = 6,
+    doc_types: Optional[Sequence[Optional[str]]] = None,
+    token: Optional[CancelToken] = None,
+    tenant: Optional[str] = None,
+) -> List[List[Document]]:
+    """Top-k distinct documents for each query, in query order (see :func:`retrieve_many_with_stats`)."""
+    results = retrieve_many_with_stats(queries, k=k, doc_types=doc_types, token=token, tenant=tenant)
+    return [docs for docs, _ in results]
+
+
+def retrieve(
+    query: str,
+    k: int = 6,
+    doc_type: Optional[str] = None,
+    token: Optional[CancelToken] = None,
+    tenant: Optional[str] = None,
+):
+    """Retrieve top-k distinct documents for a query, optionally filtered by type."""
+    docs, _ = retrieve_with_stats(query, k=k, doc_type=doc_type, token=token, tenant=tenant)
+    return docs
 
 
 def format_docs(docs) -> str:
@@ -29,4 +113,4 @@ def cite_sources(docs) -> str:
     return "\n".join(f"[{i}] {d.metadata.get('source', '')}" for i, d in enumerate(docs, 1))
 
 
-__all__ = ["retrieve", "format_docs", "cite_sources"]
+__all__ = ["retrieve", "retrieve_with_stats", "retrieve_many", "retrieve_many_with_stats", "format_docs", "cite_sources"]
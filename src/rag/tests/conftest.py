@@ -0,0 +1,12 @@
+import pytest
+
+from rag.tests.mock_ollama import start_mock_server
+
+
+@pytest.fixture
+def mock_ollama():
+    """A mock Ollama host on a free port; tweak ``server.config`` to inject faults."""
+    server = start_mock_server()
+    yield server
+    server.shutdown()
+    server.server_close()
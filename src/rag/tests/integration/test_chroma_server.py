@@ -0,0 +1,120 @@
+"""
+End to end against a real ``chroma run`` server: the app's settings select
+``http`` mode, and ``get_vector_store`` must add, query and delete through
+the HTTP client. The client runs in a subprocess so settings are read from
+the environment exactly as in a deployment.
+"""
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("chromadb")
+pytest.importorskip("langchain_chroma")
+pytest.importorskip("langchain_huggingface")
+
+import rag
+
+CHROMA = shutil.which("chroma")
+pytestmark = pytest.mark.skipif(CHROMA is None, reason="chroma CLI not installed")
+
+CLIENT_SCRIPT = """
+import json, uuid
+
+from rag.resources import REGISTRY
+import rag.vectorstore.chroma_instance as chroma_instance
+from rag.vectorstore.factory import get_vector_store
+
+
+class Embeddings:
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        return [1.0, 0.0] if "python" in text.lower() else [0.0, 1.0]
+
+
+chroma_instance.get_embeddings = Embeddings
+store = get_vector_store(f"it-{uuid.uuid4().hex[:8]}")
+store.add_embeddings(
+    ["p", "j"],
+    [[1.0, 0.0], [0.0, 1.0]],
+    ["Python services", "Barista shifts"],
+    [{"doc_type": "profile"}, {"doc_type": "jd"}],
+)
+out = {
+    "client": type(REGISTRY.get("chroma_client")).__name__,
+    "server": chroma_instance.CHROMA_MODE,
+    "count": store.count(),
+    "top": [d.page_content for d in store.similarity_search("python", k=1)],
+    "filtered": [d.page_content for d in store.similarity_search("python", k=2, filter={"doc_type": "jd"})],
+}
+store.delete(ids=["p"])
+out["after_delete"] = store.get()["ids"]
+print(json.dumps(out))
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def chroma_server(tmp_path):
+    port = _free_port()
+    proc = subprocess.Popen(
+        [CHROMA, "run", "--path", str(tmp_path / "chroma"), "--host", "127.0.0.1", "--port", str(port)],
+        # The server writes chroma.log into its working directory.
+        cwd=tmp_path,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    try:
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/api/v1/heartbeat", timeout=1)
+                break
+            except OSError:
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    pytest.skip("chroma server did not start")
+                time.sleep(0.2)
+        yield port
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def test_vector_store_round_trip_over_http(chroma_server):
+    src = str(Path(rag.__file__).resolve().parents[1])
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(p for p in (src, os.environ.get("PYTHONPATH")) if p),
+        "VECTOR_BACKEND": "chroma",
+        "CHROMA_MODE": "http",
+        "CHROMA_HOST": "127.0.0.1",
+        "CHROMA_PORT": str(chroma_server),
+    }
+    proc = subprocess.run([sys.executable, "-c", CLIENT_SCRIPT], env=env, capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr
+    out = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    assert out["client"] != "PersistentClient"
+    assert out["server"] == "http"
+    assert out["count"] == 2
+    assert out["top"] == ["Python services"]
+    assert out["filtered"] == ["Barista shifts"]
+    assert out["after_delete"] == ["j"]
@@ -0,0 +1,282 @@
+"""
+mock_ollama.py
+Local stand-in for the Ollama HTTP API (``/api/chat``, ``/api/tags``).
+
+Used by the LLM client tests (the ``mock_ollama`` fixture) and the load test
+to exercise host routing, retries, timeouts and model load/keep-alive
+behaviour without a GPU:
+
+    python -m rag.tests.mock_ollama --port 11500 --fail-rate 0.2
+
+With ``prefill_tps`` / ``decode_tps`` / ``parallel`` it also behaves like a
+loaded GPU host for capacity tests: prompts cost ``prompt_tokens /
+prefill_tps`` before the first token, every output token costs
+``1 / decode_tps``, and at most ``parallel`` requests are processed at once
+(the rest queue, like ``OLLAMA_NUM_PARALLEL``).
+
+    python -m rag.tests.mock_ollama --prefill-tps 800 --decode-tps 40 --parallel 2 --reply-tokens 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class MockOllamaConfig:
+    """Runtime knobs; mutate on a running server to inject faults."""
+
+    def __init__(
+        self,
+        model: str = "llama3.2:3b",
+        reply: str = "This is a mock Ollama reply.",
+        delay_s: float = 0.0,
+        fail_rate: float = 0.0,
+        fail_next: int = 0,
+        fail_status: int = 503,
+        down: bool = False,
+        load_s: float = 0.0,
+        default_keep_alive: Any = "5m",
+        prefill_tps: float = 0.0,
+        decode_tps: float = 0.0,
+        parallel: int = 0,
+        reply_tokens: int = 0,
+    ):
+        self.model = model
+        self.reply = reply
+        self.delay_s = delay_s
+        self.fail_rate = fail_rate
+        self.fail_next = fail_next
+        self.fail_status = fail_status
+        self.down = down
+        self.load_s = load_s
+        self.default_keep_alive = default_keep_alive
+        self.loaded_until = 0.0
+        self.loads = 0
+        self.prefill_tps = prefill_tps
+        self.decode_tps = decode_tps
+        self.parallel = parallel
+        self.reply_tokens = reply_tokens
+        self.slots = threading.BoundedSemaphore(parallel) if parallel else None
+        self.prompt_tokens = 0
+        self.eval_tokens = 0
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bodies: List[Dict[str, Any]] = []
+        self.inflight = 0
+        self.max_inflight = 0
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def keep_alive_seconds(value: Any) -> float:
+    """Ollama ``keep_alive`` (seconds or "30m"/"1h"/...) in seconds; negative = forever."""
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        text = str(value).strip()
+        unit = next((u for u in ("ms", "s", "m", "h") if text.endswith(u)), "s")
+        seconds = float(text[: len(text) - len(unit)] if text.endswith(unit) else text) * _UNITS[unit]
+    return float("inf") if seconds < 0 else seconds
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "MockOllamaServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt: str, *args: Any) -> None:  # keep test output quiet
+        pass
+
+    def _json(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        cfg = self.server.config
+        if cfg.down:
+            self._json(503, {"error": "mock host is down"})
+        elif self.path.startswith("/api/tags"):
+            self._json(200, {"models": [{"name": cfg.model, "model": cfg.model}]})
+        elif self.path.startswith("/api/version"):
+            self._json(200, {"version": "0.0.0-mock"})
+        else:
+            self._json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        cfg = self.server.config
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.startswith("/api/chat"):
+            self._json(404, {"error": "not found"})
+            return
+        with cfg.lock:
+            cfg.requests += 1
+            cfg.bodies.append(body)
+            cfg.inflight += 1
+            cfg.max_inflight = max(cfg.max_inflight, cfg.inflight)
+            fail = cfg.fail_next > 0
+            if fail:
+                cfg.fail_next -= 1
+        try:
+            if fail or cfg.down or random.random() < cfg.fail_rate:
+                self._json(cfg.fail_status, {"error": "mock failure"})
+                return
+            if cfg.slots is not None:
+                cfg.slots.acquire()
+            try:
+                if cfg.delay_s:
+                    time.sleep(cfg.delay_s)
+                self._chat(body, cfg)
+            finally:
+                if cfg.slots is not None:
+                    cfg.slots.release()
+        finally:
+            with cfg.lock:
+                cfg.inflight -= 1
+
+    def _load(self, body: Dict[str, Any], cfg: MockOllamaConfig) -> float:
+        """Simulate Ollama (re)loading an expired model; returns the load time."""
+        with cfg.lock:
+            cold = time.monotonic() >= cfg.loaded_until
+            if cold:
+                cfg.loads += 1
+        if cold and cfg.load_s:
+            time.sleep(cfg.load_s)
+        keep = keep_alive_seconds(body.get("keep_alive", cfg.default_keep_alive))
+        with cfg.lock:
+            cfg.loaded_until = time.monotonic() + keep
+        return cfg.load_s if cold else 0.0
+
+    def _chat(self, body: Dict[str, Any], cfg: MockOllamaConfig) -> None:
+        model = body.get("model", cfg.model)
+        load_s = self._load(body, cfg)
+        if not body.get("messages"):
+            # An empty chat only loads the model (what warmup/heartbeats send).
+            self._json(
+                200,
+                {"model": model, "created_at": _now(), "message": {"role": "assistant", "content": ""},
+                 "done": True, "done_reason": "load", "load_duration": int(load_s * 1e9)},
+            )
+            return
+        words = cfg.reply.split(" ")
+        if cfg.reply_tokens:
+            words = [words[i % len(words)] for i in range(cfg.reply_tokens)]
+        prompt_tokens = sum(len(m.get("content") or "") for m in body["messages"]) // 4
+        prefill_s = prompt_tokens / cfg.prefill_tps if cfg.prefill_tps else 0.0
+        token_s = 1.0 / cfg.decode_tps if cfg.decode_tps else 0.0
+        num_predict = (body.get("options") or {}).get("num_predict")
+        done_reason = "stop"
+        if num_predict and num_predict > 0 and len(words) > num_predict:
+            words = words[:num_predict]
+            done_reason = "length"
+        final = {
+            "model": model,
+            "created_at": _now(),
+            "message": {"role": "assistant", "content": ""},
+            "done": True,
+            "done_reason": done_reason,
+            "total_duration": int((load_s + prefill_s + token_s * len(words)) * 1e9),
+            "load_duration": int(load_s * 1e9),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(prefill_s * 1e9),
+            "eval_count": len(words),
+            "eval_duration": int(token_s * len(words) * 1e9),
+        }
+        with cfg.lock:
+            cfg.prompt_tokens += prompt_tokens
+            cfg.eval_tokens += len(words)
+        if prefill_s:
+            time.sleep(prefill_s)
+        if not body.get("stream", True):
+            if token_s:
+                time.sleep(token_s * len(words))
+            final["message"]["content"] = " ".join(words)
+            self._json(200, final)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, word in enumerate(words):
+            if token_s:
+                time.sleep(token_s)
+            piece = word if i == 0 else " " + word
+            self._chunk({"model": model, "created_at": _now(), "message": {"role": "assistant", "content": piece}, "done": False})
+        self._chunk(final)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _chunk(self, obj: Dict[str, Any]) -> None:
+        data = (json.dumps(obj) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class MockOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: Optional[MockOllamaConfig] = None):
+        super().__init__(address, _Handler)
+        self.config = config or MockOllamaConfig()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, **config: Any) -> MockOllamaServer:
+    """Start a mock server on a background thread; ``port=0`` picks a free port."""
+    server = MockOllamaServer((host, port), MockOllamaConfig(**config))
+    threading.Thread(target=server.serve_forever, name=f"mock-ollama-{server.url}", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Run a mock Ollama chat server.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=11500)
+    ap.add_argument("--delay-s", type=float, default=0.0)
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    ap.add_argument("--load-s", type=float, default=0.0, help="Simulated model load time after keep_alive expires.")
+    ap.add_argument("--prefill-tps", type=float, default=0.0, help="Prompt tokens processed per second (0 = instant).")
+    ap.add_argument("--decode-tps", type=float, default=0.0, help="Output tokens per second (0 = instant).")
+    ap.add_argument("--parallel", type=int, default=0, help="Requests processed at once; 0 = unlimited.")
+    ap.add_argument("--reply-tokens", type=int, default=0, help="Reply length in tokens (capped by num_predict).")
+    args = ap.parse_args()
+    server = MockOllamaServer(
+        (args.host, args.port),
+        MockOllamaConfig(
+            delay_s=args.delay_s,
+            fail_rate=args.fail_rate,
+            load_s=args.load_s,
+            prefill_tps=args.prefill_tps,
+            decode_tps=args.decode_tps,
+            parallel=args.parallel,
+            reply_tokens=args.reply_tokens,
+        ),
+    )
+    print(f"Mock Ollama listening on {server.url}")
+    server.serve_forever()
+
+
+__all__ = ["MockOllamaConfig", "MockOllamaServer", "start_mock_server"]
+
+
+if __name__ == "__main__":
+    main()
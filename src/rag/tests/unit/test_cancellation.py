@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+from rag.jobs.job_queue import CANCELLED, FAILED, SUCCEEDED, JobQueue
+from rag.jobs.worker import WorkerPool
+from rag.utils.cancellation import CancelToken
+from rag.utils.exceptions import DeadlineExceeded, GenerationCancelled
+
+
+def test_token_without_deadline_never_expires():
+    token = CancelToken()
+    assert token.remaining() is None
+    token.check()
+
+
+def test_cancel_raises_with_reason():
+    token = CancelToken()
+    token.cancel("superseded")
+    with pytest.raises(GenerationCancelled, match="superseded"):
+        token.check()
+
+
+def test_deadline_expires():
+    token = CancelToken(0.05)
+    time.sleep(0.06)
+    assert token.expired
+    assert token.remaining() == 0.0
+    with pytest.raises(DeadlineExceeded):
+        token.check()
+
+
+def test_wait_is_clipped_to_the_deadline_and_woken_by_cancel():
+    token = CancelToken(0.05)
+    start = time.monotonic()
+    assert token.wait(5) is False
+    assert time.monotonic() - start < 1.0
+
+    token = CancelToken()
+    threading.Timer(0.05, token.cancel).start()
+    start = time.monotonic()
+    assert token.wait(5) is True
+    assert time.monotonic() - start < 1.0
+
+
+def _wait_for(queue, job_id, timeout=5.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        job = queue.get(job_id)
+        if job.done:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(db_path=tmp_path / "jobs.sqlite3", results_dir=tmp_path / "results", lease_s=30)
+
+
+def test_pool_cancel_interrupts_a_running_job(queue):
+    started = threading.Event()
+
+    def handler(job, token):
+        started.set()
+        while True:
+            token.check()
+            time.sleep(0.01)
+
+    pool = WorkerPool(queue, workers=1, handler=handler, poll_interval_s=0.01).start()
+    try:
+        job_id = queue.submit({})
+        assert started.wait(5)
+        pool.cancel(job_id)
+        assert _wait_for(queue, job_id).status == CANCELLED
+    finally:
+        pool.stop(1)
+
+
+def test_pool_applies_the_payload_deadline(queue):
+    def handler(job, token):
+        assert token.deadline is not None
+        return {"ok": True}
+
+    pool = WorkerPool(queue, workers=1, handler=handler, poll_interval_s=0.01).start()
+    try:
+        job_id = queue.submit({"deadline_s": 30})
+        assert _wait_for(queue, job_id).status == SUCCEEDED
+    finally:
+        pool.stop(1)
+
+
+def test_pool_retries_then_fails(queue):
+    def handler(job, token):
+        raise RuntimeError("model crashed")
+
+    pool = WorkerPool(queue, workers=1, handler=handler, poll_interval_s=0.01, retry_backoff_s=0).start()
+    try:
+        job_id = queue.submit({}, max_attempts=2)
+        job = _wait_for(queue, job_id)
+        assert job.status == FAILED
+        assert job.attempts == 2
+        assert "model crashed" in job.error
+    finally:
+        pool.stop(1)
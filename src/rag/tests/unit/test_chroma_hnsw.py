@@ -0,0 +1,106 @@
+import logging
+import uuid
+
+import pytest
+
+chromadb = pytest.importorskip("chromadb")
+pytest.importorskip("langchain_chroma")
+pytest.importorskip("langchain_huggingface")
+
+from rag.vectorstore.base import collection_name
+from rag.vectorstore.chroma_instance import hnsw_drift, hnsw_metadata
+from rag.vectorstore.clients.chroma_store import ChromaStore, compact_collection
+
+
+class FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+@pytest.fixture
+def client():
+    return chromadb.EphemeralClient()
+
+
+def test_drift_lists_changed_keys_only():
+    configured = hnsw_metadata(m=16, ef_construction=100)
+    stored = {**configured, "hnsw:M": 8}
+    assert hnsw_drift(stored, configured) == {"hnsw:M": (8, 16)}
+    assert hnsw_drift(configured, configured) == {}
+
+
+def test_opening_a_collection_built_with_other_params_warns(client, caplog):
+    tenant = f"t-{uuid.uuid4().hex[:8]}"
+    configured = hnsw_metadata()
+    client.create_collection(collection_name(tenant), metadata={**configured, "hnsw:M": configured["hnsw:M"] + 8})
+
+    store = ChromaStore(tenant, client=client, embedding_function=FakeEmbeddings())
+    with caplog.at_level(logging.WARNING, logger="rag"):
+        store.count()
+    assert "hnsw:M" in caplog.text
+    assert "maintenance" in caplog.text
+
+
+def test_compaction_rebuilds_with_configured_params(client, caplog):
+    tenant = f"t-{uuid.uuid4().hex[:8]}"
+    configured = hnsw_metadata()
+    client.create_collection(collection_name(tenant), metadata={**configured, "hnsw:M": configured["hnsw:M"] + 8})
+    store = ChromaStore(tenant, client=client, embedding_function=FakeEmbeddings())
+    store.add_embeddings(["a", "b"], [[1.0, 0.0], [0.0, 1.0]], ["a", "b"], [{"doc_type": "jd"}, {"doc_type": "profile"}])
+
+    store.compact()
+
+    assert hnsw_drift(client.get_collection(collection_name(tenant)).metadata) == {}
+    assert store.count() == 2
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger="rag"):
+        store.count()
+    assert "hnsw" not in caplog.text
+
+
+class Proxy:
+    def __init__(self, target):
+        self._target = target
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+class FailingCollection(Proxy):
+    def add(self, **_):
+        raise RuntimeError("interrupted")
+
+
+class FailingAdds(Proxy):
+    """Client whose new collections fail on ``add``."""
+
+    def create_collection(self, *args, **kwargs):
+        return FailingCollection(self._target.create_collection(*args, **kwargs))
+
+
+def test_failed_compaction_keeps_the_original_collection(client):
+    tenant = f"t-{uuid.uuid4().hex[:8]}"
+    name = collection_name(tenant)
+    store = ChromaStore(tenant, client=client, embedding_function=FakeEmbeddings())
+    store.add_embeddings(["a", "b"], [[1.0, 0.0], [0.0, 1.0]], ["a", "b"], [{"doc_type": "jd"}, {"doc_type": "profile"}])
+    before = {c.name for c in client.list_collections()}
+
+    with pytest.raises(RuntimeError):
+        compact_collection(FailingAdds(client), name)
+
+    assert {c.name for c in client.list_collections()} == before
+    assert client.get_collection(name).count() == 2
+
+
+def test_compaction_leaves_no_scratch_collections(client):
+    tenant = f"t-{uuid.uuid4().hex[:8]}"
+    store = ChromaStore(tenant, client=client, embedding_function=FakeEmbeddings())
+    store.add_embeddings(["a"], [[1.0, 0.0]], ["a"], [{"doc_type": "jd"}])
+    before = {c.name for c in client.list_collections()}
+
+    store.compact()
+    assert {c.name for c in client.list_collections()} == before
+    assert store.get()["ids"] == ["a"]
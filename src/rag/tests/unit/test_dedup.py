@@ -0,0 +1,48 @@
+from langchain_core.documents import Document
+
+from rag.retrieval.dedup import dedupe_docs, overlap_span
+
+LONG = "Led the migration of the billing platform to Kubernetes and cut deploy time by half."
+SHORT = "migration of the billing platform to Kubernetes"
+OTHER = "Mentored four junior engineers through code review and pairing sessions every week."
+
+
+def _doc(text, source="cv.pdf", index=None):
+    metadata = {"source": source}
+    if index is not None:
+        metadata["chunk_index"] = index
+    return Document(page_content=text, metadata=metadata)
+
+
+def test_snippet_contained_in_a_selected_one_is_dropped():
+    docs, stats = dedupe_docs([_doc(LONG), _doc(SHORT, source="notes.md"), _doc(OTHER, source="notes.md")], k=2)
+    assert [d.page_content for d in docs] == [LONG, OTHER]
+    assert stats.dropped == 1
+
+
+def test_snippet_containing_a_selected_one_replaces_it_in_place():
+    docs, stats = dedupe_docs([_doc(SHORT, source="notes.md"), _doc(OTHER, source="a.md"), _doc(LONG)], k=3)
+    assert [d.page_content for d in docs] == [LONG, OTHER]
+    assert docs[0].metadata["source"] == "cv.pdf"
+    assert stats.merged == 1
+    assert stats.selected == 2
+
+
+def test_superset_absorbs_every_snippet_it_contains():
+    first, second = "billing platform to Kubernetes", "cut deploy time by half"
+    docs, stats = dedupe_docs([_doc(first, "a.md"), _doc(OTHER, "b.md"), _doc(second, "c.md"), _doc(LONG)], k=4)
+    assert [d.page_content for d in docs] == [LONG, OTHER]
+    assert stats.merged == 2
+
+
+def test_neighbouring_chunks_are_merged():
+    head = "Skills: Python, Go and Rust for backend services at scale"
+    tail = "backend services at scale, plus Terraform and AWS"
+    docs, stats = dedupe_docs([_doc(head, index=0), _doc(tail, index=1)], k=2, min_overlap_chars=10)
+    assert [d.page_content for d in docs] == ["Skills: Python, Go and Rust for backend services at scale, plus Terraform and AWS"]
+    assert stats.merged == 1
+
+
+def test_overlap_span_requires_min_chars():
+    assert overlap_span("abc hello world", "hello world again", min_chars=5) == len("hello world")
+    assert overlap_span("abc hello", "hello", min_chars=10) == 0
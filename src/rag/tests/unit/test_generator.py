@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from rag.generation import generator
+from rag.utils.cancellation import CancelToken
+from rag.utils.exceptions import GenerationCancelled
+
+JD = "Senior Python engineer."
+EXTRACTION = {
+    "jd_hard": ["python"],
+    "jd_soft": [],
+    "keywords": ["python"],
+    "have_hard": ["python"],
+    "have_soft": [],
+    "gaps": [],
+}
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Generator with every non-LLM stage stubbed; ``prompts`` records the section calls."""
+    prompts = []
+    monkeypatch.setattr(generator, "load_profile", lambda: {"name": "Jane"})
+    monkeypatch.setattr(generator, "take_prepared", lambda jd_text, profile, token: None)
+    monkeypatch.setattr(generator, "extract", lambda jd_text, profile: dict(EXTRACTION))
+    monkeypatch.setattr(
+        generator,
+        "prepare_inputs",
+        lambda jd_text, profile, token, extraction, timings: {
+            "context": "ctx",
+            "retrieval": {},
+            "profile_index": {},
+        },
+    )
+    return prompts
+
+
+def _stub_run_prompt(monkeypatch, prompts, after_first):
+    def run_prompt(system, context, token=None, name=None, **kwargs):
+        token.check()
+        prompts.append(name)
+        if len(prompts) == 1:
+            after_first(token)
+        return f"{name} text"
+
+    monkeypatch.setattr(generator, "run_prompt", run_prompt)
+
+
+def test_deadline_returns_completed_sections_as_partial(pipeline, monkeypatch):
+    def expire(token):
+        token.deadline = time.monotonic() - 1
+
+    _stub_run_prompt(monkeypatch, pipeline, expire)
+    result = generator.generate_application_package(JD, token=CancelToken(60), reuse=False)
+
+    assert pipeline == ["skills"]
+    assert result["partial"] is True
+    assert result["missing_sections"] == ["cover", "emails", "ats"]
+    assert result["skills"] == "skills text"
+    assert result["cover"] == result["emails"] == result["ats"] == ""
+    assert result["context"] == "ctx"
+    assert "llm_skills" in result["timings"]
+    assert "total" in result["timings"]
+
+
+def test_full_run_is_not_partial(pipeline, monkeypatch):
+    _stub_run_prompt(monkeypatch, pipeline, lambda token: None)
+    result = generator.generate_application_package(JD, token=CancelToken(60), reuse=False)
+
+    assert pipeline == list(generator.SECTION_GENERATORS)
+    assert result["partial"] is False
+    assert result["missing_sections"] == []
+
+
+def test_cancellation_is_not_turned_into_a_partial_package(pipeline, monkeypatch):
+    _stub_run_prompt(monkeypatch, pipeline, lambda token: token.cancel("user"))
+    with pytest.raises(GenerationCancelled):
+        generator.generate_application_package(JD, token=CancelToken(60), reuse=False)
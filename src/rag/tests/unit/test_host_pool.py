@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+from rag.models.llm.host_pool import HostPool
+from rag.utils.cancellation import CancelToken
+from rag.utils.exceptions import GenerationCancelled, LLMError, LLMTimeoutError
+
+
+class Probe:
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.calls = []
+
+    def __call__(self, url):
+        self.calls.append(url)
+        return self.healthy
+
+
+def _pool(hosts=("http://a", "http://b"), **kwargs):
+    kwargs.setdefault("max_concurrency", 2)
+    kwargs.setdefault("eject_after", 2)
+    kwargs.setdefault("cooldown_s", 0.05)
+    kwargs.setdefault("probe", Probe())
+    return HostPool(list(hosts), **kwargs)
+
+
+def test_needs_a_host():
+    with pytest.raises(LLMError):
+        HostPool([])
+
+
+def test_routes_to_least_loaded_host():
+    pool = _pool()
+    first = pool.acquire()
+    second = pool.acquire()
+    assert {first.url, second.url} == {"http://a", "http://b"}
+
+    pool.release(first, ok=True, latency_s=0.1)
+    assert pool.acquire().url == first.url
+
+
+def test_ties_go_to_the_faster_host():
+    pool = _pool()
+    a, b = pool.hosts["http://a"], pool.hosts["http://b"]
+    a.ewma_latency_s, b.ewma_latency_s = 2.0, 0.5
+    assert pool.acquire().url == "http://b"
+
+
+def test_waits_for_capacity_until_deadline():
+    pool = _pool(hosts=["http://a"], max_concurrency=1)
+    pool.acquire()
+    start = time.monotonic()
+    with pytest.raises(LLMTimeoutError):
+        pool.acquire(deadline=time.monotonic() + 0.1)
+    assert time.monotonic() - start < 1.0
+
+
+def test_cancelled_token_stops_queueing():
+    pool = _pool(hosts=["http://a"], max_concurrency=1)
+    pool.acquire()
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(GenerationCancelled):
+        pool.acquire(token=token)
+
+
+def test_ejects_after_consecutive_failures():
+    pool = _pool()
+    for _ in range(2):
+        pool.release(pool.hosts["http://a"], ok=False)
+    snapshot = {h["url"]: h for h in pool.snapshot()}
+    assert not snapshot["http://a"]["healthy"]
+    assert snapshot["http://a"]["ejections"] == 1
+    assert all(pool.acquire().url == "http://b" for _ in range(2))
+
+
+def test_success_resets_the_failure_streak():
+    pool = _pool()
+    host = pool.hosts["http://a"]
+    pool.release(host, ok=False)
+    pool.release(host, ok=True)
+    pool.release(host, ok=False)
+    assert not host.ejected
+
+
+def test_ejected_host_returns_after_a_good_probe():
+    probe = Probe(healthy=True)
+    pool = _pool(hosts=["http://a"], probe=probe)
+    for _ in range(2):
+        pool.release(pool.hosts["http://a"], ok=False)
+
+    host = pool.acquire(deadline=time.monotonic() + 1.0)
+    assert host.url == "http://a"
+    assert probe.calls == ["http://a"]
+    assert not host.ejected
+
+
+def test_failed_probe_doubles_the_cooldown():
+    probe = Probe(healthy=False)
+    pool = _pool(hosts=["http://a"], probe=probe, cooldown_s=0.05)
+    for _ in range(2):
+        pool.release(pool.hosts["http://a"], ok=False)
+
+    with pytest.raises(LLMTimeoutError):
+        pool.acquire(deadline=time.monotonic() + 0.08)
+    assert probe.calls == ["http://a"]
+    assert pool._cooldowns["http://a"] == pytest.approx(0.1)
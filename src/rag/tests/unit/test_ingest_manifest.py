@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+
+import pytest
+
+from rag.ingestion import ingest
+from rag.utils.helpers import file_lock
+from rag.vectorstore.clients.numpy_store import NumpyStore
+
+
+class FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0, float(sum(map(ord, text)) % 97)]
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    store = NumpyStore(tmp_path / "store", embedding_function=FakeEmbeddings())
+    monkeypatch.setattr(ingest, "PROFILE_MANIFEST_PATH", tmp_path / "manifest.json")
+    monkeypatch.setattr(ingest, "get_vector_store", lambda tenant=None: store)
+    return docs, store, tmp_path / "manifest.json"
+
+
+def _sources(store):
+    return sorted(os.path.basename(m["source"]) for m in store.get()["metadatas"])
+
+
+def test_first_sync_indexes_every_file(env):
+    docs, store, manifest = env
+    (docs / "cv.txt").write_text("Python and Go engineer.", encoding="utf-8")
+    (docs / "summary.md").write_text("Led platform teams.", encoding="utf-8")
+    (docs / "photo.png").write_bytes(b"\x89PNG")
+
+    stats = ingest.sync_profile_docs("t", docs)
+    assert (stats.added, stats.files) == (2, 2)
+    assert _sources(store) == ["cv.txt", "summary.md"]
+    entries = json.loads(manifest.read_text(encoding="utf-8"))["rag_t"]
+    assert all(e["sha1"] and e["chunks"] for e in entries.values())
+
+
+def test_unchanged_and_touched_files_are_not_reindexed(env):
+    docs, store, _ = env
+    path = docs / "cv.txt"
+    path.write_text("Python and Go engineer.", encoding="utf-8")
+    ingest.sync_profile_docs("t", docs)
+    ids = store.get()["ids"]
+
+    assert ingest.sync_profile_docs("t", docs).unchanged == 1
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    stats = ingest.sync_profile_docs("t", docs)
+    assert (stats.unchanged, stats.chunks_indexed) == (1, 0)
+    assert store.get()["ids"] == ids
+
+
+def test_changed_file_is_replaced_and_removed_file_dropped(env):
+    docs, store, _ = env
+    (docs / "cv.txt").write_text("Python and Go engineer.", encoding="utf-8")
+    (docs / "old.md").write_text("Old summary.", encoding="utf-8")
+    ingest.sync_profile_docs("t", docs)
+
+    (docs / "cv.txt").write_text("Rust and Kubernetes engineer, formerly Python.", encoding="utf-8")
+    (docs / "old.md").unlink()
+    stats = ingest.sync_profile_docs("t", docs)
+    assert (stats.updated, stats.removed, stats.files) == (1, 1, 1)
+    assert store.get()["documents"] == ["Rust and Kubernetes engineer, formerly Python."]
+
+
+def test_manifest_is_ignored_when_the_collection_is_empty(env):
+    docs, store, _ = env
+    (docs / "cv.txt").write_text("Python and Go engineer.", encoding="utf-8")
+    ingest.sync_profile_docs("t", docs)
+    store.delete(where={"doc_type": "profile"})
+
+    assert ingest.sync_profile_docs("t", docs).added == 1
+    assert store.count() == 1
+
+
+def test_sync_waits_for_the_manifest_lock(env):
+    docs, _, manifest = env
+    (docs / "cv.txt").write_text("Python and Go engineer.", encoding="utf-8")
+    done = threading.Event()
+
+    def sync():
+        ingest.sync_profile_docs("t", docs)
+        done.set()
+
+    with file_lock(manifest.with_suffix(".lock")):
+        thread = threading.Thread(target=sync)
+        thread.start()
+        assert not done.wait(0.3)
+    assert done.wait(10)
+    thread.join()
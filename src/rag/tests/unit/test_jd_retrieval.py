@@ -0,0 +1,57 @@
+import pytest
+
+from rag.ingestion import ingest
+from rag.retrieval import retriever
+from rag.utils.fingerprint import content_hash
+from rag.vectorstore.clients.numpy_store import NumpyStore
+
+JD_A = "Senior Python engineer. Must have Kafka, Postgres and AWS experience."
+JD_B = "Barista wanted. Must have latte art skills and weekend availability."
+
+
+class FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        # Every text looks alike, so only the filter separates the JDs.
+        return [1.0, 0.01 * (len(text) % 7)]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = NumpyStore(tmp_path / "store", embedding_function=FakeEmbeddings())
+    monkeypatch.setattr(ingest, "get_vector_store", lambda tenant=None: store)
+    monkeypatch.setattr(retriever, "get_vector_store", lambda tenant=None: store)
+    return store
+
+
+def test_jd_chunks_are_tagged_and_indexed_once(store):
+    assert ingest.index_jd_text(JD_A, "t") > 0
+    assert ingest.index_jd_text(JD_A, "t") == 0
+    assert {m["jd_hash"] for m in store.get(where={"doc_type": "jd"})["metadatas"]} == {content_hash(JD_A)}
+
+
+def test_retrieval_is_scoped_to_one_jd(store):
+    ingest.index_jd_text(JD_A, "t")
+    ingest.index_jd_text(JD_B, "t")
+
+    (docs, _), = retriever.retrieve_many_with_stats(
+        ["requirements"], k=5, filters=[ingest.jd_where(content_hash(JD_B))], tenant="t"
+    )
+    assert docs and all("Barista" in d.page_content for d in docs)
+    docs, _ = retriever.retrieve_with_stats("requirements", k=5, where=ingest.jd_where(content_hash(JD_A)), tenant="t")
+    assert docs and all("Python" in d.page_content for d in docs)
+
+
+def test_drop_removes_only_that_jd(store):
+    ingest.index_jd_text(JD_A, "t")
+    ingest.index_jd_text(JD_B, "t")
+    ingest.drop_jd_text(JD_A, "t")
+
+    assert {m["jd_hash"] for m in store.get(where={"doc_type": "jd"})["metadatas"]} == {content_hash(JD_B)}
+
+
+def test_filters_must_match_queries(store):
+    with pytest.raises(ValueError):
+        retriever.retrieve_many_with_stats(["a", "b"], filters=[None])
@@ -0,0 +1,134 @@
+import time
+
+import pytest
+
+from rag.jobs.job_queue import CANCELLED, FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(db_path=tmp_path / "jobs.sqlite3", results_dir=tmp_path / "results", lease_s=60)
+
+
+def _expire_lease(queue, job_id):
+    conn = queue._connect()
+    try:
+        conn.execute("UPDATE jobs SET lease_expires_at = ? WHERE id = ?", (time.time() - 1, job_id))
+    finally:
+        conn.close()
+
+
+def test_claim_takes_oldest_job_once(queue):
+    first = queue.submit({"jd_text": "a"})
+    queue.submit({"jd_text": "b"})
+
+    job = queue.claim("w1")
+    assert job.id == first
+    assert job.status == RUNNING
+    assert job.attempts == 1
+    assert job.payload == {"jd_text": "a"}
+    assert queue.claim("w2").id != first
+    assert queue.claim("w3") is None
+
+
+def test_complete_persists_result(queue):
+    job_id = queue.submit({})
+    queue.claim("w1")
+    queue.complete(job_id, "w1", {"cover": "Dear team"})
+
+    assert queue.get(job_id).status == SUCCEEDED
+    assert queue.load_result(job_id) == {"cover": "Dear team"}
+
+
+def test_fail_requeues_until_attempts_are_used_up(queue):
+    job_id = queue.submit({}, max_attempts=2)
+    queue.claim("w1")
+    assert queue.fail(job_id, "w1", "boom").status == QUEUED
+
+    assert queue.claim("w1").attempts == 2
+    job = queue.fail(job_id, "w1", "boom again")
+    assert job.status == FAILED
+    assert job.error == "boom again"
+    assert queue.claim("w1") is None
+
+
+def test_fail_honours_retry_delay(queue):
+    job_id = queue.submit({}, max_attempts=3)
+    queue.claim("w1")
+    queue.fail(job_id, "w1", "boom", retry_in=60)
+    assert queue.claim("w1") is None
+
+
+def test_expired_lease_is_reclaimed(queue):
+    job_id = queue.submit({}, max_attempts=3)
+    queue.claim("w1")
+    assert queue.claim("w2") is None
+
+    _expire_lease(queue, job_id)
+    job = queue.claim("w2")
+    assert job.id == job_id
+    assert job.worker_id == "w2"
+    assert job.attempts == 2
+
+
+def test_stale_worker_cannot_override_new_owner(queue):
+    job_id = queue.submit({}, max_attempts=3)
+    queue.claim("w1")
+    _expire_lease(queue, job_id)
+    queue.claim("w2")
+    queue.complete(job_id, "w2", {"cover": "from w2"})
+
+    # w1 finishes late: neither its failure nor its result may touch the job.
+    job = queue.fail(job_id, "w1", "timed out")
+    assert job.status == SUCCEEDED
+    assert job.error is None
+    assert queue.complete(job_id, "w1", {"cover": "from w1"}) is None
+    assert queue.load_result(job_id) == {"cover": "from w2"}
+    assert list(queue.results_dir.iterdir()) == [queue.results_dir / f"{job_id}.json"]
+
+
+def test_stale_worker_cannot_requeue_running_job(queue):
+    job_id = queue.submit({}, max_attempts=3)
+    queue.claim("w1")
+    _expire_lease(queue, job_id)
+    queue.claim("w2")
+
+    job = queue.fail(job_id, "w1", "timed out")
+    assert job.status == RUNNING
+    assert job.worker_id == "w2"
+
+
+def test_expired_lease_on_last_attempt_fails_the_job(queue):
+    job_id = queue.submit({}, max_attempts=1)
+    queue.claim("w1")
+
+    _expire_lease(queue, job_id)
+    assert queue.claim("w2") is None
+    job = queue.get(job_id)
+    assert job.status == FAILED
+    assert "lease expired" in job.error
+    assert job.finished_at is not None
+
+
+def test_heartbeat_extends_lease_and_reports_cancel(queue):
+    job_id = queue.submit({})
+    queue.claim("w1")
+    _expire_lease(queue, job_id)
+
+    assert queue.heartbeat(job_id) is False
+    assert queue.get(job_id).lease_expires_at > time.time()
+    queue.cancel(job_id)
+    assert queue.heartbeat(job_id) is True
+
+
+def test_cancel_queued_job(queue):
+    job_id = queue.submit({})
+    assert queue.cancel(job_id).status == CANCELLED
+    assert queue.claim("w1") is None
+
+
+def test_counts(queue):
+    queue.submit({})
+    queue.submit({})
+    queue.claim("w1")
+    assert queue.counts() == {QUEUED: 1, RUNNING: 1}
@@ -0,0 +1,66 @@
+from rag.vectorstore.maintenance import find_removals
+
+NOW = 1_000_000.0
+DAY = 86400
+
+
+def _find(rows, **kwargs):
+    ids = [r[0] for r in rows]
+    documents = [r[1] for r in rows]
+    metadatas = [r[2] for r in rows]
+    return find_removals(ids, documents, metadatas, now=NOW, **kwargs)
+
+
+def test_jd_revisions_keep_their_shared_chunks():
+    rows = [
+        ("old", "Must have Python.", {"doc_type": "jd", "jd_hash": "rev1", "indexed_at": NOW - 60}),
+        ("new", "Must have Python.", {"doc_type": "jd", "jd_hash": "rev2", "indexed_at": NOW - 30}),
+        ("again", "Must have  python.", {"doc_type": "jd", "jd_hash": "rev2", "indexed_at": NOW - 10}),
+    ]
+    removals = _find(rows, jd_max_age_days=1)
+    assert removals["exact"] == set()
+    assert removals["near"] == {"new"}
+
+
+def test_profile_chunks_of_missing_files_are_orphans(tmp_path):
+    present = tmp_path / "cv.txt"
+    present.write_text("cv", encoding="utf-8")
+    rows = [
+        ("kept", "Python engineer.", {"doc_type": "profile", "source": str(present), "indexed_at": NOW}),
+        ("gone", "Go engineer.", {"doc_type": "profile", "source": str(tmp_path / "old.txt"), "indexed_at": NOW}),
+        ("no-source", "Rust engineer.", {"doc_type": "profile", "indexed_at": NOW}),
+    ]
+    assert _find(rows)["orphans"] == {"gone"}
+
+
+def test_jd_chunks_expire_at_the_cutoff():
+    rows = [
+        ("fresh", "A", {"doc_type": "jd", "jd_hash": "a", "indexed_at": NOW - 2 * DAY + 1}),
+        ("stale", "B", {"doc_type": "jd", "jd_hash": "b", "indexed_at": NOW - 2 * DAY - 1}),
+    ]
+    assert _find(rows, jd_max_age_days=2)["expired_jd"] == {"stale"}
+
+
+def test_legacy_chunks_without_timestamps():
+    rows = [
+        ("legacy-jd", "Must have Python.", {"doc_type": "jd", "jd_hash": "a"}),
+        ("legacy-profile", "Python engineer.", {"doc_type": "profile"}),
+        ("newer-profile", "Python engineer.", {"doc_type": "profile", "indexed_at": NOW}),
+    ]
+    removals = _find(rows)
+    # JD chunks from before timestamps count as expired; legacy profile copies lose to timestamped ones.
+    assert removals["expired_jd"] == {"legacy-jd"}
+    assert removals["exact"] == {"legacy-profile"}
+
+
+def test_duplicates_keep_the_newest_copy():
+    rows = [
+        ("exact-old", "Led the platform team.", {"doc_type": "profile", "indexed_at": NOW - 30}),
+        ("exact-new", "Led the platform team.", {"doc_type": "profile", "indexed_at": NOW - 10}),
+        ("near-old", "LED the  platform team.", {"doc_type": "profile", "indexed_at": NOW - 20}),
+        ("other-type", "Led the platform team.", {"doc_type": "jd", "jd_hash": "a", "indexed_at": NOW - 40}),
+    ]
+    removals = _find(rows)
+    assert removals["exact"] == {"exact-old"}
+    assert removals["near"] == {"near-old"}
+    assert not removals["orphans"] and not removals["expired_jd"]
@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+# The embedding_model package imports the HuggingFace factory.
+pytest.importorskip("langchain_huggingface")
+
+from rag.models.embedding_model import managed
+from rag.models.embedding_model.managed import ManagedEmbeddings
+
+
+class FakeModel:
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.entered = threading.Event()
+
+    def embed_documents(self, texts):
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class Loader:
+    def __init__(self, gate=None):
+        self.models = []
+        self.gate = gate
+
+    def __call__(self):
+        self.models.append(FakeModel(self.gate))
+        return self.models[-1]
+
+
+@pytest.fixture
+def make(monkeypatch):
+    monkeypatch.setattr(managed, "_release_memory", lambda: None)
+    holders = []
+
+    def build(loader, **kwargs):
+        kwargs.setdefault("max_rss_mb", 0)
+        kwargs.setdefault("check_interval_s", 60)
+        holders.append(ManagedEmbeddings(loader, **kwargs))
+        return holders[-1]
+
+    yield build
+    for holder in holders:
+        holder.close()
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_loads_lazily_once(make):
+    loader = Loader()
+    emb = make(loader, idle_unload_s=0)
+    assert not emb.loaded and loader.models == []
+
+    assert emb.embed_query("abc") == [3.0, 1.0]
+    assert emb.embed_documents(["a", "bb"]) == [[1.0, 1.0], [2.0, 1.0]]
+    assert len(loader.models) == 1
+    assert (emb.loads, emb.reloads, emb.unloads) == (1, 0, 0)
+
+
+def test_reaper_unloads_when_idle(make):
+    emb = make(Loader(), idle_unload_s=0.05, check_interval_s=0.01)
+    emb.embed_query("x")
+
+    _wait_for(lambda: not emb.loaded)
+    assert emb.unloads == 1
+    assert emb.last_unload_reason == "idle"
+    _wait_for(lambda: not emb._reaper.is_alive())
+
+
+def test_in_flight_call_is_never_unloaded(make):
+    gate = threading.Event()
+    loader = Loader(gate)
+    emb = make(loader, idle_unload_s=0.01)
+    worker = threading.Thread(target=emb.embed_documents, args=(["busy"],))
+    worker.start()
+    _wait_for(lambda: loader.models and loader.models[0].entered.is_set())
+    time.sleep(0.03)  # past idle_unload_s
+
+    assert emb.maybe_evict() is None
+    assert emb.unload("manual") is False
+    assert emb.loaded
+
+    gate.set()
+    worker.join(5)
+    time.sleep(0.03)
+    assert emb.maybe_evict() == "idle"
+    assert not emb.loaded
+
+
+def test_reload_is_transparent_and_counted(make):
+    loader = Loader()
+    emb = make(loader, idle_unload_s=0)
+    emb.embed_query("a")
+    assert emb.unload() is True
+    assert emb.unload() is False  # nothing left to drop
+
+    assert emb.embed_query("abcd") == [4.0, 1.0]
+    assert len(loader.models) == 2
+    stats = emb.stats()
+    assert stats["model_loaded"] is True
+    assert (stats["loads"], stats["reloads"], stats["unloads"]) == (2, 1, 1)
+    assert stats["last_unload_reason"] == "manual"
+
+
+def test_memory_ceiling_evicts(make, monkeypatch):
+    monkeypatch.setattr(managed, "process_rss_bytes", lambda: 2_000_000_000)
+    emb = make(Loader(), idle_unload_s=0, max_rss_mb=1000)
+    emb.embed_query("a")
+
+    assert emb.maybe_evict() == "memory"
+    assert emb.last_unload_reason == "memory"
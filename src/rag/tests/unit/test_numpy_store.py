@@ -0,0 +1,94 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from rag.vectorstore.clients.numpy_store import NumpyStore
+
+
+def _store(path):
+    return NumpyStore(path, dtype="float32")
+
+
+def _add(store, ids, vectors, doc_type="profile"):
+    store.add_embeddings(ids, vectors, [f"doc {i}" for i in ids], [{"doc_type": doc_type, "n": i} for i in ids])
+
+
+def _write_many(path, prefix, count):
+    store = _store(path)
+    for i in range(count):
+        _add(store, [f"{prefix}-{i}"], [[float(i + 1), 1.0]])
+
+
+def test_top_k_is_ordered_by_cosine_similarity(tmp_path):
+    store = _store(tmp_path)
+    _add(store, ["x", "y", "xy"], [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+
+    hits = store.search_by_vectors([[1.0, 0.1]], k=2)[0]
+    assert [doc.id for doc, _ in hits] == ["x", "xy"]
+    assert hits[0][1] == pytest.approx(1.0 / np.sqrt(1.01))
+
+
+def test_filters_restrict_candidates(tmp_path):
+    store = _store(tmp_path)
+    _add(store, ["p"], [[1.0, 0.0]], doc_type="profile")
+    _add(store, ["j"], [[0.9, 0.1]], doc_type="jd")
+
+    hits = store.similarity_search_by_vectors([[1.0, 0.0], [1.0, 0.0]], k=5, filters=[{"doc_type": "jd"}, None])
+    assert [d.id for d in hits[0]] == ["j"]
+    assert [d.id for d in hits[1]] == ["p", "j"]
+    assert store.similarity_search_by_vector([1.0, 0.0], filter={"doc_type": "other"}) == []
+
+
+def test_existing_ids_are_overwritten(tmp_path):
+    store = _store(tmp_path)
+    _add(store, ["a"], [[1.0, 0.0]])
+    store.add_embeddings(["a"], [[0.0, 1.0]], ["new"], [{"doc_type": "profile"}])
+
+    assert store.count() == 1
+    assert store.get()["documents"] == ["new"]
+
+
+def test_delete_by_id_and_where(tmp_path):
+    store = _store(tmp_path)
+    _add(store, ["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+    _add(store, ["j"], [[1.0, 1.0]], doc_type="jd")
+
+    store.delete(ids=["a"])
+    store.delete(where={"doc_type": "jd"})
+    assert store.get()["ids"] == ["b"]
+    store.delete(ids=["b"])
+    assert store.count() == 0
+    assert store.search_by_vectors([[1.0, 0.0]], k=3) == [[]]
+
+
+def test_dimension_mismatch_is_rejected(tmp_path):
+    store = _store(tmp_path)
+    _add(store, ["a"], [[1.0, 0.0]])
+    with pytest.raises(ValueError):
+        _add(store, ["b"], [[1.0, 0.0, 0.0]])
+
+
+def test_writes_from_another_instance_are_merged(tmp_path):
+    first, second = _store(tmp_path), _store(tmp_path)
+    _add(first, ["a"], [[1.0, 0.0]])
+    # ``second`` has not read since ``first`` wrote; its write must not drop "a".
+    _add(second, ["b"], [[0.0, 1.0]])
+    _add(first, ["c"], [[1.0, 1.0]])
+
+    assert sorted(_store(tmp_path).get()["ids"]) == ["a", "b", "c"]
+    assert len(list(tmp_path.glob("vectors-*.npy"))) == 1
+
+
+def test_concurrent_writer_processes_lose_nothing(tmp_path):
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_write_many, args=(tmp_path, f"w{n}", 10)) for n in range(3)]
+    for proc in workers:
+        proc.start()
+    for proc in workers:
+        proc.join(60)
+        assert proc.exitcode == 0
+
+    store = _store(tmp_path)
+    assert store.count() == 30
+    assert len(store.search_by_vectors([[1.0, 1.0]], k=30)[0]) == 30
@@ -0,0 +1,126 @@
+import time
+
+import pytest
+
+pytest.importorskip("langchain_ollama")
+
+from rag.models.llm.host_pool import HostPool
+from rag.models.llm.ollama_client import OllamaClient
+from rag.utils.cancellation import CancelToken
+from rag.utils.exceptions import GenerationCancelled, LLMError
+
+
+def _client(server, **kwargs):
+    kwargs.setdefault("max_retries", 2)
+    kwargs.setdefault("retry_backoff_s", 0.01)
+    kwargs.setdefault("timeout_s", 10)
+    pool = HostPool([server.url], eject_after=100, probe=lambda url: True)
+    return OllamaClient(pool=pool, model="llama3.2:3b", **kwargs)
+
+
+def test_returns_the_streamed_reply(mock_ollama):
+    client = _client(mock_ollama)
+    assert client.run("system", "hello") == "This is a mock Ollama reply."
+    assert client.stats.snapshot()["successes"] == 1
+
+
+def test_retries_transient_errors_with_backoff(mock_ollama):
+    mock_ollama.config.fail_next = 2
+    client = _client(mock_ollama, retry_backoff_s=0.05)
+
+    start = time.monotonic()
+    assert client.run("system", "hello")
+    elapsed = time.monotonic() - start
+
+    stats = client.stats.snapshot()
+    assert stats["retries"] == 2
+    assert stats["failures"] == 2
+    assert mock_ollama.config.requests == 3
+    # Backoff doubles: >= 0.05 + 0.1 before the third attempt.
+    assert elapsed >= 0.15
+
+
+def test_gives_up_after_max_retries(mock_ollama):
+    mock_ollama.config.fail_next = 10
+    client = _client(mock_ollama, max_retries=1)
+    with pytest.raises(LLMError):
+        client.run("system", "hello")
+    assert mock_ollama.config.requests == 2
+
+
+def test_client_errors_are_not_retried(mock_ollama):
+    mock_ollama.config.fail_next = 1
+    mock_ollama.config.fail_status = 400
+    client = _client(mock_ollama)
+    with pytest.raises(LLMError):
+        client.run("system", "hello")
+    assert mock_ollama.config.requests == 1
+
+
+def test_read_timeout_is_bounded_by_the_deadline(mock_ollama):
+    mock_ollama.config.delay_s = 2.0
+    client = _client(mock_ollama, read_timeout_s=0.2, timeout_s=0.6)
+
+    start = time.monotonic()
+    with pytest.raises(LLMError):
+        client.run("system", "hello")
+    assert time.monotonic() - start < 1.5
+    assert client.stats.snapshot()["timeouts"] >= 1
+
+
+def test_cancelled_token_stops_the_call(mock_ollama):
+    client = _client(mock_ollama)
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(GenerationCancelled):
+        client.run("system", "hello", token=token)
+    assert mock_ollama.config.requests == 0
+
+
+def test_keep_alive_is_sent_and_keeps_the_model_loaded(mock_ollama):
+    mock_ollama.config.load_s = 0.6
+    client = _client(mock_ollama, keep_alive="10m")
+
+    client.run("system", "first")
+    client.run("system", "second")
+
+    assert [b["keep_alive"] for b in mock_ollama.config.bodies] == ["10m", "10m"]
+    assert mock_ollama.config.loads == 1
+    stats = client.stats.snapshot()
+    assert (stats["cold_calls"], stats["warm_calls"]) == (1, 1)
+
+
+def test_zero_keep_alive_reloads_every_call(mock_ollama):
+    client = _client(mock_ollama, keep_alive=0)
+    client.run("system", "first")
+    client.run("system", "second")
+    assert mock_ollama.config.loads == 2
+
+
+def test_warmup_loads_the_model_on_each_host(mock_ollama):
+    mock_ollama.config.load_s = 0.1
+    client = _client(mock_ollama)
+    loaded = client.warmup()
+    assert loaded[mock_ollama.url] == pytest.approx(0.1, abs=0.05)
+    assert mock_ollama.config.bodies[-1].get("messages") in (None, [])
+
+
+def test_section_options_and_stops_reach_ollama(mock_ollama):
+    from rag.generation.prompts.templates import SECTION_OPTIONS
+
+    emails = SECTION_OPTIONS["emails"]
+    client = _client(mock_ollama, temperature=0.3)
+    client.run("system", "hello", options=emails.as_ollama_options(), stop=emails.stop, name="emails")
+
+    options = mock_ollama.config.bodies[-1]["options"]
+    assert options["num_predict"] == emails.num_predict
+    assert options["temperature"] == emails.temperature
+    assert options["stop"] == list(emails.stop)
+    assert "=== Email 4 ===" in options["stop"]
+    assert "\n[PROFILE]" in options["stop"]
+
+
+def test_calls_without_stops_send_none(mock_ollama):
+    client = _client(mock_ollama)
+    client.run("system", "hello", options={"num_predict": 16})
+    assert mock_ollama.config.bodies[-1]["options"].get("stop") is None
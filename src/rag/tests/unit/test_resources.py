@@ -0,0 +1,93 @@
+import pytest
+
+from rag import resources
+from rag.resources import ResourceRegistry
+
+
+class Loader:
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    def __call__(self):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("model missing")
+        return {"instance": self.calls}
+
+
+@pytest.fixture
+def registry():
+    return ResourceRegistry()
+
+
+def test_get_builds_once_and_records_status(registry):
+    loader = Loader()
+    registry.register("model", loader)
+    assert not registry.is_loaded("model")
+
+    first = registry.get("model")
+    assert registry.get("model") is first
+    assert loader.calls == 1
+    status = registry.health()["model"]
+    assert status["loaded"] and status["error"] is None
+    assert status["load_time_s"] is not None
+
+
+def test_reset_rebuilds_on_next_get(registry):
+    loader = Loader()
+    registry.register("model", loader)
+    first = registry.get("model")
+
+    registry.reset("model")
+    assert not registry.is_loaded("model")
+    assert registry.health()["model"]["loaded"] is False
+    assert registry.get("model") is not first
+    assert loader.calls == 2
+
+
+def test_warmup_records_errors_instead_of_raising(registry):
+    registry.register("good", Loader())
+    registry.register("bad", Loader(fail=True))
+
+    statuses = registry.warmup()
+    assert statuses["good"].loaded
+    assert not statuses["bad"].loaded
+    assert statuses["bad"].error == "RuntimeError: model missing"
+    with pytest.raises(RuntimeError):
+        registry.get("bad")
+
+
+def test_health_merges_checks_and_reports_check_errors(registry):
+    registry.register("ok", Loader(), check=lambda inst: {"items": inst["instance"]})
+    registry.register("broken", Loader(), check=lambda inst: 1 / 0)
+    registry.register("cold", Loader(), check=lambda inst: pytest.fail("checked an unloaded resource"))
+    registry.warmup(["ok", "broken"])
+
+    report = registry.health()
+    assert report["ok"]["items"] == 1
+    assert report["broken"]["error"].startswith("ZeroDivisionError")
+    assert report["cold"]["loaded"] is False
+
+
+def test_health_check_is_cached_for_its_ttl(registry, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(resources.time, "monotonic", lambda: clock[0])
+    calls = []
+
+    def check(instance):
+        calls.append(instance)
+        return {"checks": len(calls)}
+
+    registry.register("store", Loader(), check=check, check_ttl_s=30)
+    registry.get("store")
+
+    assert registry.health()["store"]["checks"] == 1
+    clock[0] += 10
+    assert registry.health()["store"]["checks"] == 1
+    clock[0] += 30
+    assert registry.health()["store"]["checks"] == 2
+
+    registry.reset("store")
+    registry.get("store")
+    assert registry.health()["store"]["checks"] == 3
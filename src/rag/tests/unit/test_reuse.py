@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from rag.generation.reuse import PackageStore, jd_fingerprint, lsh_keys
+from rag.utils.fingerprint import hamming
+
+JD = (
+    "We are hiring a senior backend engineer to design and operate Python services on AWS. "
+    "You will own our event pipeline built on Kafka and Postgres, mentor engineers, review code, "
+    "improve observability with Prometheus and Grafana, and work closely with product on the roadmap. "
+    "Experience with Kubernetes, Terraform and CI/CD is expected; Go is a plus."
+)
+REPOST = JD.replace("Go is a plus.", "Go is a strong plus.")
+UNRELATED = "Part-time barista wanted for a busy cafe; latte art, cash handling and early shifts."
+
+VERSIONS = {"skills": "s1", "ats": "a1", "cover": "c1", "emails": "e1"}
+SIGNATURES = {"skills": "sig-skills", "ats": "sig-ats"}
+RESULT = {"skills": "S", "ats": "A", "cover": "C", "emails": "E", "timings": {"total": 1.0}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PackageStore(db_path=tmp_path / "packages.sqlite3", max_distance=8, text_distance=3)
+
+
+def test_fingerprints_within_max_distance_share_an_lsh_key():
+    rng = random.Random(7)
+    for _ in range(200):
+        h = rng.getrandbits(64)
+        flipped = h
+        for bit in rng.sample(range(64), 8):
+            flipped ^= 1 << bit
+        assert set(lsh_keys(h, 10)) & set(lsh_keys(flipped, 10))
+
+
+def test_exact_jd_reuses_every_section(store):
+    store.put(JD, "profile-1", RESULT, SIGNATURES, VERSIONS)
+    match = store.find(JD, "profile-1", SIGNATURES, VERSIONS)
+
+    assert match.distance == 0
+    assert match.complete
+    assert "timings" not in match.result
+
+
+def test_reworded_repost_is_found_through_lsh(store):
+    assert 0 < hamming(jd_fingerprint(JD), jd_fingerprint(REPOST)) <= 8
+    package_id = store.put(JD, "profile-1", RESULT, SIGNATURES, VERSIONS)
+
+    match = store.find(REPOST, "profile-1", SIGNATURES, VERSIONS)
+    assert match.package_id == package_id
+    assert store.find(UNRELATED, "profile-1", SIGNATURES, VERSIONS) is None
+
+
+def test_other_profile_key_never_matches(store):
+    store.put(JD, "profile-1", RESULT, SIGNATURES, VERSIONS)
+    assert store.find(JD, "profile-2", SIGNATURES, VERSIONS) is None
+
+
+def test_changed_prompt_or_inputs_mark_sections_stale(store):
+    store.put(JD, "profile-1", RESULT, SIGNATURES, VERSIONS)
+    match = store.find(JD, "profile-1", {**SIGNATURES, "ats": "other"}, {**VERSIONS, "cover": "c2"})
+
+    assert sorted(match.reusable) == ["emails", "skills"]
+    assert sorted(match.stale) == ["ats", "cover"]
+
+
+def test_store_is_pruned_to_max_entries(tmp_path):
+    store = PackageStore(db_path=tmp_path / "packages.sqlite3", max_entries=2)
+    for i in range(4):
+        store.put(f"{JD} Team {i}.", "profile-1", RESULT, SIGNATURES, VERSIONS)
+    assert store.count() == 2
+
+
+def test_index_is_rebuilt_when_band_count_changes(tmp_path):
+    path = tmp_path / "packages.sqlite3"
+    PackageStore(db_path=path, max_distance=8).put(JD, "profile-1", RESULT, SIGNATURES, VERSIONS)
+
+    store = PackageStore(db_path=path, max_distance=4)
+    assert store.find(REPOST, "profile-1", SIGNATURES, VERSIONS) is not None
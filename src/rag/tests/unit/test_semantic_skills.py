@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from rag.ingestion.preprocessing import semantic_skills
+from rag.ingestion.preprocessing.semantic_skills import SkillMatcher
+
+AXES = {"python": 0, "collaboration": 1, "teamwork": 1, "kubernetes": 2}
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        out = []
+        for t in texts:
+            v = np.full(4, 0.05)
+            v[AXES.get(t.lower(), 3)] = 1.0
+            out.append(v.tolist())
+        return out
+
+
+@pytest.fixture
+def matcher(tmp_path):
+    return SkillMatcher(["Python", "Collaboration"], FakeEmbeddings(), threshold=0.9, cache_dir=tmp_path)
+
+
+def test_lexicon_matrix_is_cached_on_disk(tmp_path, matcher):
+    again = SkillMatcher(["Python", "Collaboration"], FakeEmbeddings(), cache_dir=tmp_path)
+    assert again._embeddings.embedded == []
+    assert np.allclose(again.matrix, matcher.matrix)
+
+
+def test_match_lexicon(matcher):
+    hits = matcher.match_lexicon(["Teamwork", "python", "Kubernetes"])
+    assert hits[0][0] == "Collaboration" and hits[0][1] > 0.9
+    assert hits[1][0] == "Python"
+    assert hits[2] is None
+    assert matcher.match_lexicon([]) == []
+
+
+def test_covered(matcher):
+    assert matcher.covered(["Collaboration", "Kubernetes"], ["Teamwork", "Python"]) == ["Collaboration"]
+    assert matcher.covered(["Python"], []) == []
+
+
+def test_terms_are_embedded_once(matcher):
+    matcher._embeddings.embedded.clear()
+    matcher.vectors(["aa", "bb", "aa"])
+    matcher.vectors(["bb", "Python"])
+    assert matcher._embeddings.embedded == ["aa", "bb"]
+
+
+def test_eviction_keeps_the_rows_of_the_current_call(matcher, monkeypatch):
+    monkeypatch.setattr(semantic_skills, "MAX_CACHED_TERMS", 3)
+    matcher.vectors(["aa", "bb", "cc"])
+
+    rows = matcher.vectors(["aa", "dd"])
+    assert rows.shape == (2, 4)
+    # "bb" was least recently used; "aa" was just touched.
+    assert list(matcher._cache) == ["cc", "aa", "dd"]
+
+    rows = matcher.vectors(["ee", "ff", "gg", "hh", "aa"])
+    assert rows.shape == (5, 4)
+    assert len(matcher._cache) == 3
@@ -0,0 +1,132 @@
+import shutil
+
+import pytest
+
+from rag.ingestion import ingest
+from rag.utils.exceptions import SnapshotError
+from rag.vectorstore import maintenance, snapshot
+from rag.vectorstore.clients.numpy_store import NumpyStore
+
+
+class FakeEmbeddings:
+    calls = 0
+
+    def embed_documents(self, texts):
+        FakeEmbeddings.calls += len(texts)
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0, float(sum(map(ord, text)) % 97)]
+
+
+class Node:
+    """One machine: its own profile folder, manifest and store."""
+
+    def __init__(self, root):
+        self.docs = root / "docs"
+        self.docs.mkdir(parents=True)
+        self.manifest = root / "manifest.json"
+        self.store = NumpyStore(root / "store", embedding_function=FakeEmbeddings())
+
+    def activate(self, monkeypatch):
+        monkeypatch.setattr(ingest, "PROFILE_MANIFEST_PATH", self.manifest)
+        monkeypatch.setattr(ingest, "get_vector_store", lambda tenant=None: self.store)
+        monkeypatch.setattr(snapshot, "get_vector_store", lambda tenant=None: self.store)
+        monkeypatch.setattr(snapshot, "PROFILE_DOC_DIR", self.docs)
+
+    def sync(self):
+        return ingest.sync_profile_docs("t", self.docs)
+
+
+@pytest.fixture
+def nodes(tmp_path, monkeypatch):
+    source, target = Node(tmp_path / "a"), Node(tmp_path / "b")
+    (source.docs / "cv.txt").write_text("Python and Go engineer.\n\nLed platform teams.", encoding="utf-8")
+    (source.docs / "summary.md").write_text("Ten years of backend work.", encoding="utf-8")
+    source.activate(monkeypatch)
+    source.sync()
+    ingest.index_jd_text("Hiring a Python engineer.", "t")
+    return source, target, monkeypatch
+
+
+def test_round_trip_needs_no_re_embedding(nodes, tmp_path):
+    source, target, monkeypatch = nodes
+    path = tmp_path / "profile.ragsnap"
+    info = snapshot.export_snapshot(path, "t")
+    assert info.count == source.store.count()
+
+    # The documents arrive on the new node with fresh mtimes.
+    for doc in source.docs.iterdir():
+        shutil.copy(doc, target.docs / doc.name)
+    target.activate(monkeypatch)
+    result = snapshot.import_snapshot(path, "t")
+    assert result["imported"] == info.count
+
+    sources = {m["source"] for m in target.store.get(where={"doc_type": "profile"})["metadatas"]}
+    assert sources == {str(target.docs / "cv.txt"), str(target.docs / "summary.md")}
+    assert set(ingest.manifest_entries("t")) == sources
+
+    calls = FakeEmbeddings.calls
+    stats = target.sync()
+    assert (stats.unchanged, stats.chunks_indexed) == (2, 0)
+    assert FakeEmbeddings.calls == calls
+    assert target.store.count() == info.count
+
+    data = target.store.get()
+    removals = maintenance.find_removals(data["ids"], data["documents"], data["metadatas"])
+    assert not removals["orphans"]
+
+
+def test_replace_removes_other_chunks_only_after_the_import(nodes, tmp_path):
+    source, _, _ = nodes
+    path = tmp_path / "profile.ragsnap"
+    snapshot.export_snapshot(path, "t")
+    source.store.add_embeddings(["extra"], [[1.0, 1.0, 1.0]], ["stray"], [{"doc_type": "profile"}])
+
+    assert snapshot.import_snapshot(path, "t")["removed"] == 1
+    assert "extra" not in source.store.get()["ids"]
+
+
+def test_failed_add_keeps_the_existing_index(nodes, tmp_path, monkeypatch):
+    source, _, _ = nodes
+    path = tmp_path / "profile.ragsnap"
+    snapshot.export_snapshot(path, "t")
+    before = sorted(source.store.get()["ids"])
+
+    def boom(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(source.store, "add_embeddings", boom)
+    with pytest.raises(OSError):
+        snapshot.import_snapshot(path, "t")
+    assert sorted(source.store.get()["ids"]) == before
+
+
+def test_other_embedding_model_is_refused(nodes, tmp_path, monkeypatch):
+    path = tmp_path / "profile.ragsnap"
+    snapshot.export_snapshot(path, "t")
+    monkeypatch.setattr(snapshot, "EMBED_MODEL", "another-model")
+    with pytest.raises(SnapshotError, match="embedding model"):
+        snapshot.import_snapshot(path, "t")
+
+
+def test_corrupt_files_are_refused(nodes, tmp_path):
+    path = tmp_path / "profile.ragsnap"
+    snapshot.export_snapshot(path, "t")
+    raw = bytearray(path.read_bytes())
+
+    raw[-5] ^= 0xFF
+    path.write_bytes(bytes(raw))
+    with pytest.raises(SnapshotError, match="checksum"):
+        snapshot.import_snapshot(path, "t")
+
+    path.write_bytes(b"NOTASNAP" + bytes(raw[8:]))
+    with pytest.raises(SnapshotError, match="magic"):
+        snapshot.read_info(path)
+
+
+def test_empty_tenant_cannot_be_exported(tmp_path, monkeypatch):
+    node = Node(tmp_path)
+    node.activate(monkeypatch)
+    with pytest.raises(SnapshotError):
+        snapshot.export_snapshot(tmp_path / "empty.ragsnap", "t")
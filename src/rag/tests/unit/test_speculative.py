@@ -0,0 +1,138 @@
+import threading
+import time
+from concurrent.futures import wait
+
+import pytest
+
+from rag.generation import generator, speculative
+from rag.utils.cancellation import CancelToken
+from rag.utils.exceptions import GenerationCancelled
+
+PROFILE = {"name": "Jane"}
+JD_A = "Senior Python engineer."
+JD_B = "Staff Go engineer."
+
+
+class FakePrepare:
+    """Stands in for prepare_inputs; ``hold`` keeps it running until released."""
+
+    def __init__(self):
+        self.calls = []
+        self.hold = threading.Event()
+        self.hold.set()
+        self.started = threading.Event()
+
+    def __call__(self, jd_text, profile, token):
+        self.calls.append(jd_text)
+        self.started.set()
+        while not self.hold.wait(0.01):
+            token.check()
+        token.check()
+        return {"jd_text": jd_text, "tenant": "t", "context": f"ctx:{jd_text}"}
+
+
+@pytest.fixture
+def prepare(monkeypatch):
+    fake = FakePrepare()
+    dropped = []
+    monkeypatch.setattr(generator, "prepare_inputs", fake)
+    monkeypatch.setattr(speculative, "drop_jd_text", lambda jd_text, tenant: dropped.append((jd_text, tenant)))
+    monkeypatch.setattr(speculative, "profile_key", lambda profile: "pk")
+    monkeypatch.setattr(speculative, "profile_tenant", lambda profile: "t")
+    monkeypatch.setattr(speculative, "SPECULATIVE_ENABLED", True)
+    monkeypatch.setattr(speculative, "SPECULATIVE_DEBOUNCE_S", 0.05)
+    for state in (speculative._cache, speculative._running, speculative._latest):
+        state.clear()
+    fake.dropped = dropped
+    yield fake
+    fake.hold.set()
+    # Let background work finish before the next test resets the module state.
+    with speculative._lock:
+        speculative._latest.clear()
+        specs = list(speculative._running.values())
+    for spec in specs:
+        spec.token.cancel("test teardown")
+        spec.go.set()
+    wait([s.future for s in specs if s.future is not None], timeout=5)
+    # Once every worker runs one of these, all earlier tasks (cleanups) are done.
+    workers = speculative._executor._max_workers
+    barrier = threading.Barrier(workers)
+    wait([speculative._executor.submit(barrier.wait, 5) for _ in range(workers)], timeout=10)
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_prepared_result_is_peeked_then_taken_once(prepare):
+    assert speculative.speculate(JD_A, PROFILE, slot="s1")
+    _wait_for(lambda: speculative.status(JD_A, PROFILE) == speculative.READY)
+
+    assert speculative.peek(JD_A, PROFILE)["context"] == f"ctx:{JD_A}"
+    taken = speculative.take_prepared(JD_A, PROFILE)
+    assert taken["context"] == f"ctx:{JD_A}"
+    assert speculative.take_prepared(JD_A, PROFILE) is None
+    assert prepare.calls == [JD_A]
+
+
+def test_superseded_running_speculation_is_cancelled_and_cleaned_up(prepare):
+    prepare.hold.clear()
+    speculative.speculate(JD_A, PROFILE, slot="s1")
+    assert prepare.started.wait(5)
+
+    speculative.speculate(JD_B, PROFILE, slot="s1")
+    _wait_for(lambda: (JD_A, "t") in prepare.dropped)
+    assert speculative.status(JD_A, PROFILE) is None
+    prepare.hold.set()
+    _wait_for(lambda: speculative.status(JD_B, PROFILE) == speculative.READY)
+    assert speculative.peek(JD_A, PROFILE) is None
+
+
+def test_superseded_ready_result_is_dropped(prepare):
+    speculative.speculate(JD_A, PROFILE, slot="s1")
+    _wait_for(lambda: speculative.status(JD_A, PROFILE) == speculative.READY)
+
+    speculative.speculate(JD_B, PROFILE, slot="s1")
+    assert speculative.peek(JD_A, PROFILE) is None
+    _wait_for(lambda: (JD_A, "t") in prepare.dropped)
+
+
+def test_jd_still_live_in_another_slot_is_kept(prepare):
+    speculative.speculate(JD_A, PROFILE, slot="s1")
+    speculative.speculate(JD_A, PROFILE, slot="s2")
+    _wait_for(lambda: speculative.status(JD_A, PROFILE) == speculative.READY)
+
+    speculative.speculate(JD_B, PROFILE, slot="s1")
+    _wait_for(lambda: speculative.status(JD_B, PROFILE) == speculative.READY)
+    assert speculative.peek(JD_A, PROFILE) is not None
+    assert prepare.dropped == []
+
+
+def test_take_while_running_skips_the_debounce_and_waits(prepare, monkeypatch):
+    monkeypatch.setattr(speculative, "SPECULATIVE_DEBOUNCE_S", 30)
+    prepare.hold.clear()
+    speculative.speculate(JD_A, PROFILE, slot="s1")
+    result = {}
+    taker = threading.Thread(target=lambda: result.update(prepared=speculative.take_prepared(JD_A, PROFILE)))
+    taker.start()
+    assert prepare.started.wait(5)
+
+    # Claimed work survives being superseded in its slot.
+    speculative.speculate(JD_B, PROFILE, slot="s1")
+    prepare.hold.set()
+    taker.join(5)
+    assert result["prepared"]["context"] == f"ctx:{JD_A}"
+    assert speculative.peek(JD_A, PROFILE) is None
+    assert (JD_A, "t") not in prepare.dropped
+
+
+def test_waiting_take_honours_the_callers_token(prepare):
+    prepare.hold.clear()
+    speculative.speculate(JD_A, PROFILE, slot="s1")
+    token = CancelToken()
+    token.cancel("user")
+    with pytest.raises(GenerationCancelled):
+        speculative.take_prepared(JD_A, PROFILE, token)
@@ -0,0 +1,69 @@
+from langchain_core.documents import Document
+
+from rag.ingestion.chunking.structured import ChunkStrategy, StructuredTokenSplitter, is_plain_heading, parse_blocks
+
+CV = """# Experience
+## Acme Corp
+- Built the billing platform on Kubernetes,
+  cutting deploy time by half.
+- Mentored four engineers.
+
+SKILLS
+Python, Go, Terraform
+"""
+
+
+def _words(text):
+    return len(text.split())
+
+
+def _splitter(**strategy):
+    return StructuredTokenSplitter(default=ChunkStrategy(**strategy), length_function=_words)
+
+
+def test_blocks_follow_headings_and_join_wrapped_bullets():
+    assert parse_blocks(CV) == [
+        # A heading directly followed by another is kept as content.
+        ("", "Experience"),
+        ("Experience > Acme Corp", "- Built the billing platform on Kubernetes, cutting deploy time by half."),
+        ("Experience > Acme Corp", "- Mentored four engineers."),
+        ("Experience > Acme Corp > SKILLS", "Python, Go, Terraform"),
+    ]
+
+
+def test_plain_headings():
+    assert is_plain_heading("REQUIREMENTS")
+    assert is_plain_heading("What you will do:")
+    assert not is_plain_heading("- Python:")
+    assert not is_plain_heading("We are a small team building tools for hiring managers:")
+
+
+def test_chunks_stay_within_budget_and_carry_their_heading():
+    sections = _splitter(max_tokens=20).split_sections(CV, ChunkStrategy(max_tokens=20))
+    assert [s for s, _, _ in sections] == ["", "Experience > Acme Corp", "Experience > Acme Corp > SKILLS"]
+    for section, chunk, _ in sections[1:]:
+        assert chunk.startswith(section + "\n")
+    for _, chunk, tokens in sections:
+        assert tokens == _words(chunk) <= 20
+
+
+def test_oversized_blocks_are_cut_at_sentences_then_words():
+    text = "First sentence is here. " + " ".join(["Word"] * 40)
+    chunks = _splitter(max_tokens=20, heading_prefix=False).split_text(text)
+    assert chunks[0] == "First sentence is here."
+    assert all(_words(c) <= 20 for c in chunks)
+    assert sum(_words(c) for c in chunks) == _words(text)
+
+
+def test_overlap_repeats_whole_trailing_blocks():
+    text = "\n".join(f"- item {i} here" for i in range(6))
+    chunks = _splitter(max_tokens=10, overlap_tokens=4, heading_prefix=False).split_text(text)
+    assert len(chunks) > 1
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert nxt.splitlines()[0] == prev.splitlines()[-1]
+
+
+def test_split_documents_stamps_chunk_metadata():
+    docs = _splitter(max_tokens=20).split_documents([Document(page_content=CV, metadata={"doc_type": "profile"})])
+    assert [d.metadata["chunk_index"] for d in docs] == list(range(len(docs)))
+    assert all(d.metadata["doc_type"] == "profile" and d.metadata["chunk_tokens"] > 0 for d in docs)
@@ -7,10 +7,22 @@ from rag.utils.text import (
     SOFT_SKILL_LEXICON,
     bullet_list,
     fuzzy_overlap,
+    estimate_tokens,
+    skill_key,
 )
 from rag.utils.logging import logger
-from rag.utils.helpers import ensure_dir
-from rag.utils.exceptions import RagError, ProfileNotConfiguredError
+from rag.utils.helpers import ensure_dir, dir_size, file_lock, process_rss_bytes
+from rag.utils.exceptions import (
+    RagError,
+    ProfileNotConfiguredError,
+    JobNotFoundError,
+    LLMError,
+    LLMTimeoutError,
+    GenerationCancelled,
+    DeadlineExceeded,
+    SnapshotError,
+)
+from rag.utils.cancellation import CancelToken
 
 __all__ = [
     "normalize_text",
@@ -21,8 +33,20 @@ __all__ = [
     "SOFT_SKILL_LEXICON",
     "bullet_list",
     "fuzzy_overlap",
+    "estimate_tokens",
+    "skill_key",
     "logger",
     "ensure_dir",
+    "dir_size",
+    "file_lock",
+    "process_rss_bytes",
     "RagError",
     "ProfileNotConfiguredError",
+    "JobNotFoundError",
+    "LLMError",
+    "LLMTimeoutError",
+    "GenerationCancelled",
+    "DeadlineExceeded",
+    "SnapshotError",
+    "CancelToken",
 ]
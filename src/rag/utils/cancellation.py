@@ -0,0 +1,57 @@
+"""Request-scoped deadline + cancellation token shared by pipeline stages."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+from rag.utils.exceptions import DeadlineExceeded, GenerationCancelled
+
+
+class CancelToken:
+    """
+    Cooperative cancellation with an optional absolute deadline.
+
+    Stages call :meth:`check` at safe points; long waits use :meth:`wait` so a
+    cancel wakes them immediately.
+    """
+
+    def __init__(self, deadline_s: Optional[float] = None):
+        self._event = threading.Event()
+        self.deadline: Optional[float] = time.monotonic() + deadline_s if deadline_s else None
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        self.reason = reason
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (``None`` when unbounded)."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise GenerationCancelled(self.reason or "cancelled")
+        if self.expired:
+            raise DeadlineExceeded("request deadline exceeded")
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to ``timeout`` (clipped to the deadline); True if cancelled."""
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = min(timeout, remaining)
+        return self._event.wait(max(0.0, timeout))
+
+
+__all__ = ["CancelToken"]
@@ -8,4 +8,37 @@ class ProfileNotConfiguredError(RagError):
     """Raised when USER_PROFILE is missing."""
 
 
-__all__ = ["RagError", "ProfileNotConfiguredError"]
+class JobNotFoundError(RagError):
+    """Raised when a background job id is unknown to the job queue."""
+
+
+class LLMError(RagError):
+    """Raised when an LLM call fails after all retries."""
+
+
+class LLMTimeoutError(LLMError):
+    """Raised when an LLM call exceeds its deadline."""
+
+
+class GenerationCancelled(RagError):
+    """Raised when a request's cancellation token is triggered."""
+
+
+class DeadlineExceeded(RagError):
+    """Raised when a request runs past its overall deadline."""
+
+
+class SnapshotError(RagError):
+    """Raised when an index snapshot is corrupt or incompatible."""
+
+
+__all__ = [
+    "RagError",
+    "ProfileNotConfiguredError",
+    "JobNotFoundError",
+    "LLMError",
+    "LLMTimeoutError",
+    "GenerationCancelled",
+    "DeadlineExceeded",
+    "SnapshotError",
+]
@@ -0,0 +1,44 @@
+"""Content fingerprints used for de-duplication."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def content_hash(text: str) -> str:
+    """Exact-content hash (whitespace at the edges ignored)."""
+    return hashlib.sha1(text.strip().encode("utf-8")).hexdigest()
+
+
+def normalized_hash(text: str) -> str:
+    """Hash that ignores case, punctuation and whitespace differences."""
+    words = _WORD_RE.findall(text.lower())
+    return hashlib.sha1(" ".join(words).encode("utf-8")).hexdigest()
+
+
+def simhash(text: str, bits: int = 64, shingle: int = 3) -> int:
+    """
+    Charikar SimHash over word shingles. Texts that share most of their
+    shingles end up a few bits apart; compare with :func:`hamming`.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) >= shingle:
+        features = [" ".join(words[i:i + shingle]) for i in range(len(words) - shingle + 1)]
+    else:
+        features = [" ".join(words)] if words else []
+    weights = [0] * bits
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=bits // 8).digest(), "big")
+        for i in range(bits):
+            weights[i] += 1 if (h >> i) & 1 else -1
+    return sum(1 << i for i, w in enumerate(weights) if w > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+__all__ = ["content_hash", "normalized_hash", "simhash", "hamming"]
@@ -0,0 +1,224 @@
+"""
+profiling.py
+Opt-in CPU and memory profiling of pipeline runs.
+
+With ``RAG_PROFILE=1`` (or ``profiling.enabled`` in settings.yaml), functions
+decorated with :func:`profiled` run under ``cProfile`` and ``tracemalloc``.
+Each run writes two artifacts to ``PROFILE_DIR``:
+
+- ``<ts>_<name>_<id>.prof``: raw ``pstats`` data (open with snakeviz etc.);
+- ``<ts>_<name>_<id>.json``: wall vs CPU time, time spent waiting on the
+  LLM, peak traced memory, and the top functions and allocation sites.
+
+Wall time far above CPU time means the run was waiting (Ollama, disk); the
+``llm_wait_s`` field says how much of that was the LLM.
+
+    python -m rag.utils.profiling [--name generate_application_package] [--sort tottime] [--top 25]
+
+summarizes the hotspots across all runs. Only one profile is recorded at a
+time: nested decorated calls are covered by the outer profile, and calls on
+other threads while a profile is active run unprofiled.
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import functools
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from rag.config.settings import (
+    PROFILE_DIR,
+    PROFILE_TOP_N,
+    PROFILE_TRACEMALLOC_FRAMES,
+    PROFILING_ENABLED,
+)
+from rag.utils.helpers import ensure_dir
+from rag.utils.logging import logger
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# (file suffix, function) pairs whose cumulative time counts as waiting on the LLM.
+LLM_WAIT_FUNCTIONS = {("ollama_client.py", "run")}
+
+_active = threading.Lock()
+_state = threading.local()
+enabled = PROFILING_ENABLED
+
+
+def _function_rows(stats: pstats.Stats, sort: str, top: int) -> List[Dict[str, Any]]:
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+        rows.append(
+            {
+                "function": f"{Path(filename).name}:{line}({func})",
+                "ncalls": nc,
+                "tottime_s": round(tt, 4),
+                "cumtime_s": round(ct, 4),
+            }
+        )
+    key = "tottime_s" if sort == "tottime" else "cumtime_s"
+    rows.sort(key=lambda r: r[key], reverse=True)
+    return rows[:top]
+
+
+def _llm_wait(stats: pstats.Stats) -> float:
+    return sum(
+        ct
+        for (filename, _, func), (_, _, _, ct, _) in stats.stats.items()
+        if any(filename.endswith(suffix) and func == name for suffix, name in LLM_WAIT_FUNCTIONS)
+    )
+
+
+_OWN_FRAMES = (
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, pstats.__file__),
+)
+
+
+def _allocation_rows(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, top: int) -> List[Dict[str, Any]]:
+    """Allocation sites that grew during the run (memory still held at the end)."""
+    rows = []
+    before, after = before.filter_traces(_OWN_FRAMES), after.filter_traces(_OWN_FRAMES)
+    for diff in after.compare_to(before, "lineno")[:top]:
+        frame = diff.traceback[0]
+        rows.append(
+            {
+                "site": f"{Path(frame.filename).name}:{frame.lineno}",
+                "size_kb": round(diff.size / 1024, 1),
+                "size_diff_kb": round(diff.size_diff / 1024, 1),
+                "count_diff": diff.count_diff,
+            }
+        )
+    return rows
+
+
+def _write_artifacts(name: str, profile: cProfile.Profile, report: Dict[str, Any]) -> Path:
+    ensure_dir(PROFILE_DIR)
+    stem = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{name}_{uuid.uuid4().hex[:6]}"
+    profile.dump_stats(str(PROFILE_DIR / f"{stem}.prof"))
+    path = PROFILE_DIR / f"{stem}.json"
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return path
+
+
+def run_profiled(name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Call ``fn`` under cProfile + tracemalloc and write the run's artifacts."""
+    if getattr(_state, "depth", 0) or not _active.acquire(blocking=False):
+        return fn(*args, **kwargs)
+    _state.depth = 1
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    profile = cProfile.Profile()
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    error: Optional[BaseException] = None
+    try:
+        profile.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+        try:
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            stats = pstats.Stats(profile, stream=io.StringIO())
+            report = {
+                "name": name,
+                "started_at": time.time() - wall,
+                "wall_s": round(wall, 3),
+                "cpu_s": round(cpu, 3),
+                "llm_wait_s": round(_llm_wait(stats), 3),
+                "peak_traced_mb": round(peak / 1e6, 2),
+                "error": f"{type(error).__name__}: {error}" if error else None,
+                "top_cumulative": _function_rows(stats, "cumulative", PROFILE_TOP_N),
+                "top_tottime": _function_rows(stats, "tottime", PROFILE_TOP_N),
+                "top_allocations": _allocation_rows(before, after, PROFILE_TOP_N),
+            }
+            path = _write_artifacts(name, profile, report)
+            logger.info(
+                "Profiled %s: wall %.2fs, cpu %.2fs, llm %.2fs, peak %.1fMB -> %s",
+                name,
+                wall,
+                cpu,
+                report["llm_wait_s"],
+                report["peak_traced_mb"],
+                path,
+            )
+        except Exception:
+            logger.exception("Writing profile for %s failed", name)
+        finally:
+            _state.depth = 0
+            _active.release()
+
+
+def profiled(fn: F) -> F:
+    """Profile calls to ``fn`` when profiling is enabled; a plain call otherwise."""
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not enabled:
+            return fn(*args, **kwargs)
+        return run_profiled(fn.__name__, fn, *args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def summarize(
+    folder: Path = PROFILE_DIR,
+    name: Optional[str] = None,
+    sort: str = "tottime",
+    top: int = 25,
+) -> str:
+    """Per-run table plus the hotspots aggregated over every matching ``.prof``."""
+    reports = sorted(folder.glob(f"*_{name}_*.json" if name else "*.json"))
+    if not reports:
+        return f"No profiles in {folder}"
+    out = io.StringIO()
+    out.write(f"{'run':<58} {'wall_s':>8} {'cpu_s':>8} {'llm_s':>8} {'peak_mb':>8}\n")
+    for path in reports:
+        r = json.loads(path.read_text(encoding="utf-8"))
+        out.write(f"{path.stem:<58} {r['wall_s']:>8.2f} {r['cpu_s']:>8.2f} {r['llm_wait_s']:>8.2f} {r['peak_traced_mb']:>8.1f}\n")
+    profiles = [str(p.with_suffix(".prof")) for p in reports if p.with_suffix(".prof").exists()]
+    if profiles:
+        out.write(f"\nTop {top} functions by {sort} across {len(profiles)} run(s):\n")
+        stats = pstats.Stats(*profiles, stream=out)
+        stats.strip_dirs().sort_stats(sort).print_stats(top)
+    return out.getvalue()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Summarize profiles written with RAG_PROFILE=1.")
+    ap.add_argument("--dir", type=Path, default=PROFILE_DIR)
+    ap.add_argument("--name", default=None, help="Only runs of this function, e.g. index_profile_docs.")
+    ap.add_argument("--sort", default="tottime", choices=["tottime", "cumulative", "ncalls"])
+    ap.add_argument("--top", type=int, default=25)
+    args = ap.parse_args()
+    print(summarize(args.dir, args.name, args.sort, args.top))
+
+
+__all__ = ["profiled", "run_profiled", "summarize"]
+
+
+if __name__ == "__main__":
+    main()
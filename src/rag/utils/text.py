@@ -29,6 +29,11 @@ def normalize_text(text: str) -> str:
     return re.sub(r"\s+", " ", text).strip()
 
 
+def skill_key(skill: str) -> str:
+    """Case- and whitespace-insensitive key for exact skill matching."""
+    return " ".join(skill.lower().split())
+
+
 def simple_tokenize(text: str):
     """Simple, dependency-free tokenizer."""
     return re.findall(r"[A-Za-z0-9\-\+&/]+", text)
@@ -82,6 +87,16 @@ def fuzzy_match_candidates(candidates, lexicon, cutoff: int = 86):
     return sorted(found)
 
 
+# English prose averages ~1.3 Llama tokens per word; markdown bullets and
+# headings push that up a little.
+TOKENS_PER_WORD = 1.4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count, used for prompt budgets and savings reports."""
+    return round(len(text.split()) * TOKENS_PER_WORD)
+
+
 def bullet_list(items):
     return "\n".join(f"- {x}" for x in items)
 
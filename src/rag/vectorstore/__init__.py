@@ -1,3 +1,21 @@
-from rag.vectorstore.chroma_instance import get_vectordb
+from rag.vectorstore.base import VectorStore, collection_name
+from rag.vectorstore.factory import get_vector_store, forget_vector_store
 
-__all__ = ["get_vectordb"]
+
+def __getattr__(name: str):
+    # Chroma helpers are resolved lazily so the numpy backend never imports chromadb.
+    if name in {"get_vectordb", "get_chroma_client"}:
+        from rag.vectorstore import chroma_instance
+
+        return getattr(chroma_instance, name)
+    raise AttributeError(name)
+
+
+__all__ = [
+    "VectorStore",
+    "collection_name",
+    "get_vector_store",
+    "forget_vector_store",
+    "get_vectordb",
+    "get_chroma_client",
+]
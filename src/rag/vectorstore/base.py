@@ -0,0 +1,140 @@
+"""
+base.py
+Backend-neutral vector store interface used by ingestion and retrieval.
+
+Filters use the Chroma ``where`` dialect so callers do not care which backend
+is configured: ``{"doc_type": "jd"}``, ``{"field": {"$in": [...]}}``,
+``{"$and": [...]}`` / ``{"$or": [...]}`` and the comparison operators
+``$eq $ne $gt $gte $lt $lte $in $nin``.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from rag.config.settings import COLLECTION_PREFIX, DEFAULT_TENANT
+
+Where = Dict[str, Any]
+
+_OPS = {
+    "$eq": lambda a, b: a == b,
+    "$ne": lambda a, b: a != b,
+    "$gt": lambda a, b: a is not None and a > b,
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$lt": lambda a, b: a is not None and a < b,
+    "$lte": lambda a, b: a is not None and a <= b,
+    "$in": lambda a, b: a in b,
+    "$nin": lambda a, b: a not in b,
+}
+
+
+def collection_name(tenant: Optional[str] = None) -> str:
+    """Valid Chroma collection name (3-63 chars, alnum edges) for a tenant."""
+    slug = re.sub(r"[^a-z0-9]+", "-", (tenant or DEFAULT_TENANT).lower()).strip("-") or DEFAULT_TENANT
+    return f"{COLLECTION_PREFIX}_{slug}"[:63].rstrip("-_")
+
+
+def match_where(metadata: Dict[str, Any], where: Optional[Where]) -> bool:
+    """Evaluate a Chroma-style ``where`` filter against one metadata dict."""
+    if not where:
+        return True
+    for key, cond in where.items():
+        if key == "$and":
+            if not all(match_where(metadata, c) for c in cond):
+                return False
+        elif key == "$or":
+            if not any(match_where(metadata, c) for c in cond):
+                return False
+        elif isinstance(cond, dict):
+            value = metadata.get(key)
+            for op, operand in cond.items():
+                if not _OPS[op](value, operand):
+                    return False
+        elif metadata.get(key) != cond:
+            return False
+    return True
+
+
+def group_filters(filters: Sequence[Optional[Where]]) -> List[Tuple[Optional[Where], List[int]]]:
+    """Query positions grouped by identical ``where`` filter, in first-seen order."""
+    groups: Dict[str, Tuple[Optional[Where], List[int]]] = {}
+    for i, where in enumerate(filters):
+        key = json.dumps(where or None, sort_keys=True, default=str)
+        groups.setdefault(key, (where or None, []))[1].append(i)
+    return list(groups.values())
+
+
+class VectorStore(ABC):
+    """Minimal vector store contract shared by all backends."""
+
+    name: str
+
+    @property
+    @abstractmethod
+    def embeddings(self):
+        """Embedding function used for text queries."""
+
+    @abstractmethod
+    def add_documents(self, docs: Sequence[Document]) -> List[str]:
+        """Embed and store documents; returns their ids."""
+
+    @abstractmethod
+    def add_embeddings(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+    ) -> None:
+        """Bulk-load pre-computed vectors (no embedding pass)."""
+
+    @abstractmethod
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[Where] = None) -> List[Document]:
+        """Top-k documents for a text query."""
+
+    @abstractmethod
+    def similarity_search_by_vector(
+        self, embedding: Sequence[float], k: int = 4, filter: Optional[Where] = None
+    ) -> List[Document]:
+        """Top-k documents for a query vector."""
+
+    def similarity_search_by_vectors(
+        self,
+        embeddings: Sequence[Sequence[float]],
+        k: int = 4,
+        filters: Optional[Sequence[Optional[Where]]] = None,
+    ) -> List[List[Document]]:
+        """
+        Top-k documents for each query vector, in query order. ``filters``
+        holds one ``where`` per query. Backends override this to search the
+        whole batch at once; the fallback searches one vector at a time.
+        """
+        filters = list(filters) if filters is not None else [None] * len(embeddings)
+        return [self.similarity_search_by_vector(e, k=k, filter=f) for e, f in zip(embeddings, filters)]
+
+    @abstractmethod
+    def get(self, where: Optional[Where] = None, include_embeddings: bool = False) -> Dict[str, list]:
+        """All records (optionally filtered) as ``ids/documents/metadatas[/embeddings]`` lists."""
+
+    @abstractmethod
+    def delete(self, ids: Optional[Sequence[str]] = None, where: Optional[Where] = None) -> None:
+        """Remove records by id and/or filter."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored chunks."""
+
+    def compact(self) -> None:
+        """Reclaim space left by deletions (no-op where not needed)."""
+
+    def storage_bytes(self) -> int:
+        """Approximate on-disk footprint."""
+        return 0
+
+
+__all__ = ["VectorStore", "Where", "collection_name", "group_filters", "match_where"]
@@ -1,40 +1,246 @@
 """
 chroma_instance.py
 Chroma persistence and access helpers.
+
+Each tenant (candidate profile) gets its own collection, created on demand
+with the HNSW parameters from ``settings.yaml``, so searches only walk that
+tenant's graph. Chroma keeps the parameters a collection was created with;
+opening one whose parameters differ from the settings logs a warning, and
+maintenance compaction rebuilds it with the configured ones.
+
+``vectorstore.chroma.mode`` picks the client: ``embedded`` (default) opens
+the persistent store in-process; ``http`` connects to a shared Chroma server
+through one pooled HTTP session per process, so several app processes do not
+each load the index or contend for the SQLite file.
+
+    python -m rag.vectorstore.chroma_instance
+
+checks the configured client end to end (heartbeat, then a throwaway
+collection round trip).
 """
 
 from __future__ import annotations
 
 import os
-from typing import Optional
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
 
+import chromadb
 from chromadb.config import Settings
 from langchain_chroma import Chroma
 
-from rag.config.settings import CHROMA_DB_DIR
-from rag.models.embedding_model.factory import EMBEDDINGS
+from rag.config.settings import (
+    CHROMA_DB_DIR,
+    CHROMA_HEADERS,
+    CHROMA_HOST,
+    CHROMA_HTTP_POOL_SIZE,
+    CHROMA_MODE,
+    CHROMA_PORT,
+    CHROMA_SSL,
+    HNSW_SPACE,
+    HNSW_M,
+    HNSW_EF_CONSTRUCTION,
+    HNSW_EF_SEARCH,
+)
+from rag.models.embedding_model.factory import get_embeddings
+from rag.resources import REGISTRY
+from rag.utils.logging import logger
+from rag.vectorstore.base import collection_name
 
 # Ensure telemetry is disabled everywhere before Chroma spins up.
 os.environ.setdefault("ANONYMIZED_TELEMETRY", "false")
 os.environ.setdefault("CHROMA_TELEMETRY", "false")
 
-_vectordb: Optional[Chroma] = None
-
 CHROMA_SETTINGS = Settings(
     anonymized_telemetry=False,
 )
 
+_stores: Dict[str, Chroma] = {}
+_stores_lock = threading.Lock()
+
+
+def hnsw_metadata(
+    space: str = HNSW_SPACE,
+    m: int = HNSW_M,
+    ef_construction: int = HNSW_EF_CONSTRUCTION,
+    ef_search: int = HNSW_EF_SEARCH,
+) -> Dict[str, Any]:
+    """Collection metadata understood by Chroma's HNSW segment."""
+    return {
+        "hnsw:space": space,
+        "hnsw:M": m,
+        "hnsw:construction_ef": ef_construction,
+        "hnsw:search_ef": ef_search,
+    }
+
 
-def get_vectordb() -> Chroma:
-    """Return a Chroma vector store instance (singleton)."""
-    global _vectordb
-    if _vectordb is None:
-        _vectordb = Chroma(
-            embedding_function=EMBEDDINGS,
-            persist_directory=str(CHROMA_DB_DIR),
-            client_settings=CHROMA_SETTINGS,
+def hnsw_drift(metadata: Optional[Dict[str, Any]], configured: Optional[Dict[str, Any]] = None) -> Dict[str, Tuple[Any, Any]]:
+    """HNSW keys whose stored value differs from the configured one: ``key -> (stored, configured)``."""
+    configured = configured or hnsw_metadata()
+    stored = metadata or {}
+    return {key: (stored.get(key), value) for key, value in configured.items() if stored.get(key) != value}
+
+
+def warn_on_hnsw_drift(name: str, metadata: Optional[Dict[str, Any]]) -> Dict[str, Tuple[Any, Any]]:
+    """
+    Log when an existing collection was built with other HNSW parameters:
+    Chroma keeps a collection's original metadata, so edited settings only
+    apply once the maintenance command rebuilds it.
+    """
+    drift = hnsw_drift(metadata)
+    if drift:
+        logger.warning(
+            "Chroma collection %s uses %s; settings.yaml has %s. Run `python -m rag.vectorstore.maintenance` "
+            "(with compaction) while the app is stopped to rebuild it with the configured HNSW parameters.",
+            name,
+            ", ".join(f"{k}={stored}" for k, (stored, _) in drift.items()),
+            ", ".join(f"{k}={wanted}" for k, (_, wanted) in drift.items()),
         )
-    return _vectordb
+    return drift
+
+
+def open_store(client, name: str, embedding_function) -> Chroma:
+    """
+    Wrap collection ``name`` in a langchain store, creating it with the
+    configured HNSW parameters. An existing collection is opened as is (after
+    the drift check): passing metadata to Chroma's get-or-create would
+    overwrite the stored parameters without rebuilding the index.
+    """
+    try:
+        existing = client.get_collection(name)
+    except Exception:
+        # Missing collection: ValueError embedded, a bare Exception over HTTP.
+        existing = None
+    if existing is not None:
+        warn_on_hnsw_drift(name, existing.metadata)
+    return Chroma(
+        client=client,
+        collection_name=name,
+        embedding_function=embedding_function,
+        collection_metadata=None if existing is not None else hnsw_metadata(),
+    )
+
+
+CHROMA_MODES = ("embedded", "http")
+
+
+def _pool_http_session(client, pool_size: int) -> None:
+    """Size the keep-alive connection pool of the HTTP client's session."""
+    from requests.adapters import HTTPAdapter
+
+    session = getattr(getattr(client, "_server", None), "_session", None)
+    if session is None or not hasattr(session, "mount"):
+        logger.warning("Chroma HTTP client exposes no session; using its default connection pool")
+        return
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+
+def build_http_client(
+    host: str = CHROMA_HOST,
+    port: int = CHROMA_PORT,
+    ssl: bool = CHROMA_SSL,
+    headers: Optional[Dict[str, str]] = None,
+    pool_size: int = CHROMA_HTTP_POOL_SIZE,
+):
+    """Client for a shared Chroma server, with a pooled HTTP session."""
+    client = chromadb.HttpClient(
+        host=host,
+        port=port,
+        ssl=ssl,
+        # Request bodies are JSON but sent untyped; recent FastAPI servers
+        # reject them without the header.
+        headers={"Content-Type": "application/json", **(CHROMA_HEADERS if headers is None else headers)},
+        # HttpClient writes the server address into the settings it is given.
+        settings=CHROMA_SETTINGS.copy(),
+    )
+    _pool_http_session(client, pool_size)
+    return client
+
+
+def build_chroma_client(mode: str = CHROMA_MODE):
+    """Open the Chroma client shared by every tenant collection (see module docstring)."""
+    if mode == "embedded":
+        return chromadb.PersistentClient(path=str(CHROMA_DB_DIR), settings=CHROMA_SETTINGS)
+    if mode == "http":
+        return build_http_client()
+    raise ValueError(f"Unknown Chroma mode {mode!r}; expected one of {CHROMA_MODES}")
+
+
+def is_embedded(mode: str = CHROMA_MODE) -> bool:
+    """Whether this process owns the Chroma files (and may VACUUM / size them)."""
+    return mode == "embedded"
+
+
+def get_chroma_client():
+    return REGISTRY.get("chroma_client")
+
+
+def get_vectordb(tenant: Optional[str] = None) -> Chroma:
+    """Return the tenant's Chroma vector store, creating the collection on first use."""
+    name = collection_name(tenant)
+    store = _stores.get(name)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(name)
+            if store is None:
+                store = open_store(get_chroma_client(), name, get_embeddings())
+                _stores[name] = store
+    return store
+
+
+def forget_vectordb(tenant: Optional[str] = None) -> None:
+    """Drop the cached store so the next ``get_vectordb`` re-opens the collection."""
+    with _stores_lock:
+        _stores.pop(collection_name(tenant), None)
+
+
+def check_client(client=None) -> Dict[str, Any]:
+    """Heartbeat plus a write/query/delete round trip on a throwaway collection."""
+    client = client or build_chroma_client()
+    report: Dict[str, Any] = {"mode": CHROMA_MODE}
+    if CHROMA_MODE == "http":
+        report["endpoint"] = f"{'https' if CHROMA_SSL else 'http'}://{CHROMA_HOST}:{CHROMA_PORT}"
+    start = time.perf_counter()
+    client.heartbeat()
+    report["heartbeat_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+    name = f"check-{uuid.uuid4().hex[:12]}"
+    col = client.create_collection(name=name, metadata=hnsw_metadata())
+    try:
+        start = time.perf_counter()
+        col.add(ids=["a", "b"], embeddings=[[1.0, 0.0], [0.0, 1.0]], documents=["a", "b"], metadatas=[{"k": 1}, {"k": 2}])
+        hit = col.query(query_embeddings=[[0.9, 0.1]], n_results=1, where={"k": 1})
+        report["round_trip_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        if hit["ids"][0] != ["a"]:
+            raise RuntimeError(f"Unexpected query result from Chroma: {hit['ids']}")
+    finally:
+        client.delete_collection(name)
+    report["collections"] = len(client.list_collections())
+    return report
+
+
+__all__ = [
+    "CHROMA_MODES",
+    "CHROMA_SETTINGS",
+    "build_http_client",
+    "check_client",
+    "is_embedded",
+    "forget_vectordb",
+    "build_chroma_client",
+    "get_chroma_client",
+    "get_vectordb",
+    "collection_name",
+    "hnsw_metadata",
+    "hnsw_drift",
+    "open_store",
+    "warn_on_hnsw_drift",
+]
 
 
-__all__ = ["get_vectordb", "CHROMA_SETTINGS"]
+if __name__ == "__main__":
+    for key, value in check_client().items():
+        print(f"{key}: {value}")
@@ -0,0 +1,198 @@
+"""
+chroma_store.py
+:class:`VectorStore` adapter over a per-tenant Chroma collection.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from rag.config.settings import CHROMA_DB_DIR
+from rag.utils.helpers import dir_size
+from rag.utils.logging import logger
+from rag.vectorstore.base import VectorStore, Where, collection_name, group_filters
+from rag.vectorstore.chroma_instance import (
+    forget_vectordb,
+    get_chroma_client,
+    get_vectordb,
+    hnsw_metadata,
+    is_embedded,
+    open_store,
+)
+
+BATCH_SIZE = 1000
+
+
+def compact_collection(client, name: str) -> None:
+    """
+    Rebuild the collection from its live records to drop HNSW tombstones;
+    the new collection gets the configured HNSW parameters. The records are
+    copied into a scratch collection that is swapped in by renaming, so a
+    failure at any point leaves the original collection in place.
+    """
+    col = client.get_collection(name)
+    metadata = {**(col.metadata or {}), **hnsw_metadata()}
+    data = col.get(include=["embeddings", "documents", "metadatas"])
+    fresh = client.create_collection(name=f"compact-{uuid.uuid4().hex[:12]}", metadata=metadata)
+    try:
+        ids = data["ids"]
+        for i in range(0, len(ids), BATCH_SIZE):
+            fresh.add(
+                ids=ids[i:i + BATCH_SIZE],
+                embeddings=[list(e) for e in data["embeddings"][i:i + BATCH_SIZE]],
+                documents=data["documents"][i:i + BATCH_SIZE],
+                metadatas=data["metadatas"][i:i + BATCH_SIZE],
+            )
+    except BaseException:
+        client.delete_collection(fresh.name)
+        raise
+    backup = f"backup-{uuid.uuid4().hex[:12]}"
+    col.modify(name=backup)
+    try:
+        fresh.modify(name=name)
+    except BaseException:
+        col.modify(name=name)
+        client.delete_collection(fresh.name)
+        raise
+    client.delete_collection(backup)
+
+
+def vacuum_sqlite(db_dir: Path = CHROMA_DB_DIR) -> None:
+    db_path = db_dir / "chroma.sqlite3"
+    if not db_path.exists():
+        return
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    try:
+        conn.execute("VACUUM")
+    except sqlite3.OperationalError as exc:
+        logger.warning("Skipping VACUUM of %s: %s", db_path, exc)
+    finally:
+        conn.close()
+
+
+class ChromaStore(VectorStore):
+    """
+    Chroma-backed store. By default it shares the process-wide client and the
+    cached langchain store from ``chroma_instance``; pass ``client`` (and
+    ``embedding_function``) to wrap a different client, e.g. a throwaway one
+    in benchmarks.
+    """
+
+    name = "chroma"
+
+    def __init__(self, tenant: Optional[str] = None, client=None, embedding_function=None):
+        self.tenant = tenant
+        self.collection_name = collection_name(tenant)
+        self._client = client
+        self._embedding_function = embedding_function
+        self._own: Optional[Chroma] = None
+
+    @property
+    def client(self):
+        return self._client if self._client is not None else get_chroma_client()
+
+    @property
+    def vectordb(self) -> Chroma:
+        if self._client is None:
+            return get_vectordb(self.tenant)
+        if self._own is None:
+            self._own = open_store(self._client, self.collection_name, self._embedding_function)
+        return self._own
+
+    @property
+    def collection(self):
+        return self.vectordb._collection
+
+    @property
+    def embeddings(self):
+        return self.vectordb.embeddings
+
+    def add_documents(self, docs: Sequence[Document]) -> List[str]:
+        return self.vectordb.add_documents(list(docs))
+
+    def add_embeddings(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+    ) -> None:
+        ids = list(ids)
+        for i in range(0, len(ids), BATCH_SIZE):
+            self.collection.upsert(
+                ids=ids[i:i + BATCH_SIZE],
+                embeddings=[list(map(float, e)) for e in embeddings[i:i + BATCH_SIZE]],
+                documents=list(documents[i:i + BATCH_SIZE]),
+                metadatas=list(metadatas[i:i + BATCH_SIZE]),
+            )
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[Where] = None) -> List[Document]:
+        return self.vectordb.similarity_search(query, k=k, filter=filter or None)
+
+    def similarity_search_by_vector(
+        self, embedding: Sequence[float], k: int = 4, filter: Optional[Where] = None
+    ) -> List[Document]:
+        return self.vectordb.similarity_search_by_vector(list(map(float, embedding)), k=k, filter=filter or None)
+
+    def similarity_search_by_vectors(
+        self,
+        embeddings: Sequence[Sequence[float]],
+        k: int = 4,
+        filters: Optional[Sequence[Optional[Where]]] = None,
+    ) -> List[List[Document]]:
+        # Chroma takes many query vectors per call but a single ``where``, so
+        # queries sharing a filter go out together: one call per distinct filter.
+        filters = list(filters) if filters is not None else [None] * len(embeddings)
+        results: List[List[Document]] = [[] for _ in embeddings]
+        for where, positions in group_filters(filters):
+            found = self.collection.query(
+                query_embeddings=[list(map(float, embeddings[i])) for i in positions],
+                n_results=k,
+                where=where,
+                include=["documents", "metadatas"],
+            )
+            for row, i in enumerate(positions):
+                results[i] = [
+                    Document(id=doc_id, page_content=text or "", metadata=metadata or {})
+                    for doc_id, text, metadata in zip(
+                        found["ids"][row], found["documents"][row], found["metadatas"][row]
+                    )
+                ]
+        return results
+
+    def get(self, where: Optional[Where] = None, include_embeddings: bool = False) -> Dict[str, list]:
+        include = ["documents", "metadatas"] + (["embeddings"] if include_embeddings else [])
+        return self.collection.get(where=where or None, include=include)
+
+    def delete(self, ids: Optional[Sequence[str]] = None, where: Optional[Where] = None) -> None:
+        if ids is not None:
+            ids = list(ids)
+            for i in range(0, len(ids), BATCH_SIZE):
+                self.collection.delete(ids=ids[i:i + BATCH_SIZE])
+        if where:
+            self.collection.delete(where=where)
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def compact(self) -> None:
+        compact_collection(self.client, self.collection_name)
+        if self._client is None:
+            if is_embedded():
+                vacuum_sqlite()
+            forget_vectordb(self.tenant)
+        self._own = None
+
+    def storage_bytes(self) -> int:
+        # Every tenant shares one SQLite file, so this is the whole database.
+        # A Chroma server owns its files; they may not even be on this host.
+        return dir_size(CHROMA_DB_DIR) if is_embedded() else 0
+
+
+__all__ = ["ChromaStore", "compact_collection", "vacuum_sqlite"]
@@ -0,0 +1,321 @@
+"""
+numpy_store.py
+In-process vector store: exact top-k over a memory-mapped ``.npy`` matrix.
+
+Layout of one collection directory::
+
+    meta.json                      ids, documents, metadatas, dtype and the active vectors file
+    vectors-<gen>-<pid>-<rand>.npy L2-normalized float32/float16 rows, opened with mmap_mode="r"
+    .lock                          taken by writers
+
+Vectors are normalized on write, so a query is one matrix-vector product
+(cosine similarity) plus ``argpartition``. A write takes the collection's
+lock file, re-reads ``meta.json`` so changes from other processes are merged
+rather than lost, writes the matrix into a new uniquely named generation file
+and atomically swaps ``meta.json``; only files of older generations are then
+removed. Readers in other processes notice the swap on their next call.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+
+from rag.config.settings import NUMPY_STORE_DTYPE
+from rag.utils.helpers import dir_size, ensure_dir, file_lock
+from rag.vectorstore.base import VectorStore, Where, group_filters, match_where
+
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+FORMAT_VERSION = 1
+_VECTORS_FILE = re.compile(r"vectors-(\d+)(?:-.*)?\.npy$")
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class NumpyStore(VectorStore):
+    """Exact-search store for small/medium corpora (up to tens of thousands of chunks)."""
+
+    name = "numpy"
+
+    def __init__(self, path: Path, embedding_function=None, dtype: str = NUMPY_STORE_DTYPE):
+        self.path = Path(path)
+        self.dtype = np.dtype(dtype)
+        self._embedding_function = embedding_function
+        self._lock = threading.RLock()
+        self._vectors: Optional[np.ndarray] = None
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._row: Dict[str, int] = {}
+        self._masks: Dict[str, np.ndarray] = {}
+        self._generation = 0
+        self._stamp: Optional[tuple] = None
+        self._refresh()
+
+    # ------------------------------------------------------------------
+    # persistence
+    # ------------------------------------------------------------------
+    @property
+    def embeddings(self):
+        if self._embedding_function is None:
+            from rag.models.embedding_model.factory import get_embeddings
+
+            self._embedding_function = get_embeddings()
+        return self._embedding_function
+
+    def _meta_stamp(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.path / META_FILE)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _refresh(self) -> None:
+        """(Re)load from disk if another writer swapped ``meta.json``."""
+        stamp = self._meta_stamp()
+        if stamp == self._stamp:
+            return
+        with self._lock:
+            stamp = self._meta_stamp()
+            if stamp == self._stamp:
+                return
+            if stamp is None:
+                self._set_state(None, [], [], [], 0)
+            else:
+                meta = json.loads((self.path / META_FILE).read_text(encoding="utf-8"))
+                vectors = None
+                if meta.get("vectors_file"):
+                    vectors = np.load(self.path / meta["vectors_file"], mmap_mode="r")
+                    self.dtype = vectors.dtype
+                self._set_state(vectors, meta["ids"], meta["documents"], meta["metadatas"], meta["generation"])
+            self._stamp = stamp
+
+    def _set_state(self, vectors, ids, documents, metadatas, generation) -> None:
+        self._vectors = vectors
+        self._ids = list(ids)
+        self._documents = list(documents)
+        self._metadatas = list(metadatas)
+        self._row = {cid: i for i, cid in enumerate(self._ids)}
+        self._masks = {}
+        self._generation = generation
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """
+        Exclusive write access across threads and processes, with the state
+        re-read from ``meta.json`` so the write builds on the latest version.
+        """
+        ensure_dir(self.path)
+        with self._lock, file_lock(self.path / LOCK_FILE):
+            self._stamp = None
+            self._refresh()
+            yield
+
+    def _write(self, vectors: Optional[np.ndarray], ids, documents, metadatas) -> None:
+        """Swap in a new generation; call while holding :meth:`_writing`."""
+        generation = self._generation + 1
+        unique = f"{generation}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        vectors_file = None
+        if vectors is not None and len(vectors):
+            vectors_file = f"vectors-{unique}.npy"
+            np.save(self.path / vectors_file, np.ascontiguousarray(vectors, dtype=self.dtype))
+        meta = {
+            "version": FORMAT_VERSION,
+            "generation": generation,
+            "dtype": self.dtype.name,
+            "dim": int(vectors.shape[1]) if vectors_file else None,
+            "vectors_file": vectors_file,
+            "ids": list(ids),
+            "documents": list(documents),
+            "metadatas": list(metadatas),
+        }
+        tmp = self.path / f"{META_FILE}.{unique}.tmp"
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, self.path / META_FILE)
+        for old in self.path.glob("vectors-*.npy"):
+            match = _VECTORS_FILE.match(old.name)
+            if match and int(match.group(1)) < generation:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass
+        self._stamp = None
+        self._refresh()
+
+    # ------------------------------------------------------------------
+    # search
+    # ------------------------------------------------------------------
+    def _mask(self, where: Optional[Where]) -> Optional[np.ndarray]:
+        if not where:
+            return None
+        key = json.dumps(where, sort_keys=True, default=str)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = np.fromiter((match_where(m, where) for m in self._metadatas), dtype=bool, count=len(self._metadatas))
+            self._masks[key] = mask
+        return mask
+
+    def search_by_vectors(
+        self, embeddings: Sequence[Sequence[float]], k: int = 4, filter: Optional[Where] = None
+    ) -> List[List[tuple]]:
+        """Top-k ``(Document, cosine similarity)`` lists for a batch of query vectors."""
+        self._refresh()
+        with self._lock:
+            vectors, documents, metadatas, ids = self._vectors, self._documents, self._metadatas, self._ids
+            mask = self._mask(filter)
+        queries = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        if vectors is None or k <= 0:
+            return [[] for _ in queries]
+
+        rows = None
+        if mask is not None:
+            rows = np.flatnonzero(mask)
+            if not len(rows):
+                return [[] for _ in queries]
+            candidates = np.asarray(vectors[rows], dtype=np.float32)
+        else:
+            candidates = vectors
+        scores = queries @ np.asarray(candidates, dtype=np.float32).T
+
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for qi in range(len(queries)):
+            order = top[qi][np.argsort(-scores[qi, top[qi]])]
+            hits = []
+            for j in order:
+                i = int(rows[j]) if rows is not None else int(j)
+                doc = Document(id=ids[i], page_content=documents[i], metadata=dict(metadatas[i]))
+                hits.append((doc, float(scores[qi, j])))
+            results.append(hits)
+        return results
+
+    def similarity_search_by_vector(
+        self, embedding: Sequence[float], k: int = 4, filter: Optional[Where] = None
+    ) -> List[Document]:
+        return [doc for doc, _ in self.search_by_vectors([embedding], k=k, filter=filter)[0]]
+
+    def similarity_search_by_vectors(
+        self,
+        embeddings: Sequence[Sequence[float]],
+        k: int = 4,
+        filters: Optional[Sequence[Optional[Where]]] = None,
+    ) -> List[List[Document]]:
+        # One matrix product per distinct filter.
+        filters = list(filters) if filters is not None else [None] * len(embeddings)
+        results: List[List[Document]] = [[] for _ in embeddings]
+        for where, positions in group_filters(filters):
+            hits = self.search_by_vectors([embeddings[i] for i in positions], k=k, filter=where)
+            for i, pairs in zip(positions, hits):
+                results[i] = [doc for doc, _ in pairs]
+        return results
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[Where] = None) -> List[Document]:
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k=k, filter=filter)
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[Where] = None) -> List[tuple]:
+        return self.search_by_vectors([self.embeddings.embed_query(query)], k=k, filter=filter)[0]
+
+    # ------------------------------------------------------------------
+    # writes
+    # ------------------------------------------------------------------
+    def add_documents(self, docs: Sequence[Document]) -> List[str]:
+        docs = list(docs)
+        if not docs:
+            return []
+        ids = [getattr(d, "id", None) or str(uuid.uuid4()) for d in docs]
+        embeddings = self.embeddings.embed_documents([d.page_content for d in docs])
+        self.add_embeddings(ids, embeddings, [d.page_content for d in docs], [dict(d.metadata) for d in docs])
+        return ids
+
+    def add_embeddings(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+    ) -> None:
+        """Insert rows; existing ids are overwritten."""
+        if not len(ids):
+            return
+        new = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        with self._writing():
+            if self._vectors is not None and self._vectors.shape[1] != new.shape[1]:
+                raise ValueError(f"Embedding dim {new.shape[1]} does not match store dim {self._vectors.shape[1]}")
+            replaced = {cid for cid in ids if cid in self._row}
+            keep = [i for i, cid in enumerate(self._ids) if cid not in replaced]
+            old = self._vectors[keep] if self._vectors is not None else np.empty((0, new.shape[1]), np.float32)
+            self._write(
+                np.concatenate([np.asarray(old, dtype=self.dtype), new.astype(self.dtype)]),
+                [self._ids[i] for i in keep] + list(ids),
+                [self._documents[i] for i in keep] + list(documents),
+                [self._metadatas[i] for i in keep] + [dict(m or {}) for m in metadatas],
+            )
+
+    def delete(self, ids: Optional[Sequence[str]] = None, where: Optional[Where] = None) -> None:
+        if ids is None and not where:
+            return
+        with self._writing():
+            drop = np.zeros(len(self._ids), dtype=bool)
+            for cid in ids or []:
+                row = self._row.get(cid)
+                if row is not None:
+                    drop[row] = True
+            if where:
+                drop |= self._mask(where)
+            if not drop.any():
+                return
+            keep = np.flatnonzero(~drop)
+            self._write(
+                np.asarray(self._vectors[keep]) if len(keep) else None,
+                [self._ids[i] for i in keep],
+                [self._documents[i] for i in keep],
+                [self._metadatas[i] for i in keep],
+            )
+
+    # ------------------------------------------------------------------
+    # introspection
+    # ------------------------------------------------------------------
+    def get(self, where: Optional[Where] = None, include_embeddings: bool = False) -> Dict[str, list]:
+        self._refresh()
+        with self._lock:
+            mask = self._mask(where)
+            rows = range(len(self._ids)) if mask is None else np.flatnonzero(mask)
+            out: Dict[str, list] = {
+                "ids": [self._ids[i] for i in rows],
+                "documents": [self._documents[i] for i in rows],
+                "metadatas": [dict(self._metadatas[i]) for i in rows],
+            }
+            if include_embeddings:
+                if self._vectors is None:
+                    out["embeddings"] = []
+                else:
+                    out["embeddings"] = np.asarray(self._vectors[list(rows)], dtype=np.float32)
+        return out
+
+    def count(self) -> int:
+        self._refresh()
+        return len(self._ids)
+
+    def storage_bytes(self) -> int:
+        return dir_size(self.path)
+
+
+__all__ = ["NumpyStore", "normalize_rows"]
@@ -0,0 +1,58 @@
+"""
+factory.py
+Pick the configured vector store backend for a tenant.
+
+``vectorstore.backend`` in ``settings.yaml`` (or ``VECTOR_BACKEND``) selects
+``chroma`` (default) or ``numpy``. Backends are imported lazily so the numpy
+path never pays for importing chromadb.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Optional
+
+from rag.config.settings import NUMPY_STORE_DIR, VECTOR_BACKEND
+from rag.vectorstore.base import VectorStore, collection_name
+
+BACKENDS = ("chroma", "numpy")
+
+_stores: Dict[tuple, VectorStore] = {}
+_stores_lock = threading.Lock()
+
+
+def build_vector_store(tenant: Optional[str] = None, backend: Optional[str] = None) -> VectorStore:
+    backend = (backend or VECTOR_BACKEND).lower()
+    if backend == "chroma":
+        from rag.vectorstore.clients.chroma_store import ChromaStore
+
+        return ChromaStore(tenant)
+    if backend == "numpy":
+        from rag.vectorstore.clients.numpy_store import NumpyStore
+
+        return NumpyStore(NUMPY_STORE_DIR / collection_name(tenant))
+    raise ValueError(f"Unknown vector store backend {backend!r}; expected one of {BACKENDS}")
+
+
+def get_vector_store(tenant: Optional[str] = None, backend: Optional[str] = None) -> VectorStore:
+    """Return the tenant's store for the configured backend (cached per process)."""
+    key = ((backend or VECTOR_BACKEND).lower(), collection_name(tenant))
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = build_vector_store(tenant, backend)
+                _stores[key] = store
+    return store
+
+
+def forget_vector_store(tenant: Optional[str] = None) -> None:
+    """Drop cached stores for a tenant so the next call re-opens them."""
+    name = collection_name(tenant)
+    with _stores_lock:
+        for key in [k for k in _stores if k[1] == name]:
+            _stores.pop(key, None)
+
+
+__all__ = ["BACKENDS", "build_vector_store", "get_vector_store", "forget_vector_store"]
@@ -0,0 +1,210 @@
+"""
+maintenance.py
+Index maintenance: de-duplicate chunks, purge orphans, expire old JD chunks
+and compact the tenant's vector store (Chroma or numpy backend).
+
+    python -m rag.vectorstore.maintenance                 # current profile's tenant
+    python -m rag.vectorstore.maintenance --all --dry-run
+    python -m rag.vectorstore.maintenance --tenant jane-doe --jd-max-age-days 3
+
+Chroma compaction recreates the collection (with the HNSW parameters from
+settings.yaml, so edited ``M`` / ``ef_construction`` take effect), so run it
+while the app is stopped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from rag.config.settings import COLLECTION_PREFIX, JD_MAX_AGE_DAYS, NUMPY_STORE_DIR, VECTOR_BACKEND
+from rag.utils.fingerprint import content_hash, normalized_hash
+from rag.vectorstore.base import VectorStore, collection_name
+from rag.vectorstore.factory import get_vector_store
+
+LATENCY_PROBES = 20
+
+
+@dataclass
+class MaintenanceReport:
+    collection: str
+    chunks_before: int = 0
+    chunks_after: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    orphans: int = 0
+    expired_jd: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    query_ms_before: Optional[float] = None
+    query_ms_after: Optional[float] = None
+    compacted: bool = False
+    dry_run: bool = False
+    removed_ids: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        def ms(v: Optional[float]) -> str:
+            return "n/a" if v is None else f"{v:.2f}ms"
+
+        return (
+            f"[{self.collection}] chunks {self.chunks_before} -> {self.chunks_after} "
+            f"(exact dup {self.exact_duplicates}, near dup {self.near_duplicates}, "
+            f"orphans {self.orphans}, expired JD {self.expired_jd})"
+            f"{' [dry run]' if self.dry_run else ''}\n"
+            f"  disk {self.bytes_before / 1e6:.2f}MB -> {self.bytes_after / 1e6:.2f}MB"
+            f"{' (compacted)' if self.compacted else ''}\n"
+            f"  query latency {ms(self.query_ms_before)} -> {ms(self.query_ms_after)}"
+        )
+
+
+def _query_latency_ms(store: VectorStore, probes: Sequence) -> Optional[float]:
+    """Mean query latency using stored vectors as probes (no embedding cost)."""
+    if len(probes) == 0 or store.count() == 0:
+        return None
+    start = time.perf_counter()
+    for emb in probes:
+        store.similarity_search_by_vector(emb, k=6)
+    return (time.perf_counter() - start) * 1000 / len(probes)
+
+
+def find_removals(
+    ids: List[str],
+    documents: List[str],
+    metadatas: List[Dict[str, Any]],
+    jd_max_age_days: float = JD_MAX_AGE_DAYS,
+    now: Optional[float] = None,
+) -> Dict[str, Set[str]]:
+    """
+    Classify chunk ids to drop. Within each duplicate group the most recently
+    indexed chunk is kept; JD chunks only count as duplicates within one JD
+    (``jd_hash``).
+    """
+    now = now or time.time()
+    cutoff = now - jd_max_age_days * 86400
+    removals: Dict[str, Set[str]] = {"orphans": set(), "expired_jd": set(), "exact": set(), "near": set()}
+
+    live = []
+    for cid, doc, meta in zip(ids, documents, metadatas):
+        meta = meta or {}
+        doc_type = meta.get("doc_type")
+        source = meta.get("source")
+        if doc_type == "jd":
+            # Chunks indexed before timestamps existed count as expired.
+            if float(meta.get("indexed_at") or 0) < cutoff:
+                removals["expired_jd"].add(cid)
+                continue
+        elif source and not Path(source).exists():
+            removals["orphans"].add(cid)
+            continue
+        live.append((cid, doc or "", meta))
+
+    live.sort(key=lambda r: float(r[2].get("indexed_at") or 0), reverse=True)
+    seen_exact: Set[tuple] = set()
+    seen_near: Set[tuple] = set()
+    for cid, doc, meta in live:
+        doc_type = meta.get("doc_type")
+        # Retrieval is scoped to one JD, so each JD revision keeps its own copy of shared chunks.
+        scope = (doc_type, meta.get("jd_hash") if doc_type == "jd" else None)
+        exact_key = (*scope, meta.get("content_hash") or content_hash(doc))
+        near_key = (*scope, normalized_hash(doc))
+        if exact_key in seen_exact:
+            removals["exact"].add(cid)
+        elif near_key in seen_near:
+            removals["near"].add(cid)
+        else:
+            seen_exact.add(exact_key)
+            seen_near.add(near_key)
+    return removals
+
+
+def maintain(
+    tenant: Optional[str] = None,
+    jd_max_age_days: float = JD_MAX_AGE_DAYS,
+    compact: bool = True,
+    dry_run: bool = False,
+) -> MaintenanceReport:
+    """Run every maintenance step on one tenant collection."""
+    store = get_vector_store(tenant)
+    report = MaintenanceReport(collection=collection_name(tenant), dry_run=dry_run, bytes_before=store.storage_bytes())
+    data = store.get(include_embeddings=True)
+    probes = list(data["embeddings"][:LATENCY_PROBES])
+    report.query_ms_before = _query_latency_ms(store, probes)
+
+    report.chunks_before = len(data["ids"])
+    removals = find_removals(data["ids"], data["documents"], data["metadatas"], jd_max_age_days)
+    report.orphans = len(removals["orphans"])
+    report.expired_jd = len(removals["expired_jd"])
+    report.exact_duplicates = len(removals["exact"])
+    report.near_duplicates = len(removals["near"])
+    report.removed_ids = sorted(set().union(*removals.values()))
+
+    if dry_run:
+        report.chunks_after = report.chunks_before - len(report.removed_ids)
+        report.bytes_after = report.bytes_before
+        report.query_ms_after = report.query_ms_before
+        return report
+
+    if report.removed_ids:
+        store.delete(ids=report.removed_ids)
+
+    if compact:
+        store.compact()
+        report.compacted = True
+
+    report.chunks_after = store.count()
+    report.bytes_after = store.storage_bytes()
+    report.query_ms_after = _query_latency_ms(store, probes)
+    return report
+
+
+def tenant_collections() -> List[str]:
+    """Tenants that currently have a collection."""
+    prefix = f"{COLLECTION_PREFIX}_"
+    if VECTOR_BACKEND == "numpy":
+        names = [p.name for p in NUMPY_STORE_DIR.glob("*") if p.is_dir()]
+    else:
+        from rag.vectorstore.chroma_instance import get_chroma_client
+
+        names = [c.name for c in get_chroma_client().list_collections()]
+    return [n[len(prefix):] for n in names if n.startswith(prefix)]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Dedup, purge, expire and compact the vector index.")
+    target = ap.add_mutually_exclusive_group()
+    target.add_argument("--tenant", default=None, help="Defaults to the current profile's tenant.")
+    target.add_argument("--all", action="store_true", help="Maintain every tenant collection.")
+    ap.add_argument("--jd-max-age-days", type=float, default=JD_MAX_AGE_DAYS)
+    ap.add_argument("--no-compact", action="store_true")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+
+    if args.all:
+        tenants = tenant_collections()
+    else:
+        from rag.profile import load_profile, profile_tenant
+
+        tenants = [args.tenant or profile_tenant(load_profile())]
+    for tenant in tenants:
+        report = maintain(
+            tenant,
+            jd_max_age_days=args.jd_max_age_days,
+            compact=not args.no_compact,
+            dry_run=args.dry_run,
+        )
+        print(report.summary())
+
+
+__all__ = [
+    "MaintenanceReport",
+    "find_removals",
+    "maintain",
+    "tenant_collections",
+]
+
+
+if __name__ == "__main__":
+    main()
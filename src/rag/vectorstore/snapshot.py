@@ -0,0 +1,269 @@
+"""
+snapshot.py
+Portable, single-file snapshots of a tenant's index.
+
+A new node can restore the index by bulk-loading vectors instead of
+re-parsing PDFs and re-embedding, and it works across backends (export from
+Chroma, import into numpy or vice versa).
+
+    python -m rag.vectorstore.snapshot export profile.ragsnap [--tenant jane-doe]
+    python -m rag.vectorstore.snapshot import profile.ragsnap [--tenant jane-doe] [--append]
+    python -m rag.vectorstore.snapshot info profile.ragsnap
+
+File layout (little-endian)::
+
+    b"RAGSNAP\\0"            magic
+    uint32                   header length
+    header                   UTF-8 JSON: format_version, embed_model, dim, count, ...
+    padding                  to a 64-byte boundary
+    vectors                  count x dim float16, row-major
+    text                     zlib-compressed JSON {ids, documents, metadatas, manifest}
+
+The header carries CRC32s of both sections and the embedding model name;
+importing into a node configured with a different model is refused.
+
+Profile chunk sources and the profile manifest entries (size, mtime, sha1,
+chunks) are stored relative to ``PROFILE_DOC_DIR`` and re-rooted on import,
+where the manifest is written under the manifest lock. The next profile sync
+on the new node then recognises the documents by content hash instead of
+re-embedding them, and maintenance does not take the chunks for orphans.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import struct
+import time
+import zlib
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from rag.config.settings import EMBED_MODEL, PROFILE_DOC_DIR
+from rag.ingestion.ingest import manifest_entries, manifest_lock, set_manifest_entries
+from rag.utils.exceptions import SnapshotError
+from rag.utils.logging import logger
+from rag.vectorstore.base import collection_name
+from rag.vectorstore.factory import get_vector_store
+
+MAGIC = b"RAGSNAP\0"
+FORMAT_VERSION = 2
+# Version 1 snapshots carry absolute sources and no manifest.
+READABLE_VERSIONS = (1, FORMAT_VERSION)
+ALIGN = 64
+VECTOR_DTYPE = np.dtype("<f2")
+
+
+@dataclass
+class SnapshotInfo:
+    path: str
+    format_version: int
+    embed_model: str
+    collection: str
+    count: int
+    dim: int
+    created_at: float
+    file_bytes: int
+    text_bytes: int
+    text_raw_bytes: int
+
+    def summary(self) -> str:
+        return (
+            f"{self.path}: {self.count} chunks x {self.dim}d ({self.embed_model}), "
+            f"from {self.collection}, {self.file_bytes / 1e6:.2f}MB "
+            f"(text {self.text_raw_bytes / 1e6:.2f}MB -> {self.text_bytes / 1e6:.2f}MB)"
+        )
+
+
+def _padding(offset: int) -> int:
+    return (-offset) % ALIGN
+
+
+def _relative_source(source: Optional[str], root: Path) -> Optional[str]:
+    """``source`` relative to ``root`` (POSIX separators), or ``None`` if outside it."""
+    if not source:
+        return None
+    try:
+        return Path(source).resolve().relative_to(root.resolve()).as_posix()
+    except ValueError:
+        return None
+
+
+def export_snapshot(path: Path, tenant: Optional[str] = None, docs_root: Optional[Path] = None) -> SnapshotInfo:
+    """Write the tenant's chunks, metadata, vectors and profile manifest to ``path``."""
+    root = Path(docs_root or PROFILE_DOC_DIR)
+    data = get_vector_store(tenant).get(include_embeddings=True)
+    ids = list(data["ids"])
+    vectors = np.asarray(data["embeddings"], dtype=np.float32)
+    if not ids:
+        raise SnapshotError(f"Nothing to export: {collection_name(tenant)} is empty")
+    metadatas = []
+    for meta in data["metadatas"]:
+        meta = dict(meta or {})
+        if meta.get("doc_type") == "profile":
+            relative = _relative_source(meta.get("source"), root)
+            if relative is not None:
+                meta["source"] = relative
+        metadatas.append(meta)
+    manifest = {}
+    for source, entry in manifest_entries(tenant).items():
+        relative = _relative_source(source, root)
+        if relative is not None:
+            manifest[relative] = entry
+    vectors_blob = np.ascontiguousarray(vectors, dtype=VECTOR_DTYPE).tobytes()
+    text_raw = json.dumps(
+        {"ids": ids, "documents": list(data["documents"]), "metadatas": metadatas, "manifest": manifest},
+        ensure_ascii=False,
+    ).encode("utf-8")
+    text_blob = zlib.compress(text_raw, 6)
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "embed_model": EMBED_MODEL,
+        "collection": collection_name(tenant),
+        "count": len(ids),
+        "dim": int(vectors.shape[1]),
+        "vector_dtype": "float16",
+        "text_codec": "zlib",
+        "vectors_bytes": len(vectors_blob),
+        "vectors_crc32": zlib.crc32(vectors_blob),
+        "text_bytes": len(text_blob),
+        "text_raw_bytes": len(text_raw),
+        "text_crc32": zlib.crc32(text_blob),
+        "created_at": time.time(),
+    }
+    header_blob = json.dumps(header).encode("utf-8")
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as fh:
+        fh.write(MAGIC)
+        fh.write(struct.pack("<I", len(header_blob)))
+        fh.write(header_blob)
+        fh.write(b"\0" * _padding(len(MAGIC) + 4 + len(header_blob)))
+        fh.write(vectors_blob)
+        fh.write(text_blob)
+    tmp.replace(path)
+    return read_info(path)
+
+
+def _read_header(fh) -> tuple:
+    if fh.read(len(MAGIC)) != MAGIC:
+        raise SnapshotError("Not an index snapshot (bad magic)")
+    (length,) = struct.unpack("<I", fh.read(4))
+    try:
+        header = json.loads(fh.read(length).decode("utf-8"))
+    except ValueError as exc:
+        raise SnapshotError(f"Corrupt snapshot header: {exc}") from exc
+    if header.get("format_version") not in READABLE_VERSIONS:
+        raise SnapshotError(f"Unsupported snapshot format {header.get('format_version')} (expected {FORMAT_VERSION})")
+    offset = len(MAGIC) + 4 + length
+    return header, offset + _padding(offset)
+
+
+def read_info(path: Path) -> SnapshotInfo:
+    path = Path(path)
+    with path.open("rb") as fh:
+        header, _ = _read_header(fh)
+    return SnapshotInfo(
+        path=str(path),
+        format_version=header["format_version"],
+        embed_model=header["embed_model"],
+        collection=header["collection"],
+        count=header["count"],
+        dim=header["dim"],
+        created_at=header["created_at"],
+        file_bytes=path.stat().st_size,
+        text_bytes=header["text_bytes"],
+        text_raw_bytes=header["text_raw_bytes"],
+    )
+
+
+def import_snapshot(
+    path: Path, tenant: Optional[str] = None, replace: bool = True, docs_root: Optional[Path] = None
+) -> Dict[str, Any]:
+    """
+    Bulk-load a snapshot into the tenant's store without re-embedding.
+    With ``replace`` (default) chunks not in the snapshot are removed once
+    the snapshot's chunks are in, and the profile manifest is replaced;
+    otherwise both are merged.
+    """
+    path = Path(path)
+    root = Path(docs_root or PROFILE_DOC_DIR)
+    start = time.perf_counter()
+    with path.open("rb") as fh:
+        header, vectors_offset = _read_header(fh)
+        if header["embed_model"] != EMBED_MODEL:
+            raise SnapshotError(
+                f"Snapshot was built with embedding model {header['embed_model']!r}, "
+                f"this node uses {EMBED_MODEL!r}; re-ingest instead"
+            )
+        fh.seek(vectors_offset)
+        vectors_blob = fh.read(header["vectors_bytes"])
+        text_blob = fh.read(header["text_bytes"])
+    if zlib.crc32(vectors_blob) != header["vectors_crc32"] or zlib.crc32(text_blob) != header["text_crc32"]:
+        raise SnapshotError(f"Snapshot {path} is corrupt (checksum mismatch)")
+
+    vectors = np.frombuffer(vectors_blob, dtype=VECTOR_DTYPE).reshape(header["count"], header["dim"])
+    text = json.loads(zlib.decompress(text_blob).decode("utf-8"))
+    metadatas = []
+    for meta in text["metadatas"]:
+        meta = dict(meta or {})
+        source = meta.get("source")
+        if meta.get("doc_type") == "profile" and source and not Path(source).is_absolute():
+            meta["source"] = str(root / source)
+        metadatas.append(meta)
+    manifest = {str(root / relative): entry for relative, entry in text.get("manifest", {}).items()}
+
+    store = get_vector_store(tenant)
+    with manifest_lock():
+        stale = []
+        if replace:
+            incoming = set(text["ids"])
+            stale = [cid for cid in store.get()["ids"] if cid not in incoming]
+        store.add_embeddings(text["ids"], vectors.astype(np.float32), text["documents"], metadatas)
+        if stale:
+            store.delete(ids=stale)
+        set_manifest_entries(tenant, manifest if replace else {**manifest_entries(tenant), **manifest})
+    elapsed = time.perf_counter() - start
+    logger.info("Imported %d chunks from %s into %s in %.2fs", header["count"], path, collection_name(tenant), elapsed)
+    return {"imported": header["count"], "removed": len(stale), "seconds": elapsed, "collection": collection_name(tenant)}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Export / import portable index snapshots.")
+    sub = ap.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", help="Write the tenant's index to a snapshot file.")
+    exp.add_argument("path", type=Path)
+    exp.add_argument("--tenant", default=None)
+    imp = sub.add_parser("import", help="Bulk-load a snapshot into the tenant's index.")
+    imp.add_argument("path", type=Path)
+    imp.add_argument("--tenant", default=None)
+    imp.add_argument("--append", action="store_true", help="Keep existing chunks instead of replacing them.")
+    info = sub.add_parser("info", help="Print a snapshot's header.")
+    info.add_argument("path", type=Path)
+    args = ap.parse_args()
+
+    if args.command == "info":
+        print(json.dumps(asdict(read_info(args.path)), indent=2))
+        return
+    tenant = args.tenant
+    if tenant is None:
+        from rag.profile import load_profile, profile_tenant
+
+        tenant = profile_tenant(load_profile())
+    if args.command == "export":
+        print(export_snapshot(args.path, tenant).summary())
+    else:
+        r = import_snapshot(args.path, tenant, replace=not args.append)
+        print(f"Imported {r['imported']} chunks into {r['collection']} (removed {r['removed']}) in {r['seconds']:.2f}s")
+
+
+__all__ = ["SnapshotInfo", "export_snapshot", "import_snapshot", "read_info"]
+
+
+if __name__ == "__main__":
+    main()
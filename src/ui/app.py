@@ -1,11 +1,9 @@
 import sys
+import time
+import uuid
 from pathlib import Path
-from io import BytesIO
 
 import streamlit as st
-from docx import Document
-from fpdf import FPDF
-import unicodedata
 
 # ---------------------------------------------------------------------
 # Make sure we can import from src/
@@ -15,45 +13,19 @@ SRC_DIR = ROOT / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.append(str(SRC_DIR))
 
-from rag.config.settings import OUT_DIR  # optional, inspect saved files
-from rag.generation.generator import generate_application_package
+from rag.config.settings import OUT_DIR, REUSE_ENABLED  # optional, inspect saved files
+from rag.generation import speculative
+from rag.generation.reuse import preview_reuse
+from rag.jobs import JobQueue, WorkerPool, SUCCEEDED, FAILED, CANCELLED
 from rag.profile import load_profile, save_profile
+from rag.resources import warmup, health as resource_health
+from rag.utils.exceptions import JobNotFoundError
+from ui import exports
 
 
 # ---------------------------------------------------------------------
-# Helpers: build DOCX / PDF from text
+# Helpers
 # ---------------------------------------------------------------------
-def build_docx(text: str) -> bytes:
-    doc = Document()
-    for line in text.split("\n"):
-        doc.add_paragraph(line)
-    buf = BytesIO()
-    doc.save(buf)
-    buf.seek(0)
-    return buf.getvalue()
-
-def clean_text_for_pdf(text: str) -> str:
-    # Normalise unicode
-    text = unicodedata.normalize("NFKD", text)
-
-    # Replace common “fancy” characters
-    replacements = {
-        "–": "-",   # en dash
-        "—": "-",   # em dash
-        "•": "-",   # bullet
-        "“": '"',
-        "”": '"',
-        "’": "'",
-        "…": "...",
-    }
-    for bad, good in replacements.items():
-        text = text.replace(bad, good)
-
-    # Optional: drop anything still not representable in latin-1
-    text = text.encode("latin-1", "ignore").decode("latin-1")
-    return text
-
-
 def _lines_to_list(raw: str):
     return [line.strip() for line in raw.splitlines() if line.strip()]
 
@@ -62,35 +34,94 @@ def _list_to_lines(items):
     return "\n".join(items or [])
 
 
-def build_pdf(text: str) -> bytes:
-    text = clean_text_for_pdf(text)
+@st.fragment(run_every=0.5)
+def export_progress(kind: str, text: str, basename: str) -> None:
+    """Polls while a render is pending; a full rerun then swaps in the download button."""
+    if not exports.is_pending(kind, text):
+        st.rerun()
+    st.button(f"⏳ Preparing {kind.upper()}...", disabled=True, key=f"pending_{basename}_{kind}")
+
+
+@st.fragment
+def export_buttons(text: str, basename: str) -> None:
+    """Download buttons that render DOCX/PDF only when asked, off the script thread."""
+    col1, col2 = st.columns(2)
+    for col, kind, label, prepare_label in (
+        (col1, "docx", "💾 Download as DOCX", "💾 Prepare DOCX"),
+        (col2, "pdf", "📄 Download as PDF", "📄 Prepare PDF"),
+    ):
+        with col:
+            data = exports.get_cached(kind, text)
+            if data is not None:
+                st.download_button(
+                    label,
+                    data=data,
+                    file_name=f"{basename}.{kind}",
+                    mime=exports.MIME_TYPES[kind],
+                    key=f"download_{basename}_{kind}",
+                )
+            elif exports.is_pending(kind, text):
+                export_progress(kind, text, basename)
+            else:
+                error = exports.get_error(kind, text)
+                if error:
+                    st.error(f"Could not prepare the {kind.upper()}: {error}")
+                if st.button(prepare_label, key=f"prepare_{basename}_{kind}"):
+                    exports.request_export(kind, text)
+                    export_progress(kind, text, basename)
+
+
+@st.fragment(run_every=0.5)
+def speculation_progress(jd_text: str, profile: dict) -> None:
+    """Polls while the JD is prepared; a full rerun then shows the result (and its reuse preview)."""
+    if speculative.status(jd_text, profile) != speculative.RUNNING:
+        st.rerun()
+    st.caption("⏳ Analysing the JD in the background...")
+
+
+def speculation_status(jd_text: str, profile: dict) -> None:
+    """Whether the JD has been prepared in the background yet."""
+    state = speculative.status(jd_text, profile)
+    if state == speculative.READY:
+        st.caption("✅ JD analysed and indexed - Generate goes straight to writing.")
+    elif state == speculative.RUNNING:
+        speculation_progress(jd_text, profile)
 
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
 
-    # Safer: write line by line
-    for line in text.splitlines():
-        pdf.multi_cell(0, 8, line)
-        # Add a tiny gap between paragraphs
-        pdf.ln(0.5)
-
-    out = pdf.output(dest="S")  # can be str / bytes / bytearray depending on version
+# ---------------------------------------------------------------------
+# Shared resources: warmed once per server process, in the background
+# ---------------------------------------------------------------------
+@st.cache_resource
+def start_warmup():
+    return warmup(background=True)
 
-    # 🔒 Normalize to pure bytes
-    if isinstance(out, bytearray):
-        pdf_bytes = bytes(out)
-    elif isinstance(out, bytes):
-        pdf_bytes = out
-    else:
-        # probably str => encode to latin-1 as per fpdf docs
-        pdf_bytes = out.encode("latin-1")
 
-    # (Optional) sanity check in your console:
-    # print("PDF length:", len(pdf_bytes))
+# ---------------------------------------------------------------------
+# Background jobs: one queue + worker pool per server process
+# ---------------------------------------------------------------------
+@st.cache_resource
+def get_job_runtime():
+    queue = JobQueue()
+    pool = WorkerPool(queue).start()
+    return queue, pool
+
+
+def _load_job_result(job_id: str) -> None:
+    """Copy a finished job's result into the editable session state once."""
+    if st.session_state.get("loaded_job_id") == job_id:
+        return
+    result = job_queue.load_result(job_id)
+    if result is None:
+        return
+    st.session_state.result = result
+    st.session_state.skills_text = result["skills"]
+    st.session_state.cover_text = result["cover"]
+    st.session_state.emails_text = result["emails"]
+    st.session_state.ats_text = result["ats"]
+    st.session_state.top_choice_text = result.get("top_choice", "")
+    st.session_state.short_recruiter_email_text = result.get("short_recruiter_email", "")
+    st.session_state.loaded_job_id = job_id
 
-    return pdf_bytes
 
 # ---------------------------------------------------------------------
 # Streamlit app
@@ -111,6 +142,17 @@ if "jd_text" not in st.session_state:
 if "result" not in st.session_state:
     st.session_state.result = None
 
+# Identifies this session's background JD preparation (a new JD supersedes the old one).
+if "speculation_slot" not in st.session_state:
+    st.session_state.speculation_slot = uuid.uuid4().hex
+
+start_warmup()
+job_queue, worker_pool = get_job_runtime()
+
+# Job ids live in the URL so a page reload re-attaches to the running job.
+if "job_id" not in st.session_state:
+    st.session_state.job_id = st.query_params.get("job")
+
 if "profile_data" not in st.session_state:
     st.session_state.profile_data = load_profile()
 
@@ -142,6 +184,27 @@ jd_text = st.text_area(
 
 st.session_state.jd_text = jd_text
 
+# Start indexing/retrieval for this JD now (debounced) so Generate only waits on the LLM.
+if speculative.speculate(jd_text, st.session_state.profile_data, slot=st.session_state.speculation_slot):
+    speculation_status(jd_text, st.session_state.profile_data)
+
+# Near-duplicate of a JD we already generated for? Offer to reuse sections.
+reuse_sections = REUSE_ENABLED
+if REUSE_ENABLED and jd_text.strip() and st.session_state.profile_data:
+    prepared = speculative.peek(jd_text, st.session_state.profile_data)
+    match = preview_reuse(
+        jd_text, st.session_state.profile_data, extraction=prepared["extraction"] if prepared else None
+    )
+    if match is not None and match.reusable:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(match.created_at))
+        st.info(
+            f"This JD looks like one you generated for on {when} "
+            f"({match.distance} of 64 fingerprint bits differ). "
+            f"Reusable: {', '.join(match.reusable)}"
+            + (f"; will regenerate: {', '.join(match.stale)}." if match.stale else ".")
+        )
+        reuse_sections = st.checkbox("Reuse unchanged sections", value=True)
+
 # Sidebar profile/role settings
 profile_data = st.session_state.profile_data or {}
 with st.sidebar:
@@ -206,6 +269,18 @@ with st.sidebar:
                 st.success("Profile updated. Regenerate to use the latest settings.")
 
     st.markdown("---")
+    with st.expander("System status", expanded=False):
+        for name, status in resource_health().items():
+            if status["error"]:
+                st.write(f"❌ **{name}**: {status['error']}")
+            elif status["loaded"]:
+                extra = ", ".join(
+                    f"{k}={v}" for k, v in status.items()
+                    if k not in {"name", "loaded", "loading", "load_time_s", "loaded_at", "error"}
+                )
+                st.write(f"✅ **{name}** loaded in {status['load_time_s']:.1f}s" + (f" ({extra})" if extra else ""))
+            else:
+                st.write(f"⏳ **{name}**: {'loading...' if status['loading'] else 'not loaded'}")
     # st.markdown(
     #     "💡 *Place your resume / project summaries as .txt/.md/.pdf in* "
     #     "`data/job_rag/profile_docs`."
@@ -217,54 +292,75 @@ with col_generate:
 
 
 # ---------------------------------------------------------------------
-# Run pipeline on click
+# Submit pipeline job on click, then poll its status
 # ---------------------------------------------------------------------
-# if generate_btn:
-#     if not jd_text.strip():
-#         st.error("Please paste a job description first.")
-#     else:
-#         with st.spinner("Running RAG pipeline and generating content..."):
-#             result = generate_application_package(jd_text, save_to_disk=False)
-
-#         st.session_state.result = result
-#         st.session_state.skills_text = result["skills"]
-#         st.session_state.cover_text = result["cover"]
-#         st.session_state.emails_text = result["emails"]
-#         st.session_state.ats_text = result["ats"]
-
-#         st.success("Done! Scroll down to review, edit, and download your content.")
-
-
-
-
-
-
-import traceback  # put this at the top of app.py if not already there
-
 if generate_btn:
     if not jd_text.strip():
         st.error("Please paste a job description first.")
     else:
-        with st.spinner("Running RAG pipeline and generating content..."):
-            try:
-                result = generate_application_package(jd_text, save_to_disk=False)
-            except Exception as e:
-                st.error(f"Pipeline failed: {e}")
-                traceback.print_exc()
-                st.stop()
-
-        # only runs if no exception
-        st.session_state.result = result
-        st.session_state.skills_text = result["skills"]
-        st.session_state.cover_text = result["cover"]
-        st.session_state.emails_text = result["emails"]
-        st.session_state.ats_text = result["ats"]
-        st.session_state.top_choice_text = result.get("top_choice", "")
-        st.session_state.short_recruiter_email_text = result.get("short_recruiter_email", "")
-
+        previous = st.session_state.get("job_id")
+        if previous:
+            # A new JD supersedes the old run; free its Ollama capacity.
+            worker_pool.cancel(previous)
+        job_id = job_queue.submit({"jd_text": jd_text, "save_to_disk": False, "reuse": reuse_sections})
+        st.session_state.job_id = job_id
+        st.query_params["job"] = job_id
+
+
+@st.fragment(run_every=2)
+def job_progress(job_id: str):
+    """Polls the queue only while the job is queued or running."""
+    job = job_queue.get(job_id)
+    if job.done:
+        # A full rerun renders the outcome and stops polling.
+        st.rerun()
+    elapsed = time.time() - job.created_at
+    st.info(
+        f"Running RAG pipeline and generating content... "
+        f"status: **{job.status}**, attempt {max(job.attempts, 1)}/{job.max_attempts}, {elapsed:.0f}s elapsed"
+    )
+    if st.button("✖️ Cancel generation"):
+        worker_pool.cancel(job_id)
+
+
+def job_status_panel():
+    job_id = st.session_state.get("job_id")
+    if not job_id:
+        return
+    try:
+        job = job_queue.get(job_id)
+    except JobNotFoundError:
+        st.session_state.job_id = None
+        return
+
+    if job.status == SUCCEEDED:
+        _load_job_result(job_id)
+        result = st.session_state.result or {}
+        if result.get("partial"):
+            st.warning(
+                "Time limit reached - showing the sections that finished. Missing: "
+                + ", ".join(result.get("missing_sections", []))
+            )
+        else:
+            st.success("Done! Scroll down to review, edit, and download your content.")
+        reused = result.get("reused", {}).get("reused_sections")
+        if reused:
+            st.caption(f"Reused from an earlier package: {', '.join(reused)}.")
+        ahead = result.get("speculative", {}).get("saved_s")
+        if ahead:
+            st.caption(f"JD prepared while you edited it: ~{ahead:.1f}s of indexing and retrieval skipped.")
+        saved = result.get("retrieval", {}).get("tokens_saved")
+        if saved:
+            st.caption(f"Duplicate snippet suppression saved ~{saved} prompt tokens.")
+    elif job.status == FAILED:
+        st.error(f"Pipeline failed after {job.attempts} attempt(s): {(job.error or '').splitlines()[0]}")
+    elif job.status == CANCELLED:
+        st.warning("Generation was cancelled.")
+    else:
+        job_progress(job_id)
 
-        st.success("Done! Scroll down to review, edit, and download your content.")
 
+job_status_panel()
 
 
 # ---------------------------------------------------------------------
@@ -273,173 +369,34 @@ if generate_btn:
 if st.session_state.result is not None:
     st.subheader("2️⃣ Review, Edit, and Download")
 
-    tab_skills, tab_cover, tab_emails, tab_ats, tab_top_choice, tab_short_email = st.tabs(
-    [
-        "Skills & Keywords",
-        "Cover Letter",
-        "Emails",
-        "ATS Summary",
-        "Top-Choice Message",
-        "Short Recruiter Email",
+    # (tab label, heading, text area label, height, session key, export file name)
+    output_tabs = [
+        ("Skills & Keywords", "Skills & Keywords", "Edit skills/keywords output:", 230,
+         "skills_text", "skills_keywords"),
+        ("Cover Letter", "Cover Letter", "Edit cover letter:", 500,
+         "cover_text", "cover_letter"),
+        ("Emails", "Email Templates", "Edit email templates:", 500,
+         "emails_text", "emails"),
+        ("ATS Summary", "ATS Summary", "Edit ATS summary:", 500,
+         "ats_text", "ats_summary"),
+        ("Top-Choice Message", "Top-Choice Message (Application Text Box)",
+         "Edit the message you’ll paste into the 'Why is this your top choice & why are you a good fit?' box:", 500,
+         "top_choice_text", "top_choice_message"),
+        ("Short Recruiter Email", "Short Recruiter Email", "Edit the short recruiter email:", 500,
+         "short_recruiter_email_text", "short_recruiter_email"),
     ]
-    )
-
-
-    # ---- Skills & Keywords ----
-    with tab_skills:
-        st.markdown("### Skills & Keywords")
-        skills_text = st.text_area(
-            "Edit skills/keywords output:",
-            value=st.session_state.skills_text,
-            height=230,
-        )
-        st.session_state.skills_text = skills_text
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.download_button(
-                "💾 Download as DOCX",
-                data=build_docx(skills_text),
-                file_name="skills_keywords.docx",
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            )
-        with col2:
-            st.download_button(
-                "📄 Download as PDF",
-                data=build_pdf(skills_text),
-                file_name="skills_keywords.pdf",
-                mime="application/pdf",
-            )
-
-    # ---- Cover Letter ----
-    with tab_cover:
-        st.markdown("### Cover Letter")
-        cover_text = st.text_area(
-            "Edit cover letter:",
-            value=st.session_state.cover_text,
-            height=500,
-        )
-        st.session_state.cover_text = cover_text
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.download_button(
-                "💾 Download as DOCX",
-                data=build_docx(cover_text),
-                file_name="cover_letter.docx",
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            )
-        with col2:
-            st.download_button(
-                "📄 Download as PDF",
-                data=build_pdf(cover_text),
-                file_name="cover_letter.pdf",
-                mime="application/pdf",
-            )
-
-    # ---- Emails ----
-    with tab_emails:
-        st.markdown("### Email Templates")
-        emails_text = st.text_area(
-            "Edit email templates:",
-            value=st.session_state.emails_text,
-            height=500,
-        )
-        st.session_state.emails_text = emails_text
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.download_button(
-                "💾 Download as DOCX",
-                data=build_docx(emails_text),
-                file_name="emails.docx",
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            )
-        with col2:
-            st.download_button(
-                "📄 Download as PDF",
-                data=build_pdf(emails_text),
-                file_name="emails.pdf",
-                mime="application/pdf",
-            )
-
-    # ---- ATS Summary ----
-    with tab_ats:
-        st.markdown("### ATS Summary")
-        ats_text = st.text_area(
-            "Edit ATS summary:",
-            value=st.session_state.ats_text,
-            height=500,
-        )
-        st.session_state.ats_text = ats_text
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.download_button(
-                "💾 Download as DOCX",
-                data=build_docx(ats_text),
-                file_name="ats_summary.docx",
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            )
-        with col2:
-            st.download_button(
-                "📄 Download as PDF",
-                data=build_pdf(ats_text),
-                file_name="ats_summary.pdf",
-                mime="application/pdf",
-            )
 
-            # ---- Top-Choice Message (JD text box answer) ----
-    with tab_top_choice:
-        st.markdown("### Top-Choice Message (Application Text Box)")
-        top_choice_text = st.text_area(
-            "Edit the message you’ll paste into the 'Why is this your top choice & why are you a good fit?' box:",
-            value=st.session_state.top_choice_text,
-            height=500,
-        )
-        st.session_state.top_choice_text = top_choice_text
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.download_button(
-                "💾 Download as DOCX",
-                data=build_docx(top_choice_text),
-                file_name="top_choice_message.docx",
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            )
-        with col2:
-            st.download_button(
-                "📄 Download as PDF",
-                data=build_pdf(top_choice_text),
-                file_name="top_choice_message.pdf",
-                mime="application/pdf",
-            )
-
-    # ---- Short Recruiter Email ----
-    with tab_short_email:
-        st.markdown("### Short Recruiter Email")
-        short_recruiter_email_text = st.text_area(
-            "Edit the short recruiter email:",
-            value=st.session_state.short_recruiter_email_text,
-            height=500,
-        )
-        st.session_state.short_recruiter_email_text = short_recruiter_email_text
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.download_button(
-                "💾 Download as DOCX",
-                data=build_docx(short_recruiter_email_text),
-                file_name="short_recruiter_email.docx",
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            )
-        with col2:
-            st.download_button(
-                "📄 Download as PDF",
-                data=build_pdf(short_recruiter_email_text),
-                file_name="short_recruiter_email.pdf",
-                mime="application/pdf",
+    tabs = st.tabs([spec[0] for spec in output_tabs])
+    for tab, (_, heading, area_label, height, state_key, basename) in zip(tabs, output_tabs):
+        with tab:
+            st.markdown(f"### {heading}")
+            edited = st.text_area(
+                area_label,
+                value=st.session_state[state_key],
+                height=height,
             )
+            st.session_state[state_key] = edited
+            export_buttons(edited, basename)
 
 
 else:
@@ -0,0 +1,174 @@
+"""
+exports.py
+DOCX / PDF rendering for the Streamlit app, memoized by content hash.
+
+Renders run on a small thread pool so a long cover letter or email set never
+blocks the script thread; identical text (across tabs, reruns and sessions in
+the same server process) is rendered once.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from typing import Callable, Dict, Optional, Tuple
+
+from docx import Document
+from fpdf import FPDF
+
+from rag.utils.logging import logger
+
+MIME_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
+
+CACHE_SIZE = 64
+
+
+def build_docx(text: str) -> bytes:
+    doc = Document()
+    for line in text.split("\n"):
+        doc.add_paragraph(line)
+    buf = BytesIO()
+    doc.save(buf)
+    buf.seek(0)
+    return buf.getvalue()
+
+
+def clean_text_for_pdf(text: str) -> str:
+    # Normalise unicode
+    text = unicodedata.normalize("NFKD", text)
+
+    # Replace common “fancy” characters
+    replacements = {
+        "–": "-",   # en dash
+        "—": "-",   # em dash
+        "•": "-",   # bullet
+        "“": '"',
+        "”": '"',
+        "’": "'",
+        "…": "...",
+    }
+    for bad, good in replacements.items():
+        text = text.replace(bad, good)
+
+    # Optional: drop anything still not representable in latin-1
+    text = text.encode("latin-1", "ignore").decode("latin-1")
+    return text
+
+
+def build_pdf(text: str) -> bytes:
+    text = clean_text_for_pdf(text)
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+
+    # Safer: write line by line
+    for line in text.splitlines():
+        pdf.multi_cell(0, 8, line)
+        # Add a tiny gap between paragraphs
+        pdf.ln(0.5)
+
+    out = pdf.output(dest="S")  # can be str / bytes / bytearray depending on version
+
+    # 🔒 Normalize to pure bytes
+    if isinstance(out, bytearray):
+        return bytes(out)
+    if isinstance(out, bytes):
+        return out
+    # probably str => encode to latin-1 as per fpdf docs
+    return out.encode("latin-1")
+
+
+RENDERERS: Dict[str, Callable[[str], bytes]] = {
+    "docx": build_docx,
+    "pdf": build_pdf,
+}
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="export-render")
+_cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+_pending: Dict[Tuple[str, str], Future] = {}
+# Last render failure per content key, shown next to the prepare button until a retry.
+_errors: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def content_key(kind: str, text: str) -> Tuple[str, str]:
+    return kind, hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def get_cached(kind: str, text: str) -> Optional[bytes]:
+    """Return rendered bytes if this exact text was rendered before."""
+    key = content_key(kind, text)
+    with _lock:
+        data = _cache.get(key)
+        if data is not None:
+            _cache.move_to_end(key)
+        return data
+
+
+def get_error(kind: str, text: str) -> Optional[str]:
+    """Why the last render of this exact text failed, if it did."""
+    with _lock:
+        return _errors.get(content_key(kind, text))
+
+
+def is_pending(kind: str, text: str) -> bool:
+    with _lock:
+        fut = _pending.get(content_key(kind, text))
+    return fut is not None and not fut.done()
+
+
+def request_export(kind: str, text: str) -> Future:
+    """Render in the background (deduplicated); the future resolves to bytes."""
+    key = content_key(kind, text)
+    with _lock:
+        if key in _cache:
+            done: Future = Future()
+            done.set_result(_cache[key])
+            return done
+        fut = _pending.get(key)
+        if fut is None:
+            _errors.pop(key, None)
+            fut = _executor.submit(_render, key, text)
+            _pending[key] = fut
+        return fut
+
+
+def _render(key: Tuple[str, str], text: str) -> bytes:
+    try:
+        data = RENDERERS[key[0]](text)
+        with _lock:
+            _cache[key] = data
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+        return data
+    except Exception as exc:
+        logger.exception("Rendering %s export failed", key[0])
+        with _lock:
+            _errors[key] = f"{type(exc).__name__}: {exc}"
+            while len(_errors) > CACHE_SIZE:
+                _errors.popitem(last=False)
+        raise
+    finally:
+        with _lock:
+            _pending.pop(key, None)
+
+
+__all__ = [
+    "MIME_TYPES",
+    "build_docx",
+    "build_pdf",
+    "clean_text_for_pdf",
+    "get_cached",
+    "get_error",
+    "is_pending",
+    "request_export",
+]
@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+
+from ui import exports
+
+
+@pytest.fixture
+def renderers(monkeypatch):
+    """Counting text renderer under a fake ``txt`` kind, with a gate to hold renders open."""
+    calls = []
+    gate = threading.Event()
+    gate.set()
+
+    def render(text):
+        calls.append(text)
+        gate.wait(5)
+        if text.startswith("bad"):
+            raise ValueError("unrenderable")
+        return text.encode("utf-8")
+
+    monkeypatch.setitem(exports.RENDERERS, "txt", render)
+    monkeypatch.setattr(exports, "_cache", exports.OrderedDict())
+    monkeypatch.setattr(exports, "_pending", {})
+    monkeypatch.setattr(exports, "_errors", exports.OrderedDict())
+    monkeypatch.setattr(exports, "CACHE_SIZE", 2)
+    return calls, gate
+
+
+def test_render_is_cached_by_content(renderers):
+    calls, _ = renderers
+    assert exports.get_cached("txt", "a") is None
+
+    assert exports.request_export("txt", "a").result(5) == b"a"
+    assert exports.get_cached("txt", "a") == b"a"
+    assert exports.request_export("txt", "a").result(5) == b"a"
+    assert calls == ["a"]
+
+
+def test_pending_requests_are_deduplicated(renderers):
+    calls, gate = renderers
+    gate.clear()
+    first = exports.request_export("txt", "a")
+    second = exports.request_export("txt", "a")
+    assert first is second
+    assert exports.is_pending("txt", "a")
+
+    gate.set()
+    assert first.result(5) == b"a"
+    assert not exports.is_pending("txt", "a")
+    assert calls == ["a"]
+
+
+def test_cache_evicts_least_recently_used(renderers):
+    calls, _ = renderers
+    for text in ("a", "b"):
+        exports.request_export("txt", text).result(5)
+    assert exports.get_cached("txt", "a") == b"a"  # "b" is now the oldest
+    exports.request_export("txt", "c").result(5)
+
+    assert exports.get_cached("txt", "b") is None
+    assert exports.get_cached("txt", "a") == b"a"
+    assert exports.get_cached("txt", "c") == b"c"
+
+
+def test_failed_render_is_logged_and_reported(renderers, caplog):
+    calls, _ = renderers
+    fut = exports.request_export("txt", "bad text")
+    with pytest.raises(ValueError):
+        fut.result(5)
+
+    assert exports.get_cached("txt", "bad text") is None
+    assert not exports.is_pending("txt", "bad text")
+    assert exports.get_error("txt", "bad text") == "ValueError: unrenderable"
+    assert exports.get_error("txt", "good text") is None
+    assert "Rendering txt export failed" in caplog.text
+
+    # Failures are not cached: asking again renders again.
+    retry = exports.request_export("txt", "bad text")
+    assert retry is not fut
+    with pytest.raises(ValueError):
+        retry.result(5)
+    assert calls == ["bad text", "bad text"]